@@ -1,17 +1,73 @@
 """Player behavior tracking and data collection"""
-import json
 import time
+import numpy as np
 from datetime import datetime
 from pathlib import Path
+from .session_store import SessionStore
+
+def simplify_trajectory(points, tolerance):
+    """
+    Douglas-Peucker simplification of a position time series
+    
+    The error of a dropped sample is its distance from the straight line
+    between the kept neighbours evaluated at the same timestamp, so the
+    simplified path can be linearly interpolated back within tolerance.
+    
+    Args:
+        points: list of {"t", "x", "y"} dicts ordered by time
+        tolerance: Maximum allowed position error (columns/rows)
+        
+    Returns:
+        list: Subset of points (first and last always kept)
+    """
+    if len(points) <= 2:
+        return list(points)
+        
+    t = np.array([p["t"] for p in points], dtype=float)
+    xy = np.array([(p["x"], p["y"]) for p in points], dtype=float)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+            
+        span = t[last] - t[first]
+        frac = (t[first + 1:last] - t[first]) / span if span > 0 else np.zeros(last - first - 1)
+        expected = xy[first] + frac[:, None] * (xy[last] - xy[first])
+        errors = np.abs(xy[first + 1:last] - expected).max(axis=1)
+        
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+            
+    return [p for p, k in zip(points, keep) if k]
 
 class BehaviorTracker:
     """Tracks player movements, shooting patterns, and strategies"""
     
-    def __init__(self, data_dir="data/player_data"):
+    # Game event types (game.events) recorded as session actions
+    TRACKED_EVENTS = ["move_left", "move_right", "shoot", "hit", "death"]
+    
+    def __init__(self, data_dir="data/player_data", store=None,
+                 max_sample_interval=1.0, simplify_tolerance=None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store or SessionStore(self.data_dir)
+        
+        # Change-driven position sampling
+        self.max_sample_interval = max_sample_interval
+        self.simplify_tolerance = simplify_tolerance
+        self._last_sample = None    # (t, x, y) last recorded
+        self._last_seen = None      # (t, x, y) last observed
         
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Microsecond resolution so back-to-back sessions don't collide
+        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         self.session_data = {
             "session_id": self.session_id,
             "start_time": time.time(),
@@ -25,15 +81,31 @@ class BehaviorTracker:
             }
         }
         
-    def track_action(self, action_type, data=None):
+    def track_events(self, events):
+        """
+        Track a frame's batch of game events (an EventBuffer)
+        
+        The frame's actions share one timestamp; other event types are
+        skipped without being decoded.
+        """
+        records = events.records(self.TRACKED_EVENTS)
+        if not records:
+            return
+        timestamp = time.time() - self.session_data["start_time"]
+        for action_type, data in records:
+            self.track_action(action_type, data, timestamp)
+            
+    def track_action(self, action_type, data=None, timestamp=None):
         """
         Track a player action
         
         Args:
             action_type: 'move_left', 'move_right', 'shoot', 'hit', 'death'
             data: Additional data about the action
+            timestamp: Seconds into the session (now if None)
         """
-        timestamp = time.time() - self.session_data["start_time"]
+        if timestamp is None:
+            timestamp = time.time() - self.session_data["start_time"]
         
         action_record = {
             "timestamp": timestamp,
@@ -53,30 +125,90 @@ class BehaviorTracker:
         elif action_type == "death":
             self.session_data["stats"]["total_deaths"] += 1
             
+    def sample_position(self, x, y, timestamp=None):
+        """
+        Record the player position only when it changed or the last
+        sample is older than max_sample_interval. Cheap enough to call
+        every frame.
+        
+        Returns:
+            bool: True if a sample was recorded
+        """
+        if timestamp is None:
+            timestamp = time.time() - self.session_data["start_time"]
+        self._last_seen = (timestamp, x, y)
+        
+        last = self._last_sample
+        if (last is not None and last[1] == x and last[2] == y
+                and timestamp - last[0] < self.max_sample_interval):
+            return False
+            
+        self.track_position(x, y, timestamp)
+        return True
+        
     def track_position(self, x, y, timestamp=None):
         """Track player position over time"""
         if timestamp is None:
             timestamp = time.time() - self.session_data["start_time"]
             
+        self._last_sample = (timestamp, x, y)
         self.session_data["stats"]["position_history"].append({
             "t": timestamp,
             "x": x,
             "y": y
         })
         
+    def finalize_positions(self):
+        """Close the trajectory with the last observed position and simplify it"""
+        history = self.session_data["stats"]["position_history"]
+        
+        if self._last_seen is not None and self._last_seen != self._last_sample:
+            self.track_position(self._last_seen[1], self._last_seen[2], self._last_seen[0])
+            
+        if self.simplify_tolerance is not None:
+            history[:] = simplify_trajectory(history, self.simplify_tolerance)
+            
     def save_session(self):
-        """Save session data to file"""
-        filepath = self.data_dir / f"session_{self.session_id}.json"
+        """
+        Save session data to the session store
+        
+        Returns:
+            Path: Database the session was written to
+        """
+        self.session_id = self.store.save_session(self.finish())
+        self.session_data["session_id"] = self.session_id
+            
+        return self.store.db_path
+        
+    def finish(self):
+        """
+        End the session (close the trajectory, stamp the end time)
+        
+        Returns:
+            dict: Copy of the finished session, which store.save_session()
+                  may write from another thread
+        """
+        self.finalize_positions()
         
         self.session_data["end_time"] = time.time()
         self.session_data["duration"] = (
             self.session_data["end_time"] - self.session_data["start_time"]
         )
+        return self.snapshot()
         
-        with open(filepath, 'w') as f:
-            json.dump(self.session_data, f, indent=2)
-            
-        return filepath
+    def snapshot(self):
+        """
+        Copy of the session so far, safe to serialize on another thread
+        
+        Action and position records are never changed once appended, so
+        copying the lists (not the records) is enough.
+        """
+        session = dict(self.session_data)
+        session["actions"] = list(session["actions"])
+        stats = dict(session["stats"])
+        stats["position_history"] = list(stats["position_history"])
+        session["stats"] = stats
+        return session
         
     def get_stats(self):
         """Get current session statistics"""
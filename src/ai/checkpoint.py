@@ -0,0 +1,231 @@
+"""Periodic crash-safe checkpoints of the boss model and the session being played"""
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+def atomic_write_json(path, data):
+    """
+    Write JSON so that readers (and crashes) only ever see the old or the
+    new file: write a temporary file next to it, fsync, then rename over.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+# Model fields holding learned parameters (the rest are settings)
+LEARNED_FIELDS = ("q_table", "weights")
+
+def merge_model_data(current, base, new):
+    """
+    Apply what one game learned on top of the model saved meanwhile
+
+    Games that share a model file each start from it; adding every game's
+    change (new - base) to the current file keeps all of their learning,
+    where plain saves would keep only the last one's.
+
+    Args:
+        current: model_data() of the file as it is now
+        base: model_data() the game's agent started from
+        new: model_data() of the game's agent at the end
+
+    Returns:
+        dict: Merged model_data (settings such as epsilon from `new`)
+    """
+    merged = dict(new)
+    for field in LEARNED_FIELDS:
+        if field in new:
+            merged[field] = _merge_values(current.get(field), base.get(field), new[field])
+    return merged
+
+def _merge_values(current, base, new):
+    if isinstance(new, dict):
+        current = current if isinstance(current, dict) else {}
+        base = base if isinstance(base, dict) else {}
+        merged = dict(current)
+        for key, value in new.items():
+            merged[key] = _merge_values(current.get(key), base.get(key), value)
+        return merged
+    if isinstance(new, list):
+        if not isinstance(current, list) or len(current) != len(new):
+            return new
+        if not isinstance(base, list) or len(base) != len(new):
+            base = [None] * len(new)
+        return [_merge_values(c, b, n) for c, b, n in zip(current, base, new)]
+    if current is None:
+        return new
+    return current + new - (base if base is not None else 0.0)
+
+class Checkpointer:
+    """
+    Writes checkpoints of the boss agent and the behavior tracker on a
+    background thread.
+
+    capture() copies the state on the game thread between frames (cheap:
+    model_data() and shallow copies of the session lists); serializing
+    and fsyncing happen on the writer thread. If a write is still in
+    flight, a newer snapshot replaces the one waiting, so the game never
+    waits on the disk. Each checkpoint also refreshes the agent's model
+    file, and only the newest `keep` checkpoints are retained.
+
+    Raises:
+        ValueError: keep is less than 1
+    """
+
+    def __init__(self, directory="models/checkpoints", interval=5.0, keep=3):
+        if keep < 1:
+            raise ValueError(f"Checkpointer keeps at least one checkpoint (keep={keep})")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.keep = keep
+
+        existing = self.checkpoints()
+        self.sequence = int(existing[-1].stem.split("_")[1]) if existing else 0
+        self.last_capture = time.monotonic()
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._closing = False
+        self._thread = None
+
+        # Statistics
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.last_write_ms = 0.0
+
+    def checkpoints(self):
+        """Checkpoint files, oldest first"""
+        return sorted(self.directory.glob("checkpoint_*.json"))
+
+    def due(self):
+        return time.monotonic() - self.last_capture >= self.interval
+
+    def capture(self, agent=None, tracker=None, complete=False):
+        """
+        Consistent copy of the state to checkpoint (call on the game thread)
+
+        Args:
+            agent: Boss agent whose model_data() to save (None before the boss)
+            tracker: BehaviorTracker of the running session
+            complete: The session was already saved normally (nothing to recover)
+
+        Returns:
+            dict: Snapshot for submit()
+        """
+        self.last_capture = time.monotonic()
+        return {
+            "time": time.time(),
+            "complete": complete,
+            "agent": agent,
+            "model": agent.model_data() if agent else None,
+            "session": tracker.snapshot() if tracker else None
+        }
+
+    def submit(self, snapshot):
+        """Hand a snapshot to the writer thread (never blocks on I/O)"""
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = snapshot
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="checkpointer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closing:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+            try:
+                self.write(snapshot)
+            except OSError:
+                self.failed += 1
+
+    def write(self, snapshot):
+        """Write one snapshot (writer thread), then prune old checkpoints"""
+        start = time.perf_counter()
+        agent = snapshot["agent"]
+        if agent is not None:
+            agent.save_model(model_data=snapshot["model"])
+
+        self.sequence += 1
+        atomic_write_json(self.directory / f"checkpoint_{self.sequence:06d}.json", {
+            "time": snapshot["time"],
+            "complete": snapshot["complete"],
+            "model": snapshot["model"],
+            "session": snapshot["session"]
+        })
+        for old in self.checkpoints()[:-self.keep]:
+            old.unlink()
+
+        self.written += 1
+        self.last_write_ms = (time.perf_counter() - start) * 1000
+
+    def close(self, timeout=10.0):
+        """Finish the pending write and stop the writer thread"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        """
+        Newest readable checkpoint
+
+        Returns:
+            tuple: (path, data), or (None, None)
+        """
+        for path in reversed(self.checkpoints()):
+            try:
+                with open(path, 'r') as f:
+                    return path, json.load(f)
+            except (OSError, ValueError):
+                continue
+        return None, None
+
+    def recover(self, store):
+        """
+        Save the session of a game that crashed before saving it
+
+        A session the store already has (the crash came after its normal
+        save) is only marked complete, not stored twice.
+
+        Args:
+            store: SessionStore to save the session to
+
+        Returns:
+            str: Stored session id, or None if there was nothing to recover
+        """
+        path, data = self.latest()
+        if data is None or data.get("complete") or not data.get("session"):
+            return None
+
+        session = data["session"]
+        session_id = None
+        if not store.has_session(session["session_id"]):
+            session["end_time"] = data["time"]
+            session["duration"] = data["time"] - session["start_time"]
+            session_id = store.save_session(session)
+
+        data["complete"] = True
+        atomic_write_json(path, data)
+        return session_id
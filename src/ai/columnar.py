@@ -0,0 +1,282 @@
+"""Columnar .npy shards of behavior data for bulk offline analysis"""
+import json
+import numpy as np
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+
+# Stable codes for the action types BehaviorTracker emits; new types are
+# appended to the manifest's table as they are first seen
+DEFAULT_EVENT_CODES = {
+    "move_left": 1,
+    "move_right": 2,
+    "shoot": 3,
+    "hit": 4,
+    "death": 5
+}
+
+EVENT_COLUMNS = {
+    "event_time": np.float64,      # absolute epoch seconds
+    "event_code": np.uint8,
+    "event_session": np.uint32     # index into session_start
+}
+
+SESSION_COLUMNS = {
+    "session_start": np.float64,   # absolute epoch seconds
+    "session_duration": np.float64
+}
+
+POSITION_COLUMNS = {
+    "pos_time": np.float64,
+    "pos_x": np.int16,
+    "pos_y": np.int16,
+    "pos_session": np.uint32
+}
+
+class ShardWriter:
+    """
+    Appends sessions to a directory of columnar shards.
+
+    Each shard is a subdirectory holding one .npy file per field, sorted
+    by time, plus the per-session start times and durations. A session
+    always lands whole in a single shard. The manifest records the time
+    range of every shard so readers can skip whole shards, and the row id
+    of the last session exported from the store.
+    """
+
+    def __init__(self, shard_dir="data/shards"):
+        self.shard_dir = Path(shard_dir)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = load_manifest(self.shard_dir)
+
+    def _event_code(self, action_type):
+        """Look up (or assign) the code for an action type"""
+        codes = self.manifest["event_codes"]
+        if action_type not in codes:
+            codes[action_type] = max(codes.values(), default=0) + 1
+        return codes[action_type]
+
+    def write_shard(self, sessions, last_rowid=None):
+        """
+        Write sessions (BehaviorTracker layout) as one new shard
+
+        Args:
+            sessions: Session dicts
+            last_rowid: Store row id of the newest session written, which
+                        becomes the export watermark
+
+        Returns:
+            dict or None: Manifest entry of the new shard
+        """
+        if not sessions:
+            return None
+
+        starts = np.array([s["start_time"] for s in sessions], dtype=SESSION_COLUMNS["session_start"])
+        durations = np.array([s.get("duration") or 0.0 for s in sessions],
+                             dtype=SESSION_COLUMNS["session_duration"])
+
+        ev_time, ev_code, ev_session = [], [], []
+        pos_time, pos_x, pos_y, pos_session = [], [], [], []
+        for i, session in enumerate(sessions):
+            for action in session["actions"]:
+                ev_time.append(session["start_time"] + action["timestamp"])
+                ev_code.append(self._event_code(action["type"]))
+                ev_session.append(i)
+            for p in session.get("stats", {}).get("position_history", []):
+                pos_time.append(session["start_time"] + p["t"])
+                pos_x.append(p["x"])
+                pos_y.append(p["y"])
+                pos_session.append(i)
+
+        events = {
+            "event_time": np.array(ev_time, dtype=EVENT_COLUMNS["event_time"]),
+            "event_code": np.array(ev_code, dtype=EVENT_COLUMNS["event_code"]),
+            "event_session": np.array(ev_session, dtype=EVENT_COLUMNS["event_session"])
+        }
+        positions = {
+            "pos_time": np.array(pos_time, dtype=POSITION_COLUMNS["pos_time"]),
+            "pos_x": np.array(pos_x, dtype=POSITION_COLUMNS["pos_x"]),
+            "pos_y": np.array(pos_y, dtype=POSITION_COLUMNS["pos_y"]),
+            "pos_session": np.array(pos_session, dtype=POSITION_COLUMNS["pos_session"])
+        }
+
+        # Stable sort keeps per-session order while making time ranges searchable
+        order = np.argsort(events["event_time"], kind="stable")
+        events = {k: v[order] for k, v in events.items()}
+        order = np.argsort(positions["pos_time"], kind="stable")
+        positions = {k: v[order] for k, v in positions.items()}
+
+        name = f"shard_{len(self.manifest['shards']):05d}"
+        path = self.shard_dir / name
+        path.mkdir(exist_ok=True)
+
+        np.save(path / "session_start.npy", starts)
+        np.save(path / "session_duration.npy", durations)
+        for column, values in {**events, **positions}.items():
+            np.save(path / f"{column}.npy", values)
+
+        times = np.concatenate([events["event_time"], positions["pos_time"], starts])
+        entry = {
+            "name": name,
+            "t_min": float(times.min()),
+            "t_max": float(times.max()),
+            "sessions": len(sessions),
+            "events": int(len(events["event_time"])),
+            "positions": int(len(positions["pos_time"]))
+        }
+        self.manifest["shards"].append(entry)
+        if last_rowid is not None:
+            self.manifest["exported_rowid"] = max(self.manifest["exported_rowid"], int(last_rowid))
+        self._save_manifest()
+
+        return entry
+
+    def export_from_store(self, store, sessions_per_shard=200):
+        """
+        Export sessions not yet in any shard from a SessionStore
+
+        Sessions are picked by store row id, not start time, so a session
+        saved late (e.g. a long game started before the last export) is
+        still exported.
+
+        Returns:
+            int: Number of sessions exported
+        """
+        exported = self._upgrade_watermark(store)
+        while True:
+            pending = store.sessions(after_id=self.manifest["exported_rowid"])
+            if not pending:
+                break
+
+            batch = sorted(meta["id"] for meta in pending)[:sessions_per_shard]
+            sessions = store.load_sessions(rowids=batch)
+            self.write_shard(sessions, last_rowid=batch[-1])
+            exported += len(sessions)
+
+        return exported
+
+    def _upgrade_watermark(self, store):
+        """
+        Turn a version 1 start-time watermark into a row id watermark
+
+        Version 1 exported every session that started by `exported_until`.
+        The watermark becomes the newest of those; older rows that started
+        later were never exported and go into a shard of their own now.
+
+        Returns:
+            int: Number of sessions exported
+        """
+        if "exported_until" not in self.manifest:
+            return 0
+
+        until = np.nextafter(self.manifest.pop("exported_until"), np.inf)
+        watermark = max((meta["id"] for meta in store.sessions(end=until)), default=0)
+        missed = [meta["id"] for meta in store.sessions(start=until) if meta["id"] < watermark]
+
+        self.manifest["version"] = 2
+        self.manifest["exported_rowid"] = watermark
+        self._save_manifest()
+        if missed:
+            self.write_shard(store.load_sessions(rowids=missed))
+        return len(missed)
+
+    def _save_manifest(self):
+        """Write the manifest atomically"""
+        tmp = self.shard_dir / (MANIFEST_NAME + ".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        tmp.replace(self.shard_dir / MANIFEST_NAME)
+
+def load_manifest(shard_dir):
+    """Read a shard manifest, or an empty one if the directory is new"""
+    path = Path(shard_dir) / MANIFEST_NAME
+    if path.exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {
+        "version": 2,
+        "event_codes": dict(DEFAULT_EVENT_CODES),
+        "exported_rowid": 0,
+        "shards": []
+    }
+
+class ShardReader:
+    """
+    Memory-maps shard columns and serves time-range slices of them.
+
+    Only the columns a caller asks for are mapped, and shards outside
+    the requested time range are never opened.
+    """
+
+    def __init__(self, shard_dir="data/shards"):
+        self.shard_dir = Path(shard_dir)
+        self.manifest = load_manifest(self.shard_dir)
+        self.event_codes = self.manifest["event_codes"]
+
+    def shards(self, start=None, end=None):
+        """Manifest entries overlapping [start, end)"""
+        return [
+            entry for entry in self.manifest["shards"]
+            if (start is None or entry["t_max"] >= start)
+            and (end is None or entry["t_min"] < end)
+        ]
+
+    def _column(self, entry, column):
+        """Memory-map one column of one shard"""
+        path = self.shard_dir / entry["name"] / f"{column}.npy"
+        if column == "session_duration" and not path.exists():
+            # Version 1 shards have no durations
+            return np.zeros(entry["sessions"], dtype=SESSION_COLUMNS[column])
+        return np.load(path, mmap_mode="r")
+
+    def scan(self, columns, start=None, end=None, by_session=False):
+        """
+        Yield per-shard column slices restricted to a time range
+
+        Args:
+            columns: Column names, all from the event or all from the position
+                     group, plus any session columns
+            start, end: Absolute time range (epoch seconds)
+            by_session: Select whole sessions that started in the range
+                        (like SessionStore.load_sessions) instead of the
+                        rows that fall in it
+
+        Yields:
+            dict: column -> array slice (memmap views), session columns
+                  whole; "session_start" is always included so
+                  session-relative times can be rebuilt. With by_session,
+                  "session_mask" marks the sessions in the range.
+        """
+        row_columns = [c for c in columns if c not in SESSION_COLUMNS]
+        time_column = "event_time" if not row_columns or row_columns[0] in EVENT_COLUMNS else "pos_time"
+        session_column = "event_session" if time_column == "event_time" else "pos_session"
+
+        for entry in self.shards(start, end):
+            chunk = {c: self._column(entry, c) for c in SESSION_COLUMNS if c in columns}
+            chunk["session_start"] = self._column(entry, "session_start")
+
+            if by_session:
+                starts = chunk["session_start"]
+                mask = np.ones(len(starts), dtype=bool)
+                if start is not None:
+                    mask &= starts >= start
+                if end is not None:
+                    mask &= starts < end
+                if not mask.any():
+                    continue
+                rows = mask[self._column(entry, session_column)]
+                chunk.update({c: self._column(entry, c)[rows] for c in row_columns})
+                chunk["session_mask"] = mask
+                yield chunk
+                continue
+
+            lo, hi = 0, None
+            if start is not None or end is not None:
+                times = self._column(entry, time_column)
+                lo = np.searchsorted(times, start, side="left") if start is not None else 0
+                hi = np.searchsorted(times, end, side="left") if end is not None else len(times)
+                if lo >= hi:
+                    continue
+
+            chunk.update({c: self._column(entry, c)[lo:hi] for c in row_columns})
+            yield chunk
@@ -0,0 +1,244 @@
+"""Background learner process for the boss agent"""
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from .linear_agent import create_agent
+from .replay import PrioritizedReplay
+
+class SharedPolicy:
+    """
+    Policy parameters in shared memory, published under a seqlock.
+
+    The block holds a sequence counter followed by the float64 parameter
+    array. The single writer makes the counter odd, copies the parameters
+    in and makes it even again; a reader copies the array and keeps the
+    copy only if the counter was even and unchanged around it. Readers
+    never block the writer and never see a half-written policy. The
+    version of a published policy is the counter divided by two.
+    """
+
+    def __init__(self, shape, name=None):
+        self.shape = tuple(shape)
+        size = 8 + 8 * int(np.prod(self.shape))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.sequence = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf)
+        self.params = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf, offset=8)
+        if self.owner:
+            self.sequence[0] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def version(self):
+        return int(self.sequence[0]) // 2
+
+    def publish(self, params):
+        """Write a new policy version (single writer only)"""
+        self.sequence[0] += 1
+        self.params[...] = params
+        self.sequence[0] += 1
+
+    def read(self, retries=3):
+        """
+        Consistent copy of the latest policy
+
+        Returns:
+            tuple: (version, params), or None if every attempt overlapped
+                   a write (try again next frame)
+        """
+        for _ in range(retries):
+            before = int(self.sequence[0])
+            if before & 1:
+                continue
+            params = self.params.copy()
+            if int(self.sequence[0]) == before:
+                return before // 2, params
+        return None
+
+    def close(self):
+        # Views into the buffer must go before it can be closed
+        del self.sequence, self.params
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def learner_main(kind, model_data, policy_name, transitions, results, replay_kwargs,
+                 publish_interval=0.5, replay_ratio=8):
+    """
+    Learner process body: replay incoming transitions and publish policies
+
+    Args:
+        kind: Agent name (ai.agent)
+        model_data: Starting model (the agent's model_data())
+        policy_name: SharedPolicy block to publish to
+        transitions: Queue of transition array tuples; None stops the learner
+        results: Queue receiving the final model_data() and statistics
+        replay_kwargs: PrioritizedReplay arguments (capacity, batch_size, ...)
+        publish_interval: Minimum seconds between policy versions
+        replay_ratio: Replayed samples per received transition before the
+                      learner waits for new data instead of spinning
+    """
+    agent = create_agent(kind)
+    agent.load_model_data(model_data)
+    policy = SharedPolicy(agent.policy_shape, name=policy_name)
+    replay = PrioritizedReplay.for_agent(type(agent), **replay_kwargs)
+    last_publish, published_updates = time.perf_counter(), 0
+    running = True
+
+    while running:
+        starved = (len(replay) < replay.batch_size
+                   or replay.updates * replay.batch_size >= replay_ratio * replay.added)
+        try:
+            # Block only when there is nothing worth replaying
+            item = transitions.get(timeout=0.05) if starved else transitions.get_nowait()
+            while True:
+                if item is None:
+                    running = False
+                    break
+                for transition in zip(*item):
+                    replay.add(*transition)
+                item = transitions.get_nowait()
+        except queue.Empty:
+            pass
+
+        if not starved:
+            replay.learn(agent)
+        # New versions only when training changed the policy
+        if (replay.updates != published_updates
+                and time.perf_counter() - last_publish >= publish_interval):
+            policy.publish(agent.policy_parameters())
+            last_publish, published_updates = time.perf_counter(), replay.updates
+
+    policy.publish(agent.policy_parameters())
+    results.put({"model_data": agent.model_data(), "transitions": replay.added,
+                 "updates": replay.updates, "versions": policy.version})
+    policy.close()
+
+class OnlineLearner:
+    """
+    Trains the boss agent in a separate process while the game runs.
+
+    The game side only batches transitions onto a queue and, between
+    frames, adopts the newest policy version from shared memory (sync);
+    replay and TD updates all happen in the learner process, so harder
+    training never costs frame time. A full queue drops transitions
+    rather than stalling a frame.
+    """
+
+    def __init__(self, agent="tabular", model_data=None, publish_interval=0.5, replay_ratio=8,
+                 queue_size=256, chunk=32, **replay_kwargs):
+        self.agent_kind = agent
+        if model_data is None:
+            seed_agent = create_agent(agent)
+            seed_agent.load_model()
+            model_data = seed_agent.model_data()
+        self.model_data = model_data
+        self.publish_interval = publish_interval
+        self.replay_ratio = replay_ratio
+        self.chunk = chunk
+        self.replay_kwargs = replay_kwargs
+
+        self.policy = SharedPolicy(create_agent(agent).policy_shape)
+        self.transitions = mp.Queue(queue_size)
+        self.results = mp.Queue()
+        self.process = None
+        self._pending = []
+        self.version = 0
+
+        # Statistics
+        self.sent = 0
+        self.dropped = 0
+        self.swaps = 0
+        self.final = None
+
+    def start(self):
+        """Start the learner process"""
+        self.process = mp.Process(
+            target=learner_main,
+            args=(self.agent_kind, self.model_data, self.policy.name, self.transitions,
+                  self.results, self.replay_kwargs, self.publish_interval, self.replay_ratio),
+            daemon=True
+        )
+        self.process.start()
+        return self
+
+    def submit(self, state, action, reward, next_state, done=False):
+        """Queue one transition (sent in chunks; flushed at the end of a fight)"""
+        self._pending.append((state, action, reward, next_state, done))
+        if len(self._pending) >= self.chunk or done:
+            self.flush()
+
+    def flush(self):
+        """Send the pending transitions to the learner"""
+        if not self._pending:
+            return
+        states, actions, rewards, next_states, dones = zip(*self._pending)
+        item = (np.array(states), np.array(actions), np.array(rewards),
+                np.array(next_states), np.array(dones))
+        try:
+            self.transitions.put_nowait(item)
+            self.sent += len(actions)
+        except queue.Full:
+            self.dropped += len(actions)
+        self._pending = []
+
+    def sync(self, agent):
+        """
+        Hot-swap the agent to the newest published policy (call between frames)
+
+        Returns:
+            bool: True if a new version was adopted
+        """
+        if self.policy.version == self.version:
+            return False
+        latest = self.policy.read()
+        if latest is None:
+            return False
+        self.version, params = latest
+        agent.load_policy_parameters(params)
+        self.swaps += 1
+        return True
+
+    def close(self, timeout=10.0):
+        """
+        Stop the learner and collect its final model
+
+        Returns:
+            dict: Final model_data(), or None if the learner didn't answer
+        """
+        if self.process is None:
+            self.policy.close()
+            return None
+        self.flush()
+        try:
+            self.transitions.put(None, timeout=timeout)
+            self.final = self.results.get(timeout=timeout)
+        except (queue.Full, queue.Empty):
+            self.final = None
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+        self.policy.close()
+        return self.final["model_data"] if self.final else None
+
+    def stats(self):
+        """
+        Learner summary
+
+        Returns:
+            dict: sent, dropped, swaps, updates, versions
+        """
+        final = self.final or {}
+        return {
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "swaps": self.swaps,
+            "updates": final.get("updates", 0),
+            "versions": final.get("versions", self.version)
+        }
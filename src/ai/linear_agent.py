@@ -0,0 +1,351 @@
+"""Linear function-approximation Q-learning agent for the boss"""
+import json
+from pathlib import Path
+import numpy as np
+from .rl_agent import BossRLAgent, ACTIONS, REWARDS
+from .checkpoint import atomic_write_json
+from ..utils.rng import RandomStream
+
+# Feature vector layout (see feature_matrix)
+FEATURES = [
+    "bias",
+    "relative_x",          # Player minus boss center, as a fraction of the screen width
+    "distance",            # |relative_x|
+    "incoming_bullets",    # Player bullets inside the boss's columns (/10, capped at 1)
+    "boss_bullets",        # Boss bullets in flight (/8, capped at 1)
+    "player_velocity",     # Last player move in columns (/ player speed)
+    "boss_health",         # Fraction of max health left
+    "predicted_left",      # Player's likely next move, one-hot
+    "predicted_stay",
+    "predicted_right",
+    "shoot_ready"          # Boss shot cooldown has expired
+]
+
+def feature_matrix(relative_x, incoming, boss_bullets, player_velocity, boss_health,
+                   predicted_move, shoot_ready):
+    """
+    Feature vectors for a batch of states
+
+    Args:
+        relative_x: (player x - boss center x) / screen width
+        incoming: Player bullets in the boss's columns
+        boss_bullets: Boss bullets in flight
+        player_velocity: Last player move, -1..1
+        boss_health: Fraction of max health left
+        predicted_move: Predicted next player move (-1, 0, 1)
+        shoot_ready: Whether the boss can shoot
+
+    Returns:
+        np.ndarray: (n, len(FEATURES)) float array
+    """
+    relative_x = np.asarray(relative_x, dtype=np.float64)
+    phi = np.empty((len(relative_x), len(FEATURES)))
+    phi[:, 0] = 1.0
+    phi[:, 1] = relative_x
+    phi[:, 2] = np.abs(relative_x)
+    phi[:, 3] = np.minimum(np.asarray(incoming) / 10.0, 1.0)
+    phi[:, 4] = np.minimum(np.asarray(boss_bullets) / 8.0, 1.0)
+    phi[:, 5] = player_velocity
+    phi[:, 6] = boss_health
+    phi[:, 7:10] = np.asarray(predicted_move)[:, None] == np.arange(-1, 2)
+    phi[:, 10] = shoot_ready
+    return phi
+
+class MovePredictor:
+    """
+    First-order Markov model of the player's moves (left, stay, right)
+
+    counts[previous, next] is kept per row so a VecBossEnv can track
+    every environment's player with the same code as the live game.
+    """
+
+    def __init__(self, n=1):
+        self.counts = np.zeros((n, 3, 3))
+        self.last = np.ones(n, dtype=np.int64)
+
+    def observe(self, moves, rows=None):
+        """Record each row's latest move (-1, 0, 1)"""
+        moves = np.sign(np.asarray(moves)).astype(np.int64) + 1
+        rows = np.arange(len(self.last)) if rows is None else rows
+        self.counts[rows, self.last[rows], moves] += 1
+        self.last[rows] = moves
+
+    def predict(self):
+        """Most likely next move per row (staying wins ties)"""
+        likely = self.counts[np.arange(len(self.last)), self.last]
+        likely[:, 1] += 0.5
+        return likely.argmax(axis=1) - 1
+
+    def reset(self, rows=None):
+        rows = slice(None) if rows is None else rows
+        self.counts[rows] = 0
+        self.last[rows] = 1
+
+class LinearQAgent:
+    """
+    Q-learning with a linear value function over a NumPy feature vector.
+
+    Q(s, a) = w[a] · φ(s), trained by semi-gradient TD updates. Unlike
+    the tabular BossRLAgent, adding a feature adds one weight per action
+    instead of multiplying the number of states, and every update
+    generalizes to similar states. Same choose_action/update interface,
+    so the boss can use either (ai.agent).
+    """
+
+    # Batched/replayed observations are feature vectors
+    observation_shape = (len(FEATURES),)
+    observation_dtype = np.float64
+
+    # Shape of policy_parameters() (shared with a learner process)
+    policy_shape = (len(ACTIONS), len(FEATURES))
+
+    def __init__(self, model_dir="models/saved_models"):
+        self.model_dir = Path(model_dir)
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+
+        # Hyperparameters
+        self.learning_rate = 0.02
+        self.discount_factor = 0.99  # Shots take ~25 frames to land; look further ahead
+        self.epsilon = 0.2  # Exploration rate
+
+        self.actions = list(ACTIONS)
+        self.weights = np.zeros((len(self.actions), len(FEATURES)))
+
+        self.predictor = MovePredictor()
+        self.current_features = None
+        self.last_action = None
+        self._last_game_state = {}
+
+        # Exploration stream (Boss hands in the run's "ai" stream)
+        self.rng = RandomStream()
+
+    def features(self, game_state):
+        """
+        Feature vector of one game state
+
+        Args:
+            game_state: dict as built by Boss.update; missing keys (e.g. in
+                        the partial states passed on damage) fall back to
+                        the last full state seen
+        """
+        state = dict(self._last_game_state, **game_state)
+        self._last_game_state = state
+
+        width = state.get("screen_width", 80)
+        boss_center = state.get("boss_x", 0) + 4
+        max_health = state.get("boss_max_health", 50)
+        phi = feature_matrix(
+            [(state.get("player_x", 0) - boss_center) / width],
+            [state.get("incoming_bullets", 0)],
+            [state.get("boss_bullets", 0)],
+            [np.clip(state.get("player_velocity", 0) / 2.0, -1, 1)],
+            [state.get("boss_health", max_health) / max_health],
+            self.predictor.predict(),
+            [state.get("shoot_ready", 1)]
+        )
+        return phi[0]
+
+    def q_values(self, phi):
+        return self.weights @ phi
+
+    def choose_action(self, game_state):
+        """
+        Choose action using epsilon-greedy policy
+
+        Args:
+            game_state: Current game state
+
+        Returns:
+            str: Selected action
+        """
+        if "player_velocity" in game_state:
+            self.predictor.observe([game_state["player_velocity"]])
+        phi = self.features(game_state)
+
+        if self.rng.random() < self.epsilon:
+            action = self.rng.choice(self.actions)
+        else:
+            action = self.actions[int(np.argmax(self.q_values(phi)))]
+
+        self.current_features = phi
+        self.last_action = action
+        return action
+
+    def observe_action(self, game_state, action):
+        """Record an action chosen elsewhere (e.g. by a planner) so update() learns from it"""
+        if "player_velocity" in game_state:
+            self.predictor.observe([game_state["player_velocity"]])
+        self.current_features = self.features(game_state)
+        self.last_action = action
+
+    def update(self, reward, next_game_state):
+        """
+        Semi-gradient Q-learning step for the last action
+
+        Args:
+            reward: Reward received for last action
+            next_game_state: New game state after action
+        """
+        if self.current_features is None or self.last_action is None:
+            return
+
+        phi, a = self.current_features, self.actions.index(self.last_action)
+        next_phi = self.features(next_game_state)
+
+        td = reward + self.discount_factor * self.q_values(next_phi).max() - self.weights[a] @ phi
+        self.weights[a] += self.learning_rate * td * phi
+
+    def current_observation(self):
+        """The last chosen-for state as a batch observation (for replay)"""
+        return self.current_features
+
+    def observe_batch(self, env):
+        """Batched observations of a VecBossEnv in this agent's input format"""
+        return env.features()
+
+    def policy_parameters(self):
+        """The weights as one array"""
+        return self.weights
+
+    def load_policy_parameters(self, params):
+        """Replace the weights with a policy_parameters() array (swapped in whole)"""
+        self.weights = np.array(params, dtype=np.float64).reshape(self.policy_shape)
+
+    def choose_actions(self, features, rng=None):
+        """
+        Epsilon-greedy actions for a batch of feature vectors
+
+        Returns:
+            np.ndarray: Action indices into self.actions
+        """
+        rng = rng or self.rng.generator
+        actions = (features @ self.weights.T).argmax(axis=1)
+        explore = rng.random(len(features)) < self.epsilon
+        actions[explore] = rng.integers(len(self.actions), size=int(explore.sum()))
+        return actions
+
+    def update_batch(self, features, actions, rewards, next_features, dones=None, weights=None):
+        """
+        Semi-gradient Q-learning update from a batch of transitions
+
+        The gradients of each action's transitions are averaged, so a
+        batch moves the weights about as far as a single step would.
+
+        Args:
+            features, next_features: (n, len(FEATURES)) arrays
+            actions: Action index array
+            rewards: Reward array
+            dones: Optional bool array; terminal transitions don't bootstrap
+            weights: Optional importance-sampling weights (prioritized replay)
+
+        Returns:
+            np.ndarray: TD error of each transition before the update
+        """
+        next_q = (next_features @ self.weights.T).max(axis=1)
+        if dones is not None:
+            next_q = next_q * ~dones
+        td = rewards + self.discount_factor * next_q - np.einsum(
+            "ij,ij->i", features, self.weights[actions])
+
+        step = td if weights is None else td * weights
+        onehot = actions[:, None] == np.arange(len(self.actions))
+        grad = onehot.T @ (step[:, None] * features)
+        counts = np.maximum(onehot.sum(axis=0), 1)
+        self.weights += self.learning_rate * grad / counts[:, None]
+        return td
+
+    def fit_batch(self, features, actions, rewards, next_features, dones=None, ridge=1e-3):
+        """
+        One fitted Q-iteration step over a whole dataset
+
+        Targets come from the current weights; each action's weights are
+        then refit by ridge regression on its transitions (actions with
+        too few samples keep their weights).
+
+        Returns:
+            np.ndarray: TD errors before the step
+        """
+        next_q = (next_features @ self.weights.T).max(axis=1)
+        if dones is not None:
+            next_q = next_q * ~dones
+        targets = rewards + self.discount_factor * next_q
+        td = targets - np.einsum("ij,ij->i", features, self.weights[actions])
+
+        eye = ridge * np.eye(len(FEATURES))
+        for a in range(len(self.actions)):
+            rows = actions == a
+            if rows.sum() < len(FEATURES):
+                continue
+            x = features[rows]
+            self.weights[a] = np.linalg.solve(x.T @ x + eye * len(x), x.T @ targets[rows])
+        return td
+
+    def calculate_reward(self, event_type, game_state):
+        """Reward for a game event (same scale as the tabular agent)"""
+        return REWARDS.get(event_type, 0.0)
+
+    def model_data(self):
+        """Serializable snapshot of the model (independent of the live weights)"""
+        return {
+            "agent": "linear",
+            "features": FEATURES,
+            "actions": self.actions,
+            "weights": self.weights.tolist(),
+            "learning_rate": self.learning_rate,
+            "discount_factor": self.discount_factor,
+            "epsilon": self.epsilon
+        }
+
+    def save_model(self, filename="boss_linear_model.json", model_data=None):
+        """
+        Save the weights to file
+
+        Args:
+            filename: File name inside model_dir
+            model_data: Snapshot from model_data() to write instead of the live model
+        """
+        filepath = self.model_dir / filename
+        if model_data is None:
+            model_data = self.model_data()
+
+        # Atomic, so a crash mid-save can't leave a truncated model
+        atomic_write_json(filepath, model_data)
+
+        return filepath
+
+    def load_model(self, filename="boss_linear_model.json"):
+        """Load the weights from file (ignored if the feature layout changed)"""
+        filepath = self.model_dir / filename
+
+        if not filepath.exists():
+            return False
+
+        with open(filepath, 'r') as f:
+            model_data = json.load(f)
+
+        return self.load_model_data(model_data)
+
+    def load_model_data(self, model_data):
+        """Adopt a model from model_data() (e.g. in a worker process)"""
+        if model_data.get("features") != FEATURES or model_data.get("actions") != self.actions:
+            return False
+
+        self.weights = np.array(model_data["weights"], dtype=np.float64)
+        self.learning_rate = model_data.get("learning_rate", self.learning_rate)
+        self.discount_factor = model_data.get("discount_factor", self.discount_factor)
+        self.epsilon = model_data.get("epsilon", self.epsilon)
+
+        return True
+
+    def decay_epsilon(self, decay_rate=0.995):
+        """Decay exploration rate over time"""
+        self.epsilon = max(0.05, self.epsilon * decay_rate)
+
+# Boss agents by ai.agent name
+AGENTS = {"tabular": BossRLAgent, "linear": LinearQAgent}
+
+def create_agent(kind="tabular", **kwargs):
+    """Instantiate the boss agent named by ai.agent"""
+    if kind not in AGENTS:
+        raise ValueError(f"Unknown agent '{kind}' (choose from {', '.join(AGENTS)})")
+    return AGENTS[kind](**kwargs)
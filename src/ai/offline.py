@@ -0,0 +1,209 @@
+"""Off-policy boss training from recorded player sessions"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .linear_agent import create_agent
+from .session_store import SessionStore
+from .vec_env import VecBossEnv
+
+def session_trace(session, fps=30, width=100, lead_in=5.0):
+    """
+    Frame-by-frame player input of a stored session
+
+    Positions are linearly interpolated between samples (valid for both
+    change-driven and simplified trajectories); shots are binned to the
+    frame they happened in. When the player hit the boss, the trace starts
+    lead_in seconds before the first hit, so it covers the boss fight.
+
+    Args:
+        session: Session dict as returned by SessionStore.load_sessions
+        fps: Frames per second the game ran at
+        width: Screen width of the replay environment (x is clamped to it)
+        lead_in: Seconds kept before the first boss hit
+
+    Returns:
+        tuple: (x, shots) arrays, or None if the session has no positions
+    """
+    positions = session["stats"]["position_history"]
+    if not positions:
+        return None
+
+    t = np.array([p["t"] for p in positions], dtype=np.float64)
+    x = np.array([p["x"] for p in positions], dtype=np.float64)
+    shot_times = np.array([a["timestamp"] for a in session["actions"] if a["type"] == "shoot"])
+    boss_hits = [a["timestamp"] for a in session["actions"]
+                 if a["type"] == "hit" and (a.get("data") or {}).get("target") == "boss"]
+
+    start = max(t[0], boss_hits[0] - lead_in) if boss_hits else t[0]
+    end = max(t[-1], shot_times.max() if len(shot_times) else t[-1])
+    frames = np.arange(start, end, 1.0 / fps)
+    if len(frames) < 2:
+        return None
+
+    xs = np.clip(np.rint(np.interp(frames, t, x)), 2, width - 7).astype(np.int64)
+    shots = np.zeros(len(frames), dtype=bool)
+    index = np.floor((shot_times - start) * fps).astype(np.int64)
+    shots[index[(index >= 0) & (index < len(frames))]] = True
+    return xs, shots
+
+def pack_traces(traces, segment=1800):
+    """
+    Split traces into segments and pad them into (n, T) arrays
+
+    Returns:
+        tuple: (xs, shots, lengths)
+    """
+    pieces = []
+    for xs, shots in traces:
+        for i in range(0, len(xs), segment):
+            if len(xs) - i >= 2:
+                pieces.append((xs[i:i + segment], shots[i:i + segment]))
+
+    longest = max((len(p[0]) for p in pieces), default=0)
+    packed_x = np.zeros((len(pieces), longest), dtype=np.int64)
+    packed_shots = np.zeros((len(pieces), longest), dtype=bool)
+    lengths = np.zeros(len(pieces), dtype=np.int64)
+    for row, (xs, shots) in enumerate(pieces):
+        packed_x[row, :len(xs)] = xs
+        packed_x[row, len(xs):] = xs[-1]
+        packed_shots[row, :len(shots)] = shots
+        lengths[row] = len(xs)
+    return packed_x, packed_shots, lengths
+
+def collect_transitions(kind, model_data, xs, shots, lengths, passes=1, epsilon=None, seed=None):
+    """
+    Replay player traces against the boss and record every transition
+
+    Runs in a worker process: the agent is rebuilt from model_data and
+    acts epsilon-greedily (the behavior policy) while the traced players
+    move and shoot exactly as recorded.
+
+    Args:
+        kind: Agent name (ai.agent)
+        model_data: Snapshot from the agent's model_data()
+        xs, shots, lengths: Packed traces (see pack_traces)
+        passes: Times each trace is replayed (side by side, as extra rows)
+        epsilon: Exploration rate of the behavior policy (agent's if None)
+        seed: RNG seed
+
+    Returns:
+        tuple: (observations, actions, rewards, next_observations, dones)
+    """
+    agent = create_agent(kind)
+    agent.load_model_data(model_data)
+    if epsilon is not None:
+        agent.epsilon = epsilon
+
+    xs, shots, lengths = (np.repeat(a, passes, axis=0) for a in (xs, shots, lengths))
+    rng = np.random.default_rng(seed)
+    env = VecBossEnv(len(lengths), seed=rng, max_steps=xs.shape[1])
+    env.play_traces(xs, shots, lengths)
+    obs = agent.observe_batch(env)
+
+    batches = []
+    for _ in range(int(lengths.max())):
+        actions = agent.choose_actions(obs, rng)
+        _, rewards, dones, _ = env.step(actions)
+        next_obs = agent.observe_batch(env)
+        batches.append((obs, actions, rewards, next_obs, dones))
+        obs = next_obs
+
+    # Feature vectors are stored as float32 to halve what the pool ships back
+    dtype = np.float32 if obs.dtype == np.float64 else obs.dtype
+    return (np.concatenate([b[0] for b in batches]).astype(dtype),
+            np.concatenate([b[1] for b in batches]),
+            np.concatenate([b[2] for b in batches]),
+            np.concatenate([b[3] for b in batches]).astype(dtype),
+            np.concatenate([b[4] for b in batches]))
+
+class OfflineTrainer:
+    """
+    Trains a boss agent from stored sessions instead of live fights.
+
+    Each session's player trace is replayed in a VecBossEnv against the
+    current boss policy (with exploration), spread across a process pool.
+    The pooled transitions are then fitted with a few rounds of fitted
+    Q-iteration (agent.fit_batch) and the result is saved where Boss
+    loads its model from.
+    """
+
+    def __init__(self, agent="tabular", store=None, workers=None, iterations=20,
+                 passes=2, epsilon=None, fps=30, seed=None, model_dir="models/saved_models"):
+        self.agent_kind = agent
+        self.store = store
+        self.model_dir = model_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.iterations = iterations
+        self.passes = passes
+        self.epsilon = epsilon
+        self.fps = fps
+        self.seed = seed
+
+    def load_traces(self, limit=None):
+        """Player traces of the stored sessions (None entries dropped)"""
+        store = self.store or SessionStore()
+        sessions = store.load_sessions(limit, types=["shoot", "hit"])
+        traces = [session_trace(session, self.fps) for session in sessions]
+        return len(sessions), [trace for trace in traces if trace is not None]
+
+    def collect(self, agent, xs, shots, lengths):
+        """Transitions of every trace, gathered across the worker pool"""
+        chunks = np.array_split(np.arange(len(lengths)), min(self.workers, len(lengths)))
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunks))
+        model_data = agent.model_data()
+
+        if len(chunks) == 1:
+            results = [collect_transitions(self.agent_kind, model_data, xs, shots, lengths,
+                                           self.passes, self.epsilon, seeds[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [pool.submit(collect_transitions, self.agent_kind, model_data,
+                                       xs[rows], shots[rows], lengths[rows],
+                                       self.passes, self.epsilon, seed)
+                           for rows, seed in zip(chunks, seeds)]
+                results = [future.result() for future in futures]
+
+        obs, actions, rewards, next_obs, dones = (np.concatenate(parts) for parts in zip(*results))
+        dtype = agent.observation_dtype
+        return obs.astype(dtype), actions, rewards, next_obs.astype(dtype), dones
+
+    def train(self, limit=None):
+        """
+        Train the boss agent from the stored sessions and save it
+
+        Args:
+            limit: Only use the N most recent sessions
+
+        Returns:
+            dict: sessions, segments, transitions, collect_sec, fit_sec,
+                  reward_per_step, td_error, model_path (None if nothing to learn from)
+        """
+        sessions, traces = self.load_traces(limit)
+        agent = create_agent(self.agent_kind, model_dir=self.model_dir)
+        agent.load_model()
+
+        report = {"sessions": sessions, "segments": 0, "transitions": 0,
+                  "collect_sec": 0.0, "fit_sec": 0.0, "reward_per_step": 0.0,
+                  "td_error": 0.0, "model_path": None}
+        if not traces:
+            return report
+
+        xs, shots, lengths = pack_traces(traces)
+        start = time.perf_counter()
+        obs, actions, rewards, next_obs, dones = self.collect(agent, xs, shots, lengths)
+        report["collect_sec"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(self.iterations):
+            td = agent.fit_batch(obs, actions, rewards, next_obs, dones)
+        report["fit_sec"] = time.perf_counter() - start
+
+        report.update({
+            "segments": len(lengths),
+            "transitions": len(actions),
+            "reward_per_step": float(rewards.mean()),
+            "td_error": float(np.abs(td).mean()) if self.iterations else 0.0,
+            "model_path": str(agent.save_model())
+        })
+        return report
@@ -1,8 +1,99 @@
 """Unsupervised learning for player pattern recognition"""
-import json
 import numpy as np
 from pathlib import Path
 from collections import defaultdict
+from .session_store import SessionStore
+from .columnar import ShardReader
+
+# Action types the profile analyses actually read
+PROFILE_ACTION_TYPES = ("move_left", "move_right", "shoot", "hit")
+
+def _weighted_percentile(values, weights, q):
+    """Percentile (inverted CDF) of sorted distinct values with weights"""
+    cumulative = np.cumsum(weights)
+    index = np.searchsorted(cumulative, cumulative[-1] * q / 100.0, side="left")
+    return float(values[min(index, len(values) - 1)])
+
+def _position_seconds(times, xs, same_session=None):
+    """
+    Time spent at each x column along position samples
+    
+    Positions are sampled on change and simplified, so samples are
+    irregular: each one counts for the time to the next sample of its
+    session, and a segment that moved several columns (a simplified
+    sweep) shares its time evenly among the columns it passed, as a
+    per-frame recording would have.
+    
+    Args:
+        times, xs: Samples, ordered by time within each session
+        same_session: bool array, pair i/i+1 from the same session
+                      (all pairs if None)
+    
+    Returns:
+        tuple: (columns, seconds) arrays
+    """
+    times = np.asarray(times, dtype=float)
+    xs = np.asarray(xs, dtype=np.int64)
+    if len(times) < 2:
+        return xs[:0], times[:0]
+        
+    dt = np.diff(times)
+    if same_session is not None:
+        dt = np.where(same_session, dt, 0.0)
+    keep = dt > 0
+    start, dx, dt = xs[:-1][keep], np.diff(xs)[keep], dt[keep]
+    
+    steps = np.maximum(np.abs(dx), 1)
+    first = np.repeat(np.cumsum(steps) - steps, steps)
+    offset = np.arange(first.size) - first
+    columns = np.repeat(start, steps) + np.repeat(np.sign(dx), steps) * offset
+    return columns, np.repeat(dt / steps, steps)
+
+def _add_positions(histogram, columns, seconds):
+    """Add the time spent at each x column to a {"x": seconds} histogram"""
+    values, inverse = np.unique(columns, return_inverse=True)
+    seconds = np.bincount(inverse, weights=seconds, minlength=len(values))
+    for x, total in zip(values.tolist(), seconds.tolist()):
+        key = str(x)
+        histogram[key] = histogram.get(key, 0) + total
+
+def _position_stats(histogram):
+    """Positioning profile (see analyze_positioning) from a {"x": seconds} histogram"""
+    patterns = {
+        "preferred_x_range": (0, 0),
+        "avg_position": 0,
+        "mobility": 0  # How much player moves around
+    }
+    if not histogram:
+        return patterns
+        
+    xs = np.array([int(x) for x in histogram], dtype=float)
+    weights = np.array(list(histogram.values()), dtype=float)
+    order = np.argsort(xs)
+    xs, weights = xs[order], weights[order]
+    
+    mean = np.average(xs, weights=weights)
+    patterns["avg_position"] = mean
+    patterns["preferred_x_range"] = (
+        _weighted_percentile(xs, weights, 25),
+        _weighted_percentile(xs, weights, 75)
+    )
+    patterns["mobility"] = np.sqrt(np.average((xs - mean) ** 2, weights=weights))
+    return patterns
+
+def _session_relative(chunk, mask):
+    """
+    Select events, order them by session then time and make times session-relative
+    
+    Returns:
+        tuple: (relative times, bool array marking pairs from the same session)
+    """
+    times = np.asarray(chunk["event_time"][mask])
+    sessions = np.asarray(chunk["event_session"][mask])
+    order = np.lexsort((times, sessions))
+    times, sessions = times[order], sessions[order]
+    rel = times - np.asarray(chunk["session_start"])[sessions]
+    return rel, sessions[1:] == sessions[:-1]
 
 class PatternAnalyzer:
     """
@@ -10,27 +101,25 @@ class PatternAnalyzer:
     Identifies play styles, movement patterns, and shooting habits.
     """
     
-    def __init__(self, data_dir="data/player_data"):
+    def __init__(self, data_dir="data/player_data", store=None):
         self.data_dir = Path(data_dir)
+        self.store = store or SessionStore(self.data_dir)
         self.patterns = {
             "movement": defaultdict(int),
             "shooting": defaultdict(int),
             "positioning": defaultdict(int)
         }
         
-    def load_sessions(self, limit=None):
-        """Load player session data from files"""
-        sessions = []
-        session_files = sorted(self.data_dir.glob("session_*.json"))
+    def load_sessions(self, limit=None, types=None, with_data=True):
+        """
+        Load player session data from the session store
         
-        if limit:
-            session_files = session_files[-limit:]
-            
-        for filepath in session_files:
-            with open(filepath, 'r') as f:
-                sessions.append(json.load(f))
-                
-        return sessions
+        Args:
+            limit: Only the N most recent sessions
+            types: Only load these action types (all if None)
+            with_data: Decode per-action data payloads
+        """
+        return self.store.load_sessions(limit=limit, types=types, with_data=with_data)
         
     def analyze_movement_patterns(self, sessions):
         """
@@ -120,28 +209,18 @@ class PatternAnalyzer:
         - Preferred screen zones
         - Movement range
         - Defensive vs aggressive positioning
-        """
-        patterns = {
-            "preferred_x_range": (0, 0),
-            "avg_position": 0,
-            "mobility": 0  # How much player moves around
-        }
         
-        all_positions = []
+        Each position sample counts for as long as it held (see
+        _position_seconds), not once.
+        """
+        histogram = {}
         
         for session in sessions:
             positions = session.get("stats", {}).get("position_history", [])
-            all_positions.extend([p["x"] for p in positions])
-            
-        if all_positions:
-            patterns["avg_position"] = np.mean(all_positions)
-            patterns["preferred_x_range"] = (
-                np.percentile(all_positions, 25),
-                np.percentile(all_positions, 75)
-            )
-            patterns["mobility"] = np.std(all_positions)
+            _add_positions(histogram, *_position_seconds([p["t"] for p in positions],
+                                                         [p["x"] for p in positions]))
             
-        return patterns
+        return _position_stats(histogram)
         
     def get_player_profile(self, recent_sessions=10):
         """
@@ -150,7 +229,9 @@ class PatternAnalyzer:
         Returns:
             dict: Player profile with movement, shooting, and positioning patterns
         """
-        sessions = self.load_sessions(limit=recent_sessions)
+        sessions = self.load_sessions(limit=recent_sessions,
+                                      types=PROFILE_ACTION_TYPES,
+                                      with_data=False)
         
         if not sessions:
             return None
@@ -164,6 +245,197 @@ class PatternAnalyzer:
         
         return profile
         
+    def summarize_sessions(self, sessions):
+        """
+        Reduce sessions to additive counters
+        
+        Summaries can be merged and turned back into a profile, which is
+        what lets old raw sessions be compacted into daily aggregates.
+        
+        Returns:
+            dict: Mergeable summary (see merge_summaries)
+        """
+        summary = {
+            "sessions": len(sessions),
+            "duration": 0.0,
+            "move_left": 0,
+            "move_right": 0,
+            "move_intervals": [0, 0.0],          # count, sum
+            "shots": 0,
+            "hits": 0,
+            "shot_intervals": [0, 0.0, 0.0],     # count, sum, sum of squares
+            "positions": {}                      # x -> seconds spent there
+        }
+        
+        for session in sessions:
+            summary["duration"] += session.get("duration") or 0.0
+            last_move_time = 0
+            last_shot_time = 0
+            
+            for action in session["actions"]:
+                if action["type"] in ("move_left", "move_right"):
+                    summary[action["type"]] += 1
+                    summary["move_intervals"][0] += 1
+                    summary["move_intervals"][1] += action["timestamp"] - last_move_time
+                    last_move_time = action["timestamp"]
+                    
+                elif action["type"] == "shoot":
+                    summary["shots"] += 1
+                    if last_shot_time > 0:
+                        interval = action["timestamp"] - last_shot_time
+                        summary["shot_intervals"][0] += 1
+                        summary["shot_intervals"][1] += interval
+                        summary["shot_intervals"][2] += interval * interval
+                    last_shot_time = action["timestamp"]
+                    
+                elif action["type"] == "hit":
+                    summary["hits"] += 1
+                    
+            positions = session.get("stats", {}).get("position_history", [])
+            _add_positions(summary["positions"], *_position_seconds([p["t"] for p in positions],
+                                                                    [p["x"] for p in positions]))
+                
+        return summary
+        
+    def merge_summaries(self, summaries):
+        """Add several summaries together"""
+        merged = self.summarize_sessions([])
+        
+        for summary in summaries:
+            merged["sessions"] += summary["sessions"]
+            merged["duration"] += summary["duration"]
+            for key in ("move_left", "move_right", "shots", "hits"):
+                merged[key] += summary[key]
+            for key in ("move_intervals", "shot_intervals"):
+                merged[key] = [a + b for a, b in zip(merged[key], summary[key])]
+            for x, count in summary["positions"].items():
+                merged["positions"][x] = merged["positions"].get(x, 0) + count
+                
+        return merged
+        
+    def profile_from_summary(self, summary):
+        """
+        Build a player profile from a summary
+        
+        Returns:
+            dict: Same layout as get_player_profile()
+        """
+        movement = {
+            "left_preference": summary["move_left"],
+            "right_preference": summary["move_right"],
+            "avg_move_interval": 0,
+            "preferred_zones": []
+        }
+        count, total = summary["move_intervals"]
+        if count:
+            movement["avg_move_interval"] = total / count
+            
+        shooting = {
+            "avg_shot_interval": 0,
+            "accuracy": 0,
+            "burst_shooter": False,
+            "shots_per_second": 0
+        }
+        if summary["shots"] > 0:
+            shooting["accuracy"] = summary["hits"] / summary["shots"]
+        count, total, total_sq = summary["shot_intervals"]
+        if count:
+            mean = total / count
+            shooting["avg_shot_interval"] = mean
+            shooting["shots_per_second"] = 1.0 / mean if mean > 0 else 0
+            shooting["burst_shooter"] = (total_sq / count - mean * mean) > 0.5
+            
+        return {
+            "movement": movement,
+            "shooting": shooting,
+            "positioning": _position_stats(summary["positions"]),
+            "total_sessions_analyzed": summary["sessions"]
+        }
+        
+    def get_long_term_profile(self, start_day=None):
+        """
+        Profile over compacted daily aggregates plus all raw sessions
+        
+        Args:
+            start_day: Ignore aggregates before this day (YYYY-MM-DD)
+        """
+        summaries = [summary for _, summary in self.store.aggregates(start_day=start_day)]
+        summaries.append(self.summarize_sessions(
+            self.load_sessions(types=PROFILE_ACTION_TYPES, with_data=False)
+        ))
+        
+        merged = self.merge_summaries(summaries)
+        if merged["sessions"] == 0:
+            return None
+        return self.profile_from_summary(merged)
+        
+    def summarize_shards(self, shard_dir="data/shards", start=None, end=None):
+        """
+        Build a summary straight from memory-mapped columnar shards
+        
+        Only the event code/time/session and position time/x/session columns are
+        touched, and shards outside [start, end) are skipped entirely.
+        Sessions are selected by start time like load_sessions(), so the
+        result matches summarize_sessions() over the same sessions.
+        
+        Args:
+            shard_dir: Directory written by ShardWriter
+            start, end: Session start time range (epoch seconds)
+            
+        Returns:
+            dict: Mergeable summary (see summarize_sessions)
+        """
+        reader = ShardReader(shard_dir)
+        codes = reader.event_codes
+        summary = self.summarize_sessions([])
+        columns = ["event_time", "event_code", "event_session", "session_duration"]
+        
+        for chunk in reader.scan(columns, start, end, by_session=True):
+            code = chunk["event_code"]
+            summary["sessions"] += int(np.count_nonzero(chunk["session_mask"]))
+            summary["duration"] += float(chunk["session_duration"][chunk["session_mask"]].sum())
+            
+            is_left = code == codes["move_left"]
+            is_right = code == codes["move_right"]
+            is_shot = code == codes["shoot"]
+            summary["move_left"] += int(np.count_nonzero(is_left))
+            summary["move_right"] += int(np.count_nonzero(is_right))
+            summary["shots"] += int(np.count_nonzero(is_shot))
+            summary["hits"] += int(np.count_nonzero(code == codes["hit"]))
+            
+            # Move intervals count from session start, like analyze_movement_patterns
+            rel, same = _session_relative(chunk, is_left | is_right)
+            if len(rel):
+                intervals = np.concatenate([rel[:1], np.where(same, np.diff(rel), rel[1:])])
+                summary["move_intervals"][0] += len(intervals)
+                summary["move_intervals"][1] += float(intervals.sum())
+                
+            # Shot intervals only between shots of the same session, and
+            # like analyze_shooting_patterns not after a shot at time 0
+            rel, same = _session_relative(chunk, is_shot)
+            if len(rel) > 1:
+                intervals = np.diff(rel)[same & (rel[:-1] > 0)]
+                summary["shot_intervals"][0] += len(intervals)
+                summary["shot_intervals"][1] += float(intervals.sum())
+                summary["shot_intervals"][2] += float((intervals * intervals).sum())
+                
+        for chunk in reader.scan(["pos_time", "pos_x", "pos_session"], start, end, by_session=True):
+            sessions = np.asarray(chunk["pos_session"])
+            order = np.lexsort((np.asarray(chunk["pos_time"]), sessions))
+            rel = np.asarray(chunk["pos_time"])[order] - np.asarray(chunk["session_start"])[sessions[order]]
+            same = sessions[order][1:] == sessions[order][:-1]
+            _add_positions(summary["positions"],
+                           *_position_seconds(rel, np.asarray(chunk["pos_x"])[order], same))
+                
+        return summary
+        
+    def get_shard_profile(self, shard_dir="data/shards", start=None, end=None):
+        """Player profile over columnar shards (see summarize_shards)"""
+        summary = self.summarize_shards(shard_dir, start, end)
+        if summary["sessions"] == 0:
+            return None
+        return self.profile_from_summary(summary)
+        
     def predict_next_action(self, current_state):
         """
         Predict player's likely next action based on patterns
@@ -0,0 +1,144 @@
+"""Monte-Carlo lookahead planning for the boss"""
+import time
+import numpy as np
+from .rl_agent import ACTIONS
+from .vec_env import VecBossEnv
+
+class LookaheadPlanner:
+    """
+    Picks boss actions by simulating ahead instead of reading the Q-table.
+
+    A decision loads the current SimSnapshot into a VecBossEnv with
+    `rollouts` rows per candidate action, applies the candidate, then
+    plays on with the boss agent's policy (or uniformly random actions)
+    for `horizon` frames while scripted players fight back. The action
+    with the best mean discounted return wins.
+
+    Full-horizon rollouts cost several frames' budget, so they are carried
+    across frames: each plan() call advances the pending rollouts until
+    budget_ms is spent (at least one step) and returns None until they
+    reach the horizon. The boss plays its agent's policy meanwhile, and a
+    new decision starts from the frame after the last one. With
+    steps_per_frame set, each call advances exactly that many steps
+    instead, so when decisions land doesn't depend on timing (seeded runs).
+    """
+
+    def __init__(self, budget_ms=4.0, horizon=40, rollouts=8, discount=0.95, seed=None,
+                 steps_per_frame=None, patterns=None):
+        self.budget = budget_ms / 1000.0
+        self.horizon = horizon
+        self.rollouts = rollouts
+        self.discount = discount
+        self.steps_per_frame = steps_per_frame
+        self.patterns = patterns
+        self.rng = np.random.default_rng(seed)
+
+        self.candidates = np.repeat(np.arange(len(ACTIONS)), rollouts)
+        self._pending = None
+
+        # Statistics
+        self.decisions = 0
+        self.frames = 0
+        self.total_rollouts = 0
+        self.total_steps = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def plan(self, snapshot, agent=None, pattern="balanced"):
+        """
+        Advance the lookahead by one frame's budget
+
+        Args:
+            snapshot: SimSnapshot of the game (must contain the boss);
+                      only read when a new decision starts
+            agent: BossRLAgent whose policy continues the rollouts
+            pattern: Player style assumed for the rollouts
+
+        Returns:
+            str or None: Action name once the rollouts reached the
+                         horizon, None while they are still running
+        """
+        start = time.perf_counter()
+        deadline = start + self.budget
+
+        if self._pending is None:
+            n = len(self.candidates)
+            self._pending = {
+                "env": VecBossEnv.from_snapshot(snapshot, n, pattern, seed=self.rng, horizon=self.horizon,
+                                                patterns=self.patterns),
+                "returns": np.zeros(n),
+                "finished": np.zeros(n, dtype=bool),
+                "actions": self.candidates,
+                "weight": 1.0,
+                "steps": 0
+            }
+        pending = self._pending
+        env = pending["env"]
+        steps = 0
+
+        while True:
+            _, rewards, dones, _ = env.step(pending["actions"])
+            steps += 1
+            # Rows that finished were reset by the env; stop counting them
+            pending["returns"] += np.where(pending["finished"], 0.0, pending["weight"] * rewards)
+            pending["finished"] |= dones
+            pending["weight"] *= self.discount
+            pending["steps"] += 1
+            if pending["steps"] >= self.horizon or pending["finished"].all():
+                break
+            pending["actions"] = self._rollout_actions(env, agent)
+            if self.steps_per_frame is not None:
+                if steps >= self.steps_per_frame:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+
+        action = None
+        if pending["steps"] >= self.horizon or pending["finished"].all():
+            action = self._decide(pending)
+
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        return action
+
+    def reset(self):
+        """Drop rollouts in progress (e.g. when a new fight starts)"""
+        self._pending = None
+
+    def _decide(self, pending):
+        """Best candidate of a finished batch of rollouts"""
+        self._pending = None
+        self.decisions += 1
+        self.total_rollouts += len(self.candidates)
+        self.total_steps += pending["steps"]
+
+        # Every candidate got the same number of rollouts, so sums compare like
+        # means; ties (e.g. nothing happens within the horizon) are broken randomly
+        totals = np.bincount(self.candidates, weights=pending["returns"], minlength=len(ACTIONS))
+        best = np.flatnonzero(totals >= totals.max() - 1e-9)
+        return ACTIONS[int(self.rng.choice(best))]
+
+    def _rollout_actions(self, env, agent):
+        if agent is not None:
+            return agent.choose_actions(agent.observe_batch(env), self.rng)
+        return self.rng.integers(len(ACTIONS), size=env.n)
+
+    def stats(self):
+        """
+        Planning cost summary
+
+        Returns:
+            dict: decisions, rollouts_per_decision, steps_per_decision,
+                  frames_per_decision, avg_ms and max_ms (per frame)
+        """
+        decisions = max(self.decisions, 1)
+        return {
+            "decisions": self.decisions,
+            "rollouts_per_decision": self.total_rollouts / decisions,
+            "steps_per_decision": self.total_steps / decisions,
+            "frames_per_decision": self.frames / decisions,
+            "avg_ms": self.total_time / max(self.frames, 1) * 1000,
+            "max_ms": self.max_time * 1000
+        }
@@ -0,0 +1,186 @@
+"""Per-player boss models, profiles and session partitions"""
+import re
+from collections import OrderedDict
+from pathlib import Path
+from .linear_agent import create_agent
+from .pattern_analyzer import PatternAnalyzer
+from .session_store import SessionStore
+
+PLAYER_NAME = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+class PlayerProfile:
+    """
+    Everything the boss knows about one player, in one directory:
+    models/ (one file per agent kind), sessions/sessions.db and
+    checkpoints/. The session store, pattern analyzer and agents are
+    opened on first use and kept until close().
+    """
+
+    def __init__(self, name, directory):
+        self.name = name
+        self.directory = Path(directory)
+        self.model_dir = self.directory / "models"
+        self.data_dir = self.directory / "sessions"
+        self.checkpoint_dir = self.directory / "checkpoints"
+
+        self._store = None
+        self._analyzer = None
+        self._agents = {}
+        self.pins = 0
+
+    @property
+    def store(self):
+        """This player's SessionStore"""
+        if self._store is None:
+            self._store = SessionStore(self.data_dir, auto_import=False)
+        return self._store
+
+    @property
+    def analyzer(self):
+        """PatternAnalyzer over this player's sessions only"""
+        if self._analyzer is None:
+            self._analyzer = PatternAnalyzer(self.data_dir, store=self.store)
+        return self._analyzer
+
+    def agent(self, kind="tabular"):
+        """
+        This player's boss agent, loaded from disk the first time
+
+        Returns:
+            BossRLAgent or LinearQAgent: Used by the player's one running
+                                         game (see PlayerStore.acquire)
+        """
+        if kind not in self._agents:
+            agent = create_agent(kind, model_dir=self.model_dir)
+            agent.load_model()
+            self._agents[kind] = agent
+        return self._agents[kind]
+
+    def profile(self, recent_sessions=10):
+        """Live play-style profile from the player's recent sessions"""
+        return self.analyzer.get_player_profile(recent_sessions)
+
+    def save(self):
+        """Save every loaded agent"""
+        for agent in self._agents.values():
+            agent.save_model()
+
+    def close(self):
+        """Release the database connection and the loaded models"""
+        if self._store is not None:
+            self._store.close()
+        self._store = None
+        self._analyzer = None
+        self._agents = {}
+
+class PlayerStore:
+    """
+    Player-keyed profiles under one root directory, with an LRU cache.
+
+    At most `capacity` profiles stay open; opening another closes the
+    least recently used one that no running game has acquired. Profiles
+    are lazy, so a cached player costs nothing beyond what its games
+    actually touched.
+    """
+
+    def __init__(self, root="data/players", capacity=8):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self._cache = OrderedDict()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(name):
+        """
+        Validate a player name (it becomes a directory name)
+
+        Raises:
+            ValueError: Not 1-32 letters, digits, '-' or '_'
+        """
+        if not isinstance(name, str) or not PLAYER_NAME.match(name):
+            raise ValueError(f"Invalid player name {name!r} (use 1-32 letters, digits, '-' or '_')")
+        return name.lower()
+
+    def players(self):
+        """Names of every player with a profile on disk"""
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def get(self, name, pin=False):
+        """
+        A player's profile, opened (lazily) if it isn't cached
+
+        Args:
+            name: Player name
+            pin: Keep the profile cached until release()
+
+        Returns:
+            PlayerProfile
+        """
+        key = self.key(name)
+        profile = self._cache.get(key)
+        if profile is None:
+            self.misses += 1
+            profile = PlayerProfile(key, self.root / key)
+            self._cache[key] = profile
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        profile.pins += pin
+        self._evict(keep=key)
+        return profile
+
+    def acquire(self, name):
+        """
+        get() a profile for a game and keep it cached until release()
+
+        A player plays one game at a time: the profile's agents learn in
+        place (current state, last action, RNG), so two games at once
+        would corrupt each other's decisions and training.
+
+        Raises:
+            ValueError: Invalid player name, or the player is already in a game
+        """
+        profile = self._cache.get(self.key(name))
+        if profile is not None and profile.pins:
+            raise ValueError(f"Player {name!r} is already in a game")
+        return self.get(name, pin=True)
+
+    def release(self, profile):
+        """Let an acquired profile be evicted again"""
+        profile.pins = max(0, profile.pins - 1)
+        self._evict()
+
+    def _evict(self, keep=None):
+        # Least recently used first; profiles in use (and the one just
+        # requested) are skipped, so the cache can briefly exceed its capacity
+        excess = len(self._cache) - self.capacity
+        for key in list(self._cache):
+            if excess <= 0:
+                break
+            profile = self._cache[key]
+            if profile.pins == 0 and key != keep:
+                profile.close()
+                del self._cache[key]
+                self.evictions += 1
+                excess -= 1
+
+    def stats(self):
+        """
+        Cache summary
+
+        Returns:
+            dict: cached, hits, misses, evictions
+        """
+        return {"cached": len(self._cache), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+    def close(self):
+        """Close every cached profile"""
+        for profile in self._cache.values():
+            profile.close()
+        self._cache.clear()
@@ -0,0 +1,158 @@
+"""Prioritized experience replay for the boss agents"""
+import time
+import numpy as np
+
+class SumTree:
+    """
+    Binary tree of priorities in one flat array; each node holds the sum
+    of its children, so sampling proportionally to priority and updating
+    a priority are O(log n). Batches of leaves are updated and sampled
+    level by level with NumPy instead of one Python walk per item.
+    """
+
+    def __init__(self, capacity):
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.size = size
+        self.depth = size.bit_length() - 1
+        self.tree = np.zeros(2 * size)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        """Set the priorities of leaves (data indices)"""
+        nodes = np.asarray(indices) + self.size
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """Data index whose cumulative priority range contains each value"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            right = values >= left
+            values -= left * right
+            nodes = 2 * nodes + right
+        return nodes - self.size
+
+    def priorities(self, indices):
+        return self.tree[np.asarray(indices) + self.size]
+
+class PrioritizedReplay:
+    """
+    Fixed-capacity ring buffer of (state, action, reward, next_state, done)
+    transitions with proportional prioritized sampling.
+
+    States are stored in whatever form the agent consumes them (state
+    indices for BossRLAgent, feature vectors for LinearQAgent). Sampling
+    probability is |TD error|^alpha; importance-sampling weights with
+    exponent beta correct the resulting bias. New transitions get the
+    highest priority seen so far, so each is replayed at least once soon.
+    """
+
+    def __init__(self, capacity, observation_shape=(), observation_dtype=np.int64,
+                 batch_size=64, alpha=0.6, beta=0.4, epsilon=0.01, seed=None):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros((capacity,) + tuple(observation_shape), dtype=observation_dtype)
+        self.next_states = np.zeros_like(self.states)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.tree = SumTree(capacity)
+
+        self.position = 0
+        self.size = 0
+        self.max_priority = 1.0
+
+        # Statistics
+        self.added = 0
+        self.updates = 0
+
+    @classmethod
+    def for_agent(cls, agent_class, capacity, **kwargs):
+        """Buffer shaped for an agent class's observations"""
+        return cls(capacity, agent_class.observation_shape, agent_class.observation_dtype, **kwargs)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done=False):
+        """Store one transition, overwriting the oldest when full"""
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.tree.update([i], [self.max_priority])
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.added += 1
+
+    def sample(self, batch_size):
+        """
+        Draw a batch proportionally to priority (one draw per equal-mass segment)
+
+        Returns:
+            tuple: (indices, states, actions, rewards, next_states, dones, weights)
+        """
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        probabilities = self.tree.priorities(indices) / total
+        weights = (self.size * probabilities) ** -self.beta
+        weights /= weights.max()
+
+        return (indices, self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices], weights)
+
+    def update_priorities(self, indices, td_errors):
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+    def learn(self, agent):
+        """
+        One batched replay update of an agent
+
+        Returns:
+            bool: False if the buffer doesn't hold a batch yet
+        """
+        if self.size < self.batch_size:
+            return False
+        indices, states, actions, rewards, next_states, dones, weights = self.sample(self.batch_size)
+        td_errors = agent.update_batch(states, actions, rewards, next_states, dones, weights=weights)
+        self.update_priorities(indices, td_errors)
+        self.updates += 1
+        return True
+
+    def learn_for(self, agent, seconds):
+        """
+        Replay until a time budget is spent (e.g. a frame's idle time)
+
+        Returns:
+            int: Batches replayed
+        """
+        deadline = time.perf_counter() + seconds
+        batches = 0
+        while time.perf_counter() < deadline and self.learn(agent):
+            batches += 1
+        return batches
@@ -0,0 +1,128 @@
+"""Session retention: compacts old raw sessions into daily aggregates"""
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from .session_store import SessionStore
+from .pattern_analyzer import PatternAnalyzer
+from .columnar import ShardWriter
+
+class SessionCompactor:
+    """
+    Rolls raw sessions older than the retention window into per-day
+    summaries and deletes their actions and positions.
+
+    Work is done in small batches, each in its own transaction, so the
+    job can run in the background and be stopped between batches.
+    """
+
+    def __init__(self, data_dir="data/player_data", retention_days=30, batch_size=25,
+                 shard_dir=None):
+        self.data_dir = Path(data_dir)
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        # When set, raw events are archived to columnar shards before deletion
+        self.shard_dir = shard_dir
+
+        self.report = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self, now=None, max_batches=None):
+        """
+        Compact everything older than the retention window
+
+        Args:
+            now: Reference time (epoch seconds), defaults to time.time()
+            max_batches: Stop after this many batches (None = until done)
+
+        Returns:
+            dict: sessions, days, json_files and bytes_reclaimed
+        """
+        # Opened here so the background thread owns its own connection
+        store = SessionStore(self.data_dir, auto_import=False)
+        analyzer = PatternAnalyzer(self.data_dir, store=store)
+
+        report = {"sessions": 0, "days": 0, "json_files": 0, "bytes_reclaimed": 0}
+        size_before = store.disk_usage()
+
+        # Legacy JSON files are moved into the store so the directory stops growing
+        json_files = list(self.data_dir.glob("session_*.json"))
+        json_bytes = sum(f.stat().st_size for f in json_files)
+        store.import_json_dir(self.data_dir, remove=True)
+        report["json_files"] = len(json_files)
+        size_before += json_bytes
+
+        # Only sessions already in a shard may be deleted when archiving
+        archived_rowid = None
+        if self.shard_dir:
+            writer = ShardWriter(self.shard_dir)
+            report["archived"] = writer.export_from_store(store)
+            archived_rowid = writer.manifest["exported_rowid"]
+
+        cutoff = (now if now is not None else time.time()) - self.retention_days * 86400
+        days_touched = set()
+        batches = 0
+
+        while not self._stop.is_set():
+            if max_batches is not None and batches >= max_batches:
+                break
+
+            # Compacted rows are deleted, so each query returns the next batch
+            old = store.sessions(limit=self.batch_size, end=cutoff, through_id=archived_rowid)
+            if not old:
+                break
+
+            by_day = {}
+            for meta in old:
+                day = datetime.fromtimestamp(meta["start_time"]).strftime("%Y-%m-%d")
+                by_day.setdefault(day, []).append(meta)
+
+            summaries = {}
+            for day, metas in by_day.items():
+                sessions = [store.load_session(meta["session_id"]) for meta in metas]
+                summary = analyzer.summarize_sessions(sessions)
+                existing = store.get_aggregate(day)
+                if existing:
+                    summary = analyzer.merge_summaries([existing, summary])
+                summaries[day] = summary
+                days_touched.add(day)
+
+            # Aggregates and deletions commit together so a crash can't double count
+            store.replace_with_aggregates(summaries, [meta["id"] for meta in old])
+            report["sessions"] += len(old)
+            batches += 1
+
+        if report["sessions"] or report["json_files"]:
+            store.reclaim_space()
+
+        report["days"] = len(days_touched)
+        report["bytes_reclaimed"] = max(0, size_before - store.disk_usage())
+        store.close()
+
+        self.report = report
+        return report
+
+    def start(self):
+        """Run compaction on a background daemon thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="session-compactor", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Ask a background run to stop after the current batch"""
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for a background run to finish
+
+        Returns:
+            dict or None: Report, or None if still running / never started
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return None
+        return self.report
@@ -1,7 +1,36 @@
 """Reinforcement Learning agent for adaptive boss behavior"""
+import itertools
 import numpy as np
 import json
 from pathlib import Path
+from .checkpoint import atomic_write_json
+from ..utils.rng import RandomStream
+
+# Discrete state components, in state index order
+RELATIVE_POSITIONS = ["left", "center", "right"]
+DISTANCES = ["close", "medium", "far"]
+PLAYER_PATTERNS = ["balanced", "aggressive", "defensive"]
+STATE_KEYS = list(itertools.product(RELATIVE_POSITIONS, DISTANCES, PLAYER_PATTERNS))
+STATE_INDEX = {key: i for i, key in enumerate(STATE_KEYS)}
+
+# Action space for boss
+ACTIONS = [
+    "move_left",
+    "move_right",
+    "shoot",
+    "shoot_burst",
+    "defensive",
+    "aggressive"
+]
+
+# Reward per game event, shared by every boss agent
+REWARDS = {
+    "hit_player": 10.0,      # Successfully hit player
+    "missed": -2.0,          # Missed shot
+    "got_hit": -5.0,         # Boss got hit
+    "player_dodged": -1.0,   # Player dodged attack
+    "survived": 1.0          # Boss survived a turn
+}
 
 class BossRLAgent:
     """
@@ -9,6 +38,13 @@ class BossRLAgent:
     The boss adapts its behavior based on player patterns.
     """
     
+    # Batched/replayed observations are STATE_KEYS indices
+    observation_shape = ()
+    observation_dtype = np.int64
+    
+    # Shape of policy_parameters() (shared with a learner process)
+    policy_shape = (len(STATE_KEYS), len(ACTIONS))
+    
     def __init__(self, model_dir="models/saved_models"):
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
@@ -22,18 +58,17 @@ class BossRLAgent:
         self.epsilon = 0.2  # Exploration rate
         
         # Action space for boss
-        self.actions = [
-            "move_left",
-            "move_right",
-            "shoot",
-            "shoot_burst",
-            "defensive",
-            "aggressive"
-        ]
+        self.actions = list(ACTIONS)
         
         self.current_state = None
         self.last_action = None
         
+        # Exploration stream (Boss hands in the run's "ai" stream)
+        self.rng = RandomStream()
+        
+        # Dense copy of the Q-table over STATE_KEYS for batched updates
+        self._dense = None
+        
     def get_state_key(self, game_state):
         """
         Convert game state to a hashable state key
@@ -74,9 +109,9 @@ class BossRLAgent:
         self.current_state = state_key
         
         # Epsilon-greedy exploration
-        if np.random.random() < self.epsilon:
+        if self.rng.random() < self.epsilon:
             # Explore: random action
-            action = np.random.choice(self.actions)
+            action = self.rng.choice(self.actions)
         else:
             # Exploit: best known action
             if state_key not in self.q_table:
@@ -87,6 +122,11 @@ class BossRLAgent:
         self.last_action = action
         return action
         
+    def observe_action(self, game_state, action):
+        """Record an action chosen elsewhere (e.g. by a planner) so update() learns from it"""
+        self.current_state = self.get_state_key(game_state)
+        self.last_action = action
+        
     def update(self, reward, next_game_state):
         """
         Update Q-table based on reward
@@ -114,7 +154,128 @@ class BossRLAgent:
         )
         
         self.q_table[self.current_state][self.last_action] = new_q
+        self._dense = None
+        
+    @staticmethod
+    def state_indices(player_x, boss_x, patterns):
+        """
+        Vectorized get_state_key: index into STATE_KEYS for each row
+        
+        Args:
+            player_x, boss_x: Arrays of x positions
+            patterns: Array of PLAYER_PATTERNS indices
+            
+        Returns:
+            np.ndarray: State indices
+        """
+        player_zone = (np.asarray(player_x) / 10).astype(np.int64)
+        boss_zone = (np.asarray(boss_x) / 10).astype(np.int64)
+        
+        relative = np.sign(player_zone - boss_zone) + 1    # left, center, right
+        distance = np.abs(player_zone - boss_zone)
+        distance_category = (distance > 2).astype(np.int64) + (distance > 4)
+        
+        return (relative * len(DISTANCES) + distance_category) * len(PLAYER_PATTERNS) + patterns
+        
+    def current_observation(self):
+        """The last chosen-for state as a batch observation (for replay)"""
+        return STATE_INDEX[self.current_state]
+        
+    def observe_batch(self, env):
+        """Batched observations of a VecBossEnv in this agent's input format"""
+        return env.observe()
+        
+    def dense_q_table(self):
+        """Q-values as a (len(STATE_KEYS), len(actions)) array, kept in sync with q_table"""
+        if self._dense is None:
+            self._dense = np.zeros((len(STATE_KEYS), len(self.actions)))
+            for i, key in enumerate(STATE_KEYS):
+                row = self.q_table.get(key)
+                if row:
+                    self._dense[i] = [row.get(a, 0.0) for a in self.actions]
+        return self._dense
+        
+    def policy_parameters(self):
+        """The Q-values as one array (see dense_q_table)"""
+        return self.dense_q_table()
+        
+    def load_policy_parameters(self, params):
+        """
+        Replace the whole Q-table with a policy_parameters() array
+        
+        The new table is built aside and swapped in with one assignment,
+        so the agent never acts on a half-copied policy.
+        """
+        dense = np.array(params, dtype=np.float64).reshape(self.policy_shape)
+        self.q_table = {
+            key: dict(zip(self.actions, row)) for key, row in zip(STATE_KEYS, dense.tolist())
+        }
+        self._dense = dense
+        
+    def choose_actions(self, states, rng=None):
+        """
+        Epsilon-greedy actions for a batch of state indices
+        
+        Returns:
+            np.ndarray: Action indices into self.actions
+        """
+        rng = rng or self.rng.generator
+        actions = self.dense_q_table()[states].argmax(axis=1)
+        explore = rng.random(len(states)) < self.epsilon
+        actions[explore] = rng.integers(len(self.actions), size=int(explore.sum()))
+        return actions
+        
+    def update_batch(self, states, actions, rewards, next_states, dones=None, weights=None):
+        """
+        Q-learning update from a batch of transitions
         
+        Transitions that share a state-action pair are averaged into one
+        update, so a batch of lockstep environments moves the table as
+        far as a single step would rather than N times as far.
+        
+        Args:
+            states, actions, next_states: Index arrays
+            rewards: Reward array
+            dones: Optional bool array; terminal transitions don't bootstrap
+            weights: Optional importance-sampling weights (prioritized replay)
+            
+        Returns:
+            np.ndarray: TD error of each transition before the update
+        """
+        q = self.dense_q_table()
+        n_actions = len(self.actions)
+        
+        target = rewards + self.discount_factor * q[next_states].max(axis=1) * (
+            1.0 if dones is None else ~dones)
+        flat = states * n_actions + actions
+        td = target - q.reshape(-1)[flat]
+        
+        sums = np.bincount(flat, weights=td if weights is None else td * weights, minlength=q.size)
+        counts = np.bincount(flat, minlength=q.size)
+        touched = counts > 0
+        q.reshape(-1)[touched] += self.learning_rate * sums[touched] / counts[touched]
+        
+        # Mirror the touched rows into the dict Q-table
+        for i in np.unique(states).tolist():
+            self.q_table[STATE_KEYS[i]] = dict(zip(self.actions, q[i].tolist()))
+        return td
+        
+    def fit_batch(self, states, actions, rewards, next_states, dones=None):
+        """
+        One fitted Q-iteration step over a whole dataset
+        
+        Every (state, action) present moves exactly to the mean of its
+        targets under the current table (update_batch with step size 1).
+        
+        Returns:
+            np.ndarray: TD errors before the step
+        """
+        learning_rate, self.learning_rate = self.learning_rate, 1.0
+        try:
+            return self.update_batch(states, actions, rewards, next_states, dones)
+        finally:
+            self.learning_rate = learning_rate
+            
     def calculate_reward(self, event_type, game_state):
         """
         Calculate reward based on game events
@@ -126,34 +287,41 @@ class BossRLAgent:
         Returns:
             float: Reward value
         """
-        rewards = {
-            "hit_player": 10.0,      # Successfully hit player
-            "missed": -2.0,          # Missed shot
-            "got_hit": -5.0,         # Boss got hit
-            "player_dodged": -1.0,   # Player dodged attack
-            "survived": 1.0          # Boss survived a turn
-        }
+        return REWARDS.get(event_type, 0.0)
         
-        return rewards.get(event_type, 0.0)
-        
-    def save_model(self, filename="boss_model.json"):
-        """Save Q-table to file"""
-        filepath = self.model_dir / filename
+    def model_data(self):
+        """
+        Serializable snapshot of the model
         
+        The copy is independent of the live Q-table, so it can be written
+        from another thread while the agent keeps learning.
+        """
         # Convert tuple keys to strings for JSON serialization
         serializable_q_table = {
-            str(k): v for k, v in self.q_table.items()
+            str(k): dict(v) for k, v in self.q_table.items()
         }
         
-        model_data = {
+        return {
             "q_table": serializable_q_table,
             "learning_rate": self.learning_rate,
             "discount_factor": self.discount_factor,
             "epsilon": self.epsilon
         }
         
-        with open(filepath, 'w') as f:
-            json.dump(model_data, f, indent=2)
+    def save_model(self, filename="boss_model.json", model_data=None):
+        """
+        Save Q-table to file
+        
+        Args:
+            filename: File name inside model_dir
+            model_data: Snapshot from model_data() to write instead of the live model
+        """
+        filepath = self.model_dir / filename
+        if model_data is None:
+            model_data = self.model_data()
+        
+        # Atomic, so a crash mid-save can't leave a truncated model
+        atomic_write_json(filepath, model_data)
             
         return filepath
         
@@ -167,14 +335,20 @@ class BossRLAgent:
         with open(filepath, 'r') as f:
             model_data = json.load(f)
             
+        return self.load_model_data(model_data)
+        
+    def load_model_data(self, model_data):
+        """Adopt a model from model_data() (e.g. in a worker process)"""
         # Convert string keys back to tuples
+        # Own copies of the rows: model_data may be shared (GameServer)
         self.q_table = {
-            eval(k): v for k, v in model_data["q_table"].items()
+            eval(k): dict(v) for k, v in model_data["q_table"].items()
         }
         
         self.learning_rate = model_data.get("learning_rate", self.learning_rate)
         self.discount_factor = model_data.get("discount_factor", self.discount_factor)
         self.epsilon = model_data.get("epsilon", self.epsilon)
+        self._dense = None
         
         return True
         
@@ -0,0 +1,445 @@
+"""SQLite-backed storage for player behavior sessions"""
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL UNIQUE,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    duration REAL,
+    total_shots INTEGER NOT NULL DEFAULT 0,
+    total_moves INTEGER NOT NULL DEFAULT 0,
+    total_hits INTEGER NOT NULL DEFAULT 0,
+    total_deaths INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time);
+
+CREATE TABLE IF NOT EXISTS actions (
+    session INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    timestamp REAL NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_actions_session ON actions(session, timestamp);
+CREATE INDEX IF NOT EXISTS idx_actions_type ON actions(type, session, timestamp);
+
+CREATE TABLE IF NOT EXISTS positions (
+    session INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    t REAL NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_positions_session ON positions(session, t);
+
+CREATE TABLE IF NOT EXISTS daily_aggregates (
+    day TEXT PRIMARY KEY,
+    sessions INTEGER NOT NULL,
+    summary BLOB NOT NULL
+);
+"""
+
+class SessionStore:
+    """
+    Indexed session storage replacing one JSON file per session.
+
+    Session metadata, actions and position samples live in separate
+    tables so "last N sessions", time-range and per-event-type queries
+    only touch the rows they need.
+    """
+
+    def __init__(self, data_dir="data/player_data", filename="sessions.db", auto_import=True):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.data_dir / filename
+
+        is_new = not self.db_path.exists()
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if is_new:
+            # Lets compaction hand freed pages back to the filesystem
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+        # One-shot migration of legacy session_*.json files
+        if is_new and auto_import:
+            self.import_json_dir(self.data_dir)
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+    def save_session(self, session_data):
+        """
+        Store a complete session
+
+        Args:
+            session_data: Session dict as produced by BehaviorTracker
+
+        Returns:
+            str: Session id actually stored (suffixed if it collided)
+        """
+        stats = session_data.get("stats", {})
+        session_id = session_data["session_id"]
+
+        with self._lock, self.conn:
+            suffix = 0
+            while True:
+                candidate = session_id if suffix == 0 else f"{session_id}_{suffix}"
+                try:
+                    cur = self.conn.execute(
+                        "INSERT INTO sessions (session_id, start_time, end_time, duration, "
+                        "total_shots, total_moves, total_hits, total_deaths) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (candidate,
+                         session_data["start_time"],
+                         session_data.get("end_time"),
+                         session_data.get("duration"),
+                         stats.get("total_shots", 0),
+                         stats.get("total_moves", 0),
+                         stats.get("total_hits", 0),
+                         stats.get("total_deaths", 0))
+                    )
+                    break
+                except sqlite3.IntegrityError:
+                    suffix += 1
+
+            rowid = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO actions (session, timestamp, type, data) VALUES (?, ?, ?, ?)",
+                ((rowid, a["timestamp"], a["type"],
+                  json.dumps(a["data"]) if a.get("data") else None)
+                 for a in session_data.get("actions", []))
+            )
+            self.conn.executemany(
+                "INSERT INTO positions (session, t, x, y) VALUES (?, ?, ?, ?)",
+                ((rowid, p["t"], p["x"], p["y"])
+                 for p in stats.get("position_history", []))
+            )
+
+        return candidate
+
+    def _session_filter(self, limit=None, start=None, end=None, rowids=None, after_id=None,
+                        through_id=None):
+        """
+        Build a subquery selecting session rows by recency, time range and
+        insertion order, or exactly the given row ids
+        """
+        if rowids is not None:
+            return "SELECT value FROM json_each(?)", [json.dumps(list(rowids))]
+
+        clauses, params = [], []
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(int(after_id))
+        if through_id is not None:
+            clauses.append("id <= ?")
+            params.append(int(through_id))
+        if start is not None:
+            clauses.append("start_time >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("start_time < ?")
+            params.append(end)
+
+        sql = "SELECT id FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit:
+            sql += " ORDER BY start_time DESC LIMIT ?"
+            params.append(int(limit))
+
+        return sql, params
+
+    def _metadata(self, row):
+        """Convert a sessions row to a metadata dict"""
+        return {
+            "id": row[0],
+            "session_id": row[1],
+            "start_time": row[2],
+            "end_time": row[3],
+            "duration": row[4],
+            "stats": {
+                "total_shots": row[5],
+                "total_moves": row[6],
+                "total_hits": row[7],
+                "total_deaths": row[8]
+            }
+        }
+
+    def sessions(self, limit=None, start=None, end=None, rowids=None, after_id=None,
+                 through_id=None):
+        """
+        Get session metadata without loading actions or positions
+
+        Args:
+            limit: Only the N most recent sessions
+            start: Earliest session start time (epoch seconds)
+            end: Latest session start time (epoch seconds, exclusive)
+            rowids: Only these sessions (replaces the other filters)
+            after_id: Only sessions saved after the one with this row id
+                      (row ids only ever grow, whatever the start times)
+            through_id: Only sessions saved up to and including this row id
+
+        Returns:
+            list: Metadata dicts ordered oldest first
+        """
+        id_sql, params = self._session_filter(limit, start, end, rowids, after_id, through_id)
+        rows = self.conn.execute(
+            "SELECT id, session_id, start_time, end_time, duration, total_shots, "
+            "total_moves, total_hits, total_deaths FROM sessions "
+            f"WHERE id IN ({id_sql}) ORDER BY start_time",
+            params
+        ).fetchall()
+        return [self._metadata(row) for row in rows]
+
+    def last_sessions(self, n):
+        """Get metadata of the N most recent sessions"""
+        return self.sessions(limit=n)
+
+    def actions(self, types=None, limit=None, start=None, end=None, with_data=False, rowids=None):
+        """
+        Query actions across sessions
+
+        Args:
+            types: Iterable of action types to include (all if None)
+            limit: Only actions from the N most recent sessions
+            start, end: Session start time range (epoch seconds)
+            with_data: Decode the per-action data payload
+            rowids: Only these sessions (replaces limit/start/end)
+
+        Returns:
+            list: (session rowid, timestamp, type[, data]) tuples
+                  ordered by session and timestamp
+        """
+        id_sql, params = self._session_filter(limit, start, end, rowids)
+        columns = "session, timestamp, type" + (", data" if with_data else "")
+        sql = f"SELECT {columns} FROM actions WHERE session IN ({id_sql})"
+
+        if types is not None:
+            types = list(types)
+            sql += f" AND type IN ({', '.join('?' * len(types))})"
+            params = params + types
+
+        sql += " ORDER BY session, timestamp"
+        rows = self.conn.execute(sql, params).fetchall()
+
+        if with_data:
+            return [(s, t, k, json.loads(d) if d else {}) for s, t, k, d in rows]
+        return rows
+
+    def positions(self, limit=None, start=None, end=None, rowids=None):
+        """
+        Query position samples across sessions
+
+        Args:
+            rowids: Only these sessions (replaces limit/start/end)
+
+        Returns:
+            list: (session rowid, t, x, y) tuples ordered by session and time
+        """
+        id_sql, params = self._session_filter(limit, start, end, rowids)
+        return self.conn.execute(
+            f"SELECT session, t, x, y FROM positions WHERE session IN ({id_sql}) "
+            "ORDER BY session, t",
+            params
+        ).fetchall()
+
+    def load_sessions(self, limit=None, start=None, end=None, types=None, with_data=True,
+                      rowids=None):
+        """
+        Rebuild session dicts in the BehaviorTracker layout
+
+        Args:
+            limit: Only the N most recent sessions
+            start, end: Session start time range (epoch seconds)
+            types: Only load these action types
+            with_data: Decode action data payloads
+            rowids: Only these sessions (replaces limit/start/end)
+
+        Returns:
+            list: Session dicts ordered oldest first
+        """
+        # The sessions are selected once; actions and positions are read
+        # for exactly those, so a session saved in between can't slip in
+        sessions = {}
+        for meta in self.sessions(limit, start, end, rowids):
+            meta["actions"] = []
+            meta["stats"]["position_history"] = []
+            sessions[meta.pop("id")] = meta
+
+        for row in self.actions(types, with_data=with_data, rowids=sessions):
+            sessions[row[0]]["actions"].append({
+                "timestamp": row[1],
+                "type": row[2],
+                "data": row[3] if with_data else {}
+            })
+
+        for session, t, x, y in self.positions(rowids=sessions):
+            sessions[session]["stats"]["position_history"].append({"t": t, "x": x, "y": y})
+
+        return list(sessions.values())
+
+    def load_session(self, session_id):
+        """Load a single session by its session id"""
+        row = self.conn.execute(
+            "SELECT id, session_id, start_time, end_time, duration, total_shots, "
+            "total_moves, total_hits, total_deaths FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        session = self._metadata(row)
+        rowid = session.pop("id")
+        session["actions"] = [
+            {"timestamp": t, "type": k, "data": json.loads(d) if d else {}}
+            for t, k, d in self.conn.execute(
+                "SELECT timestamp, type, data FROM actions WHERE session = ? ORDER BY timestamp",
+                (rowid,)
+            )
+        ]
+        session["stats"]["position_history"] = [
+            {"t": t, "x": x, "y": y}
+            for t, x, y in self.conn.execute(
+                "SELECT t, x, y FROM positions WHERE session = ? ORDER BY t", (rowid,)
+            )
+        ]
+        return session
+
+    def has_session(self, session_id):
+        """Whether a session with this id is stored"""
+        return self.conn.execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone() is not None
+
+    def count(self):
+        """Number of stored sessions"""
+        return self.conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def delete_sessions(self, rowids):
+        """Delete sessions (and their actions and positions) by row id"""
+        rowids = list(rowids)
+        if not rowids:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM sessions WHERE id = ?", ((r,) for r in rowids))
+
+    def get_aggregate(self, day):
+        """
+        Get the compacted summary for a day
+
+        Args:
+            day: Day string (YYYY-MM-DD)
+
+        Returns:
+            dict or None: Decoded summary
+        """
+        row = self.conn.execute(
+            "SELECT summary FROM daily_aggregates WHERE day = ?", (day,)
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def put_aggregate(self, day, summary):
+        """Store (replace) the compacted summary for a day"""
+        self.replace_with_aggregates({day: summary}, [])
+
+    def replace_with_aggregates(self, summaries, rowids):
+        """
+        Atomically store daily summaries and delete the sessions they cover
+
+        Args:
+            summaries: dict of day -> summary (replaces existing rows)
+            rowids: Session row ids folded into those summaries
+        """
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_aggregates (day, sessions, summary) VALUES (?, ?, ?)",
+                ((day, summary.get("sessions", 0),
+                  zlib.compress(json.dumps(summary, separators=(",", ":")).encode(), 9))
+                 for day, summary in summaries.items())
+            )
+            self.conn.executemany("DELETE FROM sessions WHERE id = ?", ((r,) for r in rowids))
+
+    def aggregates(self, start_day=None, end_day=None):
+        """
+        Get compacted daily summaries
+
+        Returns:
+            list: (day, summary) tuples ordered by day
+        """
+        sql, params = "SELECT day, summary FROM daily_aggregates", []
+        clauses = []
+        if start_day is not None:
+            clauses.append("day >= ?")
+            params.append(start_day)
+        if end_day is not None:
+            clauses.append("day < ?")
+            params.append(end_day)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+
+        rows = self.conn.execute(sql + " ORDER BY day", params).fetchall()
+        return [(day, json.loads(zlib.decompress(blob))) for day, blob in rows]
+
+    def disk_usage(self):
+        """Bytes used by the database and its WAL/shared-memory files"""
+        total = 0
+        for suffix in ("", "-wal", "-shm"):
+            path = self.db_path.with_name(self.db_path.name + suffix)
+            if path.exists():
+                total += path.stat().st_size
+        return total
+
+    def reclaim_space(self):
+        """Return free pages to the filesystem and truncate the WAL"""
+        with self._lock:
+            if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Databases created before auto_vacuum need one full VACUUM to switch
+                self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                self.conn.execute("VACUUM")
+            else:
+                # Each result row is one freed page; it must be stepped to completion
+                self.conn.execute("PRAGMA incremental_vacuum").fetchall()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def import_json_dir(self, data_dir, remove=False):
+        """
+        Import legacy session_*.json files
+
+        Sessions whose id is already stored are skipped, so running the
+        importer twice is harmless.
+
+        Args:
+            data_dir: Directory holding session_*.json files
+            remove: Delete each file once it is safely in the store
+
+        Returns:
+            int: Number of sessions imported
+        """
+        known = {row[0] for row in self.conn.execute("SELECT session_id FROM sessions")}
+        imported = 0
+
+        for filepath in sorted(Path(data_dir).glob("session_*.json")):
+            try:
+                with open(filepath, 'r') as f:
+                    session_data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if session_data.get("session_id") not in known:
+                self.save_session(session_data)
+                known.add(session_data["session_id"])
+                imported += 1
+
+            if remove:
+                filepath.unlink()
+
+        return imported
@@ -0,0 +1,337 @@
+"""Hyperparameter sweeps and evaluation of boss agents on simulated fights"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .checkpoint import atomic_write_json
+from .linear_agent import create_agent
+from .vec_env import VecBossEnv
+
+# Sweepable hyperparameters (the ai: config keys) and the agent attribute
+# each one sets; epsilon_decay is applied per finished fight while training
+PARAMS = {
+    "learning_rate": "learning_rate",
+    "discount_factor": "discount_factor",
+    "exploration_rate": "epsilon",
+    "epsilon_decay": None
+}
+
+# Ranking metrics and whether higher is better
+METRICS = {"win_rate": True, "damage": True, "time_to_kill": False, "return": True}
+
+def parse_space(specs):
+    """
+    Search space from NAME=SPEC strings
+
+    SPEC is a comma-separated list of values ("0.05,0.1,0.2") or a
+    LOW:HIGH range. Ranges are sampled uniformly, so they only work in
+    random sweeps.
+
+    Returns:
+        dict: name -> list of values, or (low, high) for a range
+
+    Raises:
+        ValueError: Unknown parameter or malformed values
+    """
+    space = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip()
+        if not sep or name not in PARAMS:
+            raise ValueError(f"Bad sweep parameter {spec!r} "
+                             f"(use NAME=V1,V2,... or NAME=LOW:HIGH, NAME one of {', '.join(PARAMS)})")
+        try:
+            if ":" in values:
+                low, high = (float(v) for v in values.split(":"))
+                space[name] = (low, high)
+            else:
+                space[name] = [float(v) for v in values.split(",")]
+        except ValueError:
+            raise ValueError(f"Bad values in sweep parameter {spec!r}") from None
+    return space
+
+def default_space(kind="tabular"):
+    """Grid around the agent's own learning rate and the usual discounts"""
+    learning_rate = create_agent(kind).learning_rate
+    return {
+        "learning_rate": [learning_rate / 2, learning_rate, learning_rate * 2],
+        "discount_factor": [0.9, 0.95, 0.99],
+        "exploration_rate": [0.1, 0.2]
+    }
+
+def grid_configs(space):
+    """
+    Every combination of the listed values
+
+    Raises:
+        ValueError: The space contains ranges
+    """
+    ranges = [name for name, values in space.items() if isinstance(values, tuple)]
+    if ranges:
+        raise ValueError(f"Grid sweeps need value lists, not ranges ({', '.join(ranges)}); "
+                         f"use a random sweep")
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+def random_configs(space, count, seed=None):
+    """`count` configurations drawn from the lists and ranges of the space"""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(count):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                config[name] = float(rng.uniform(*values))
+            else:
+                config[name] = float(rng.choice(values))
+        configs.append(config)
+    return configs
+
+def apply_params(agent, params):
+    """Set a configuration's hyperparameters on an agent"""
+    for name, value in params.items():
+        if PARAMS[name]:
+            setattr(agent, PARAMS[name], value)
+
+def mean_ci(values, z=1.96):
+    """
+    Mean and normal-approximation confidence half-width (95% by default)
+
+    Returns:
+        tuple: (mean, half_width); None for an empty sample, half_width 0
+               for a single value
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return None
+    if len(values) == 1:
+        return float(values[0]), 0.0
+    return float(values.mean()), float(z * values.std(ddof=1) / np.sqrt(len(values)))
+
+def evaluate(agent, envs=256, steps=1500, seed=None):
+    """
+    Greedy boss against one scripted player per environment
+
+    Every environment plays a single fight of at most `steps` frames; a
+    fight the player survives that long counts as a loss for the boss.
+    With the same seed, every agent meets the same players.
+
+    Returns:
+        dict: Per-fight arrays won, steps, damage (lives taken), returns
+    """
+    env = VecBossEnv(envs, seed=seed, max_steps=steps)
+    rng = np.random.default_rng(seed)
+    env.reset()
+    fights = {"won": np.zeros(envs, dtype=bool), "steps": np.zeros(envs, dtype=np.int64),
+              "damage": np.zeros(envs, dtype=np.int64), "returns": np.zeros(envs)}
+    finished = np.zeros(envs, dtype=bool)
+
+    epsilon, agent.epsilon = agent.epsilon, 0.0
+    try:
+        while not finished.all():
+            _, _, dones, info = env.step(agent.choose_actions(agent.observe_batch(env), rng))
+            first = dones & ~finished
+            if first.any():
+                # info rows are the finished environments in order
+                rows, keep = np.flatnonzero(first), first[dones]
+                fights["won"][rows] = info["boss_won"][keep]
+                fights["steps"][rows] = info["steps"][keep]
+                fights["damage"][rows] = info["damage"][keep]
+                fights["returns"][rows] = info["returns"][keep]
+                finished |= dones
+    finally:
+        agent.epsilon = epsilon
+    return fights
+
+def run_trial(kind, params, seed=None, envs=256, steps=2000, points=5,
+              eval_envs=256, eval_steps=1500, eval_seed=None):
+    """
+    Train a fresh agent with one configuration and evaluate it along the way
+
+    Runs in a worker process. Training is train_agent's lockstep loop; at
+    `points` evenly spaced steps the greedy policy is evaluated on the
+    same fights for every trial.
+
+    Args:
+        kind: Agent name (ai.agent)
+        params: Hyperparameters (PARAMS keys)
+        seed: Training seed
+        envs, steps: Lockstep fights and steps to train for
+        points: Evaluations along training (the learning curve)
+        eval_envs, eval_steps, eval_seed: evaluate() arguments
+
+    Returns:
+        dict: params, curve [(env_steps, fights)], fights (the last
+              evaluation), model (model_data()), train_sec
+    """
+    agent = create_agent(kind)
+    apply_params(agent, params)
+    decay = params.get("epsilon_decay", 1.0)
+
+    rng = np.random.default_rng(seed)
+    env = VecBossEnv(envs, seed=rng)
+    env.reset()
+    obs = agent.observe_batch(env)
+    evaluate_at = set(np.linspace(0, steps, points + 1)[1:].round().astype(int).tolist())
+    curve = []
+    train_sec = 0.0
+
+    for step in range(1, steps + 1):
+        start = time.perf_counter()
+        actions = agent.choose_actions(obs, rng)
+        _, rewards, dones, _ = env.step(actions)
+        next_obs = agent.observe_batch(env)
+        agent.update_batch(obs, actions, rewards, next_obs, dones)
+        obs = next_obs
+        # One decay per fight the boss has finished, as if each row were a player
+        if decay < 1.0 and dones.any():
+            agent.decay_epsilon(decay ** (dones.sum() / envs))
+        train_sec += time.perf_counter() - start
+
+        if step in evaluate_at:
+            curve.append((step * envs, evaluate(agent, eval_envs, eval_steps, eval_seed)))
+
+    return {"params": params, "curve": curve, "fights": curve[-1][1],
+            "model": agent.model_data(), "train_sec": train_sec}
+
+def summarize(trials, fps=30):
+    """
+    Metrics of one configuration, pooled over its trials (repeats)
+
+    Returns:
+        dict: params, trials, fights, and (mean, 95% half-width) pairs for
+              win_rate, time_to_kill (seconds, boss wins only), damage,
+              return and every curve point
+    """
+    fights = {key: np.concatenate([t["fights"][key] for t in trials]) for key in trials[0]["fights"]}
+    curve = []
+    for i, (env_steps, _) in enumerate(trials[0]["curve"]):
+        won = np.concatenate([t["curve"][i][1]["won"] for t in trials])
+        curve.append((env_steps, mean_ci(won)))
+
+    return {
+        "params": trials[0]["params"],
+        "trials": len(trials),
+        "fights": len(fights["won"]),
+        "win_rate": mean_ci(fights["won"]),
+        "time_to_kill": mean_ci(fights["steps"][fights["won"]] / fps),
+        "damage": mean_ci(fights["damage"]),
+        "return": mean_ci(fights["returns"]),
+        "curve": curve
+    }
+
+def trial_score(trial, metric="win_rate", fps=30):
+    """A single trial's metric, higher is better (for picking the model to save)"""
+    fights = trial["fights"]
+    if metric == "win_rate":
+        return fights["won"].mean()
+    if metric == "damage":
+        return fights["damage"].mean()
+    if metric == "return":
+        return fights["returns"].mean()
+    return -fights["steps"][fights["won"]].mean() / fps if fights["won"].any() else -np.inf
+
+class Sweep:
+    """
+    Runs hyperparameter configurations against scripted players in parallel.
+
+    Every configuration is trained from scratch `repeats` times (trial i
+    of each configuration uses the same seed, and every evaluation the
+    same fights, so configurations differ only by their parameters).
+    Trials are spread over a process pool; results are pooled per
+    configuration with 95% confidence intervals and ranked by `metric`.
+    """
+
+    def __init__(self, agent="tabular", configs=None, repeats=3, workers=None,
+                 envs=256, steps=2000, points=5, eval_envs=256, eval_steps=1500,
+                 metric="win_rate", fps=30, seed=None, model_dir="models/saved_models"):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}' (choose from {', '.join(METRICS)})")
+        self.agent_kind = agent
+        self.configs = configs if configs is not None else grid_configs(default_space(agent))
+        self.repeats = repeats
+        self.workers = workers or os.cpu_count() or 1
+        self.envs = envs
+        self.steps = steps
+        self.points = points
+        self.eval_envs = eval_envs
+        self.eval_steps = eval_steps
+        self.metric = metric
+        self.fps = fps
+        self.seed = seed
+        self.model_dir = model_dir
+
+    def run(self, progress=None):
+        """
+        Run every trial
+
+        Args:
+            progress: Called as progress(done, total) after each trial
+
+        Returns:
+            dict: results (summaries, best first), best_trial, trials,
+                  env_steps, elapsed_sec
+        """
+        *seeds, eval_seed = np.random.SeedSequence(self.seed).spawn(self.repeats + 1)
+        jobs = [(config, seed) for config in self.configs for seed in seeds]
+        settings = dict(envs=self.envs, steps=self.steps, points=self.points,
+                        eval_envs=self.eval_envs, eval_steps=self.eval_steps, eval_seed=eval_seed)
+        trials = [None] * len(jobs)
+
+        start = time.perf_counter()
+        if self.workers == 1 or len(jobs) == 1:
+            for i, (config, seed) in enumerate(jobs):
+                trials[i] = run_trial(self.agent_kind, config, seed, **settings)
+                if progress:
+                    progress(i + 1, len(jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                futures = {pool.submit(run_trial, self.agent_kind, config, seed, **settings): i
+                           for i, (config, seed) in enumerate(jobs)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    trials[futures[future]] = future.result()
+                    if progress:
+                        progress(done, len(jobs))
+        elapsed = time.perf_counter() - start
+
+        results = [summarize(trials[i:i + self.repeats], self.fps)
+                   for i in range(0, len(trials), self.repeats)]
+        higher = METRICS[self.metric]
+        missing = -np.inf if higher else np.inf
+        results.sort(key=lambda r: r[self.metric][0] if r[self.metric] else missing, reverse=higher)
+
+        best = [t for t in trials if t["params"] == results[0]["params"]]
+        return {
+            "results": results,
+            "best_trial": max(best, key=lambda t: trial_score(t, self.metric, self.fps)),
+            "trials": len(trials),
+            "env_steps": len(trials) * self.envs * self.steps,
+            "elapsed_sec": elapsed
+        }
+
+    def save_best(self, report):
+        """
+        Save the best configuration's best trial where Boss loads its model
+
+        Returns:
+            Path: Saved model file
+        """
+        agent = create_agent(self.agent_kind, model_dir=self.model_dir)
+        agent.load_model_data(report["best_trial"]["model"])
+        return agent.save_model()
+
+    def save_report(self, report, path):
+        """Write the ranked results (without models) as JSON"""
+        atomic_write_json(path, {
+            "agent": self.agent_kind,
+            "metric": self.metric,
+            "repeats": self.repeats,
+            "envs": self.envs,
+            "steps": self.steps,
+            "eval_envs": self.eval_envs,
+            "eval_steps": self.eval_steps,
+            "seed": self.seed,
+            "elapsed_sec": report["elapsed_sec"],
+            "results": report["results"]
+        })
@@ -0,0 +1,506 @@
+"""Vectorized lockstep boss fights for batched RL training"""
+import time
+import numpy as np
+from ..game.player import Player
+from ..game.boss import Boss
+from ..game.patterns import PatternEmitter
+from ..game.simulation import INVULNERABLE_FRAMES
+from ..game.snapshot import BOSS_FIELDS
+from ..utils.rng import RandomStream
+from .rl_agent import BossRLAgent, ACTIONS, PLAYER_PATTERNS
+from .linear_agent import MovePredictor, feature_matrix
+
+# Boss behavior modes and their per-frame shot chance (as in Boss.should_shoot)
+MODES = Boss.MODES
+SHOT_CHANCE = np.array([0.03, 0.02, 0.05])
+
+# Pattern each mode's shoot_burst fires (Boss.BURST_PATTERNS), and the
+# special attack's chance, cooldown and health threshold (as in
+# Boss.should_special_attack)
+BURST_PATTERNS = [Boss.BURST_PATTERNS[mode] for mode in MODES]
+SPECIAL_CHANCE = 0.01
+SPECIAL_COOLDOWN = 300
+SPECIAL_HEALTH = 0.3
+
+# Rewards per event (as in BossRLAgent.calculate_reward)
+REWARD_HIT_PLAYER = 10.0
+REWARD_MISSED = -2.0
+REWARD_GOT_HIT = -5.0
+
+# Action indices (shoot changes nothing in Boss._execute_ai_action, so it
+# is a no-op here too)
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+class VecBossEnv:
+    """
+    N boss fights stepped in lockstep on stacked NumPy arrays.
+
+    Mirrors the boss-mode rules of GameSimulation (movement, shooting
+    cooldowns, shoot_burst and special-attack pattern volleys, bullet
+    travel, hitboxes, invulnerability after a hit) with one row per
+    environment and fixed-capacity bullet slots, so a step over thousands
+    of fights is a few dozen array operations. Enemy bullets keep float
+    positions, velocities and shot weights as in BulletStore; the bullets
+    of a volley that finds no free slot are dropped. The player in each
+    fight is a scripted policy whose style is one of PLAYER_PATTERNS,
+    which is what the observation's pattern component reports.
+
+    Observations are BossRLAgent state indices; finished fights are reset
+    automatically inside step().
+    """
+
+    def __init__(self, n, width=100, height=40, seed=None, max_steps=3000,
+                 boss_health=50, player_lives=5, player_bullets=48, enemy_bullets=96,
+                 patterns=None):
+        self.n = n
+        self.W, self.H = width, height
+        self.max_steps = max_steps
+        self.boss_health = boss_health
+        self.player_lives = player_lives
+        self.rng = np.random.default_rng(seed)
+        self.emitter = PatternEmitter(RandomStream(self.rng.integers(1 << 63)), patterns)
+
+        # Geometry from the game entities
+        self.player_y = height - 5
+        self.player_w, self.player_h = 5, len(Player.SHIP)
+        self.player_mask = np.array([[c != ' ' for c in row] for row in Player.SHIP])
+        self.boss_y = 5
+        self.boss_w, self.boss_h = 9, len(Boss.SPRITE)
+        self.boss_speed = 0.4
+        self.player_speed = 2
+
+        # Per-environment state
+        self.player_x = np.zeros(n, dtype=np.int64)
+        self.player_vx = np.zeros(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.pattern = np.zeros(n, dtype=np.int64)
+        self.boss_x = np.zeros(n)
+        self.health = np.zeros(n, dtype=np.int64)
+        self.mode = np.zeros(n, dtype=np.int64)
+        self.cooldown = np.zeros(n, dtype=np.int64)
+        self.burst_cooldown = np.zeros(n, dtype=np.int64)
+        self.special_cooldown = np.zeros(n, dtype=np.int64)
+        self.invulnerable = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.returns = np.zeros(n)
+        self.predictor = MovePredictor(n)
+
+        # Recorded player traces (play_traces) replace the scripted players
+        self.trace_x = None
+        self.trace_shots = None
+        self.trace_lengths = None
+
+        # Bullet slots
+        self.pb_x = np.zeros((n, player_bullets), dtype=np.int64)
+        self.pb_y = np.zeros((n, player_bullets), dtype=np.int64)
+        self.pb_alive = np.zeros((n, player_bullets), dtype=bool)
+        self.eb_x = np.zeros((n, enemy_bullets))
+        self.eb_y = np.zeros((n, enemy_bullets))
+        self.eb_vx = np.zeros((n, enemy_bullets))
+        self.eb_vy = np.zeros((n, enemy_bullets))
+        self.eb_weight = np.zeros((n, enemy_bullets))
+        self.eb_alive = np.zeros((n, enemy_bullets), dtype=bool)
+
+        # Episode statistics
+        self.episodes = 0
+        self.boss_wins = 0
+        self.env_steps = 0
+
+    @classmethod
+    def from_snapshot(cls, snapshot, n, pattern="balanced", seed=None, horizon=0, patterns=None):
+        """
+        N copies of the boss fight in a SimSnapshot, e.g. for rollouts
+
+        Args:
+            snapshot: SimSnapshot of a game with a boss
+            n: Number of copies
+            pattern: Player style the scripted players follow
+            seed: RNG seed (or a np.random.Generator)
+            horizon: Steps the copies will run; sizes the bullet slots so
+                     nothing in the snapshot or fired meanwhile is dropped
+            patterns: Bullet pattern overrides, as given to the game
+
+        Returns:
+            VecBossEnv: Every row in the snapshot's state
+        """
+        scalars = snapshot.scalars
+        boss = dict(zip(BOSS_FIELDS, snapshot["boss"].tolist()))
+        # Single shots every 20 frames at most, volleys every BURST_COOLDOWN
+        # (plus at most one special attack)
+        volleys = horizon // Boss.BURST_COOLDOWN + 2
+        volley_size = PatternEmitter(patterns=patterns).max_bullets(scalars["W"])
+        env = cls(n, width=scalars["W"], height=scalars["H"], seed=seed,
+                  max_steps=max(horizon + 1, 3000),
+                  boss_health=int(boss["max_health"]), player_lives=scalars["lives"],
+                  player_bullets=max(48, len(snapshot["bullets"]) + horizon),
+                  enemy_bullets=len(snapshot["enemy_bullets"]) + horizon // 20 + 1 + volleys * volley_size,
+                  patterns=patterns)
+        env.load(snapshot, pattern)
+        return env
+
+    def load(self, snapshot, pattern="balanced"):
+        """
+        Put every environment into the state of a SimSnapshot
+
+        Returns:
+            np.ndarray: Observations
+        """
+        scalars = snapshot.scalars
+        boss = dict(zip(BOSS_FIELDS, snapshot["boss"].tolist()))
+
+        self.player_x[:] = scalars["player_x"]
+        self.player_vx[:] = 0
+        self.lives[:] = scalars["lives"]
+        self.invulnerable[:] = scalars["invulnerable"]
+        self.frame[:] = scalars["frame"]
+        self.pattern[:] = PLAYER_PATTERNS.index(pattern)
+        self.boss_x[:] = boss["x"]
+        self.health[:] = int(boss["health"])
+        self.mode[:] = scalars["boss_mode"]
+        self.cooldown[:] = int(boss["shoot_cooldown"])
+        self.burst_cooldown[:] = int(boss["burst_cooldown"])
+        self.special_cooldown[:] = int(boss["special_attack_cooldown"])
+        self.steps[:] = 0
+        self.returns[:] = 0.0
+        self.predictor.reset()
+
+        bullets = snapshot["bullets"][:self.pb_alive.shape[1]]
+        count = len(bullets)
+        self.pb_alive[:] = False
+        self.pb_alive[:, :count] = True
+        self.pb_x[:, :count] = bullets[:, 0]
+        self.pb_y[:, :count] = bullets[:, 1]
+
+        # Enemy bullets are BULLET_FIELDS rows: x, y, vx, vy, weight
+        bullets = snapshot["enemy_bullets"][:self.eb_alive.shape[1]]
+        count = len(bullets)
+        self.eb_alive[:] = False
+        self.eb_alive[:, :count] = True
+        for i, slots in enumerate((self.eb_x, self.eb_y, self.eb_vx, self.eb_vy, self.eb_weight)):
+            slots[:, :count] = bullets[:, i]
+        return self.observe()
+
+    def observe(self):
+        """State index of every environment"""
+        return BossRLAgent.state_indices(self.player_x, self.boss_x, self.pattern)
+
+    def features(self):
+        """LinearQAgent feature vectors of every environment"""
+        boss_left = self.boss_x.astype(np.int64)[:, None]
+        incoming = self.pb_alive & (self.pb_x >= boss_left) & (self.pb_x < boss_left + self.boss_w)
+        return feature_matrix(
+            (self.player_x - (self.boss_x + self.boss_w // 2)) / self.W,
+            incoming.sum(axis=1),
+            self.eb_alive.sum(axis=1),
+            np.clip(self.player_vx / self.player_speed, -1, 1),
+            self.health / self.boss_health,
+            self.predictor.predict(),
+            self.cooldown == 0
+        )
+
+    def play_traces(self, xs, shots, lengths):
+        """
+        Drive each environment's player from a recorded trace
+
+        Fights end when their trace does (or earlier) and restart it from
+        the beginning. Observations report the "balanced" pattern, as the
+        live game does.
+
+        Args:
+            xs: (n, T) player x per frame
+            shots: (n, T) bool, player fired that frame
+            lengths: Frames valid in each row
+
+        Returns:
+            np.ndarray: Observations
+        """
+        self.trace_x = np.asarray(xs, dtype=np.int64)
+        self.trace_shots = np.asarray(shots, dtype=bool)
+        self.trace_lengths = np.asarray(lengths, dtype=np.int64)
+        return self.reset()
+
+    def reset(self, mask=None):
+        """
+        Start new fights in all (or the masked) environments
+
+        Returns:
+            np.ndarray: Observations
+        """
+        rows = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        count = len(rows)
+
+        self.player_x[rows] = self.W // 2
+        self.player_vx[rows] = 0
+        self.lives[rows] = self.player_lives
+        self.pattern[rows] = self.rng.integers(len(PLAYER_PATTERNS), size=count)
+        self.boss_x[rows] = self.W // 2 - 4
+        self.health[rows] = self.boss_health
+        self.mode[rows] = 0
+        self.cooldown[rows] = 0
+        self.burst_cooldown[rows] = 0
+        self.special_cooldown[rows] = 0
+        self.invulnerable[rows] = 0
+        self.frame[rows] = 0
+        self.steps[rows] = 0
+        self.returns[rows] = 0.0
+        self.pb_alive[rows] = False
+        self.eb_alive[rows] = False
+        self.predictor.reset(rows)
+        if self.trace_x is not None:
+            self.player_x[rows] = self.trace_x[rows, 0]
+            self.pattern[rows] = PLAYER_PATTERNS.index("balanced")
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Advance every fight by one frame
+
+        Args:
+            actions: Boss action index per environment
+
+        Returns:
+            tuple: (observations, rewards, dones, info); info holds the
+                   returns, outcomes, lengths and lives taken (damage) of
+                   fights that ended this step
+        """
+        n, W, H = self.n, self.W, self.H
+        rewards = np.zeros(n)
+        self.steps += 1
+        self.frame += 1
+
+        # Player input (scripted or recorded), then bullets move as in GameSimulation.step
+        if self.trace_x is None:
+            move, shoot = self._player_policy()
+            self.player_vx = move * self.player_speed
+            self.player_x = np.clip(self.player_x + self.player_vx, 2, W - self.player_w - 2)
+        else:
+            frame = np.minimum(self.steps - 1, self.trace_lengths - 1)
+            rows = np.arange(n)
+            x = np.clip(self.trace_x[rows, frame], 2, W - self.player_w - 2)
+            self.player_vx = x - self.player_x
+            self.player_x = x
+            shoot = self.trace_shots[rows, frame]
+        self.predictor.observe(self.player_vx)
+        self._spawn(self.pb_x, self.pb_y, self.pb_alive, shoot,
+                    self.player_x + self.player_w // 2, self.player_y - 1)
+
+        self.pb_alive &= self.pb_y >= 0
+        self.pb_y -= 1
+
+        # Enemy bullets off the screen missed, by their shot weights (BulletStore.step;
+        # cell bounds are integers, so comparing the unfloored positions is the same)
+        ex, ey = self.eb_x, self.eb_y
+        missed = self.eb_alive & ((ey >= H) | (ey < 0) | (ex < 0) | (ex >= W))
+        if missed.any():
+            rewards += REWARD_MISSED * (missed * self.eb_weight).sum(axis=1)
+            self.eb_alive &= ~missed
+        self.eb_x += self.eb_vx
+        self.eb_y += self.eb_vy
+
+        # Boss update (Boss.update / _execute_ai_action)
+        self.cooldown = np.maximum(0, self.cooldown - 1)
+        self.burst_cooldown = np.maximum(0, self.burst_cooldown - 1)
+        self.special_cooldown = np.maximum(0, self.special_cooldown - 1)
+        actions = np.asarray(actions)
+        left_edge, right_edge = 2, W - self.boss_w - 2
+        self.boss_x = np.where(actions == ACTION_INDEX["move_left"],
+                               np.maximum(left_edge, self.boss_x - self.boss_speed), self.boss_x)
+        self.boss_x = np.where(actions == ACTION_INDEX["move_right"],
+                               np.minimum(right_edge, self.boss_x + self.boss_speed), self.boss_x)
+
+        aggressive = actions == ACTION_INDEX["aggressive"]
+        self.mode[aggressive] = MODES.index("aggressive")
+        self.cooldown[aggressive] = 0
+
+        defensive = actions == ACTION_INDEX["defensive"]
+        self.mode[defensive] = MODES.index("defensive")
+        away = np.where(self.player_x < self.boss_x, 1.5, -1.5) * self.boss_speed
+        self.boss_x = np.where(defensive, np.clip(self.boss_x + away, left_edge, right_edge), self.boss_x)
+
+        burst = (actions == ACTION_INDEX["shoot_burst"]) & (self.burst_cooldown == 0)
+        self.burst_cooldown[burst] = Boss.BURST_COOLDOWN
+
+        # Boss shooting (Boss.should_shoot), from below the boss's center
+        origin_x = (self.boss_x + self.boss_w // 2).astype(np.int64)
+        origin_y = self.boss_y + self.boss_h // 2 + 1
+        fire = np.flatnonzero((self.cooldown == 0) & (self.rng.random(n) < SHOT_CHANCE[self.mode]))
+        self.cooldown[fire] = 20
+        count = len(fire)
+        self._spawn_enemy_bullets(fire, np.arange(count), origin_x[fire], np.full(count, origin_y),
+                                  np.zeros(count), np.ones(count), np.ones(count))
+
+        # Pattern volleys (Boss.next_volley): the shoot_burst's, else maybe the special attack
+        special = ~burst & (self.special_cooldown == 0) & \
+                  (self.health < self.boss_health * SPECIAL_HEALTH) & (self.rng.random(n) < SPECIAL_CHANCE)
+        self.special_cooldown[special] = SPECIAL_COOLDOWN
+        volleys = [(BURST_PATTERNS[mode], burst & (self.mode == mode)) for mode in range(len(MODES))]
+        for name, mask in volleys + [(Boss.SPECIAL_PATTERN, special)]:
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                continue
+            origins = np.column_stack([origin_x[rows], np.full(len(rows), origin_y)]).astype(np.float64)
+            targets = np.column_stack([self.player_x[rows] + self.player_w // 2,
+                                       np.full(len(rows), self.player_y)]).astype(np.float64)
+            self._spawn_enemy_bullets(rows, *self.emitter.emit_many(name, origins, targets, W,
+                                                                    self.frame[rows]))
+
+        # Player bullets hitting the boss
+        boss_left = self.boss_x.astype(np.int64)[:, None]
+        hits = self.pb_alive & (self.pb_x >= boss_left) & (self.pb_x < boss_left + self.boss_w) & \
+               (self.pb_y >= self.boss_y) & (self.pb_y < self.boss_y + self.boss_h)
+        hit_count = hits.sum(axis=1)
+        self.pb_alive &= ~hits
+        self.health -= hit_count
+        rewards += REWARD_GOT_HIT * hit_count
+
+        # Enemy bullets on the player's ship cells are used up; a hit costs
+        # one life, then none for INVULNERABLE_FRAMES (GameSimulation._player_hit)
+        self.invulnerable = np.maximum(0, self.invulnerable - 1)
+        # Only bullets in the ship's rows need their columns checked
+        dy = self.eb_y - self.player_y
+        rows, slots = np.nonzero(self.eb_alive & (dy >= 0) & (dy < self.player_h))
+        dx = self.eb_x[rows, slots] - self.player_x[rows]
+        inside = (dx >= 0) & (dx < self.player_w)
+        rows, slots = rows[inside], slots[inside]
+        on_ship = self.player_mask[dy[rows, slots].astype(np.int64), dx[inside].astype(np.int64)]
+        struck = np.zeros_like(self.eb_alive)
+        struck[rows[on_ship], slots[on_ship]] = True
+        self.eb_alive &= ~struck
+        player_hit = struck.any(axis=1) & (self.invulnerable == 0)
+        self.invulnerable[player_hit] = INVULNERABLE_FRAMES
+        self.lives -= player_hit
+        rewards += REWARD_HIT_PLAYER * player_hit
+
+        self.returns += rewards
+        self.env_steps += n
+
+        # Finished fights report their outcome and start over
+        boss_won = self.lives <= 0
+        dones = boss_won | (self.health <= 0) | (self.steps >= self.max_steps)
+        if self.trace_x is not None:
+            dones |= self.steps >= self.trace_lengths
+        info = {}
+        if dones.any():
+            info = {
+                "returns": self.returns[dones].copy(),
+                "boss_won": boss_won[dones].copy(),
+                "steps": self.steps[dones].copy(),
+                "damage": np.minimum(self.player_lives - self.lives[dones], self.player_lives)
+            }
+            self.episodes += int(dones.sum())
+            self.boss_wins += int(boss_won.sum())
+            self.reset(dones)
+
+        return self.observe(), rewards, dones, info
+
+    def _spawn(self, xs, ys, alive, mask, x, y):
+        """Put a bullet in the first free slot of each masked row"""
+        free = ~alive
+        rows = np.flatnonzero(mask & free.any(axis=1))
+        if not len(rows):
+            return
+        slots = free[rows].argmax(axis=1)
+        alive[rows, slots] = True
+        xs[rows, slots] = np.broadcast_to(x, (self.n,))[rows]
+        ys[rows, slots] = y
+
+    def _spawn_enemy_bullets(self, rows, owner, x, y, vx, vy, weight):
+        """
+        Put bullets into the free enemy-bullet slots of their rows
+
+        Args:
+            rows: Environment of each owner index
+            owner: Index into rows per bullet, grouped in ascending order
+            x, y, vx, vy, weight: Per bullet (see BulletStore)
+        """
+        if not len(owner):
+            return
+        free = ~self.eb_alive[rows]
+        counts = np.bincount(owner, minlength=len(rows))
+        # The k-th bullet of a row takes its k-th free slot; the rest are dropped
+        index = np.arange(len(owner)) - (np.cumsum(counts) - counts)[owner]
+        fits = index < free.sum(axis=1)[owner]
+        taken = free & (np.cumsum(free, axis=1) <= counts[:, None])
+        taken_rows, slots = np.nonzero(taken)
+        envs = rows[taken_rows]
+        self.eb_alive[envs, slots] = True
+        for values, target in ((x, self.eb_x), (y, self.eb_y), (vx, self.eb_vx),
+                               (vy, self.eb_vy), (weight, self.eb_weight)):
+            target[envs, slots] = values[fits]
+
+    def _player_policy(self):
+        """
+        Scripted players, one style per PLAYER_PATTERNS entry
+
+        balanced wanders and shoots now and then, aggressive chases the
+        boss and fires often, defensive steps away from incoming bullets.
+
+        Returns:
+            tuple: (move in {-1, 0, 1}, shoot mask)
+        """
+        n = self.n
+        center = self.player_x + self.player_w // 2
+        move = self.rng.integers(-1, 2, size=n)
+
+        aggressive = self.pattern == PLAYER_PATTERNS.index("aggressive")
+        chase = np.sign((self.boss_x + self.boss_w // 2).astype(np.int64) - center)
+        move = np.where(aggressive, chase, move)
+
+        # Only the defensive rows look at the bullets
+        defensive = np.flatnonzero(self.pattern == PLAYER_PATTERNS.index("defensive"))
+        if len(defensive):
+            bullet_x = self.eb_x[defensive]
+            incoming = self.eb_alive[defensive] & (self.player_y - self.eb_y[defensive] < 8) & \
+                       (np.abs(bullet_x - center[defensive, None]) <= 3)
+            threat = incoming.any(axis=1)
+            nearest = (incoming * bullet_x).sum(axis=1) // np.maximum(incoming.sum(axis=1), 1)
+            dodge = np.where(nearest >= center[defensive], -1, 1)
+            move[defensive] = np.where(threat, dodge, move[defensive])
+
+        shot_chance = np.choose(self.pattern, [0.3, 0.6, 0.2])
+        shoot = self.rng.random(n) < shot_chance
+        return move, shoot
+
+def train_agent(agent, envs=1024, steps=2000, seed=None, patterns=None):
+    """
+    Train a boss agent on lockstep fights with batched updates
+
+    Args:
+        agent: BossRLAgent or LinearQAgent to train in place
+        envs: Number of parallel fights
+        steps: Lockstep steps (total transitions = envs * steps)
+        seed: RNG seed for the environments and exploration
+        patterns: Bullet pattern overrides (boss.patterns), as in the game
+
+    Returns:
+        dict: env_steps, env_steps_per_sec, episodes, boss_win_rate,
+              avg_return, reward_per_step
+    """
+    env = VecBossEnv(envs, seed=seed, patterns=patterns)
+    rng = np.random.default_rng(seed)
+    env.reset()
+    obs = agent.observe_batch(env)
+    returns = []
+    total_reward = 0.0
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = agent.choose_actions(obs, rng)
+        _, rewards, dones, info = env.step(actions)
+        next_obs = agent.observe_batch(env)
+        agent.update_batch(obs, actions, rewards, next_obs, dones)
+        total_reward += rewards.sum()
+        if info:
+            returns.extend(info["returns"].tolist())
+        obs = next_obs
+    elapsed = time.perf_counter() - start
+
+    return {
+        "env_steps": env.env_steps,
+        "env_steps_per_sec": env.env_steps / elapsed if elapsed else 0.0,
+        "episodes": env.episodes,
+        "boss_win_rate": env.boss_wins / env.episodes if env.episodes else 0.0,
+        "avg_return": float(np.mean(returns)) if returns else 0.0,
+        "reward_per_step": float(total_reward / max(env.env_steps, 1))
+    }
@@ -0,0 +1,184 @@
+"""asyncio game runtime: input, simulation, rendering and persistence as tasks"""
+import asyncio
+import time
+from .game_engine import KEY_COMMANDS
+
+def coalesce_commands(commands):
+    """
+    Reduce every command received since the last tick to what one tick applies
+
+    Quit wins over everything; of left/right the most recent direction is
+    kept, so a held key moves at the tick rate whatever the terminal's
+    key-repeat rate; any number of shots fire once.
+
+    Args:
+        commands: Commands in arrival order
+
+    Returns:
+        list: Commands for GameSimulation.step()
+    """
+    if "quit" in commands:
+        return ["quit"]
+
+    coalesced = []
+    direction = None
+    for command in commands:
+        if command in ("left", "right"):
+            direction = command
+    if direction:
+        coalesced.append(direction)
+    if "shoot" in commands:
+        coalesced.append("shoot")
+    return coalesced
+
+class AsyncGameRuntime:
+    """
+    Runs a GameEngine as cooperating asyncio tasks instead of one
+    blocking loop.
+
+    - input: drains every pending key every few milliseconds
+    - simulation: once per tick, coalesces the keys that arrived and steps
+    - render: draws and presents after each simulation tick
+    - persistence: checkpoints the boss model and session every
+      ai.save_model_every seconds (written by the engine's Checkpointer thread)
+
+    Reading input never waits on a frame, and model and session saves run
+    in threads via asyncio.to_thread, so no tick is stalled by I/O. The
+    render task only draws into an off-screen frame: a RenderWorker thread
+    always writes it to the terminal, so a slow terminal never blocks the
+    event loop.
+    """
+
+    def __init__(self, engine, persist_interval=None, input_interval=0.005):
+        self.engine = engine
+        checkpointer = engine.checkpointer
+        self.persist_interval = persist_interval or (checkpointer.interval if checkpointer else None)
+        self.input_interval = input_interval
+
+        self.pending = []
+        self._frame_ready = None
+        self._stopping = None
+        self._flash_until = 0.0
+        self._render_time = 0.0
+
+        # Statistics
+        self.ticks = 0
+        self.keys = 0
+        self.max_keys_per_tick = 0
+        self.checkpoints = 0
+
+    def run(self, stdscr):
+        """Entry point with the same signature as GameEngine.run"""
+        return asyncio.run(self.main(stdscr))
+
+    async def main(self, stdscr):
+        engine = self.engine
+        output, sim = engine.setup(stdscr, render_thread=True)
+        self._frame_ready = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+        output.start()
+        input_task = asyncio.create_task(self._input_loop())
+        render_task = asyncio.create_task(self._render_loop())
+        persist_task = asyncio.create_task(self._persist_loop())
+        try:
+            await self._simulation_loop()
+            render_task.cancel()
+            engine._start_compaction()
+            await self._end_screen()
+        finally:
+            # Let an in-flight checkpoint finish before the final save
+            self._stopping.set()
+            input_task.cancel()
+            render_task.cancel()
+            await asyncio.gather(input_task, render_task, persist_task, return_exceptions=True)
+            engine.shutdown()
+
+        await asyncio.to_thread(engine.save_results)
+
+    async def _input_loop(self):
+        output = self.engine.output
+        while True:
+            while True:
+                ch = output.getch()
+                if ch == -1:
+                    break
+                command = KEY_COMMANDS.get(ch)
+                if command:
+                    self.pending.append(command)
+            await asyncio.sleep(self.input_interval)
+
+    async def _simulation_loop(self):
+        engine, sim = self.engine, self.engine.sim
+        budget = 1.0 / engine.fps
+        next_tick = time.perf_counter()
+
+        while not sim.over:
+            tick_start = time.perf_counter()
+            engine.check_resize()
+
+            commands, self.pending = self.pending, []
+            self.ticks += 1
+            self.keys += len(commands)
+            self.max_keys_per_tick = max(self.max_keys_per_tick, len(commands))
+
+            events = sim.step(engine.input_commands(coalesce_commands(commands)))
+            if sim.over:
+                break
+
+            if "death" in events:
+                # Blank the screen briefly; the game pauses as in the classic loop
+                self._flash_until = time.monotonic() + 0.15
+                self._frame_ready.set()
+                await asyncio.sleep(0.15)
+                next_tick = time.perf_counter()
+
+            self._frame_ready.set()
+            engine.record_frame_time(time.perf_counter() - tick_start + self._render_time)
+
+            next_tick += budget
+            engine.replay_idle(next_tick - time.perf_counter())
+            delay = next_tick - time.perf_counter()
+            if delay < -budget:
+                # Fell more than a tick behind: resync instead of bursting
+                next_tick = time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+
+    async def _render_loop(self):
+        engine = self.engine
+        while True:
+            await self._frame_ready.wait()
+            self._frame_ready.clear()
+
+            start = time.perf_counter()
+            if time.monotonic() < self._flash_until:
+                engine.output.target.clear()
+            else:
+                engine.draw_frame()
+            engine.present()
+            self._render_time = time.perf_counter() - start
+
+    async def _persist_loop(self):
+        if not self.engine.checkpointer:
+            return
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.persist_interval)
+                return
+            except asyncio.TimeoutError:
+                self.checkpoint()
+
+    def checkpoint(self):
+        """Snapshot the game between ticks; the Checkpointer thread writes it"""
+        self.engine.checkpoint(force=True)
+        self.checkpoints += 1
+
+    async def _end_screen(self):
+        engine = self.engine
+        for _ in range(engine.end_screen_frames()):
+            engine.draw_end_screen()
+            engine.present()
+            await asyncio.sleep(0.1)
+
+        while not engine.sim.victory and "quit" not in self.pending:
+            await asyncio.sleep(0.05)
@@ -1,28 +1,65 @@
 """Adaptive AI-powered Boss enemy"""
-import random
 import curses
-from ..ai.rl_agent import BossRLAgent
-from ..ai.pattern_analyzer import PatternAnalyzer
+from ..ai.linear_agent import create_agent
+from ..rendering.themes import color_pair
+from ..utils.rng import RNGService
 
 class Boss:
     """
     Adaptive boss that learns from player behavior using RL.
     """
     
-    def __init__(self, x, y, use_ai=True):
+    SPRITE = [
+        "  ╔═══╗  ",
+        "  ║ ▼ ║  ",
+        "╔═╩═══╩═╗",
+        "║ █████ ║",
+        "╠═══════╣",
+        "║ ▓▓▓▓▓ ║",
+        "╚═══════╝"
+    ]
+    
+    # Behavior modes, in snapshot/vectorized-environment code order
+    MODES = ["balanced", "defensive", "aggressive"]
+    
+    # Bullet pattern (game.patterns) the shoot_burst action fires in each
+    # mode, the special attack's pattern, and frames between bursts
+    BURST_PATTERNS = {"balanced": "spread", "defensive": "wall", "aggressive": "aimed"}
+    SPECIAL_PATTERN = "spiral"
+    BURST_COOLDOWN = 45
+    
+    # Reward (REWARDS key) per game event (game.events type and labels)
+    REWARD_EVENTS = {
+        "got_hit": ("hit", {"target": "boss"}),
+        "hit_player": ("death", {"cause": "bullet"}),
+        "missed": ("missed", {}),
+        "player_dodged": ("dodged", {})
+    }
+    
+    def __init__(self, x, y, use_ai=True, planner=None, agent="tabular", replay=None,
+                 learner=None, profile=None, rngs=None, analyzer=None, model=None):
         self.x, self.y = x, y
         self.use_ai = use_ai
         
+        # Shot decisions draw from the run's "boss" stream, exploration from "ai"
+        rngs = rngs or RNGService()
+        self.rng = rngs.stream("boss")
+        
+        # Optional LookaheadPlanner; when set it picks the actions
+        self.planner = planner
+        if planner:
+            planner.reset()
+        
+        # Optional PrioritizedReplay collecting every frame's transition
+        self.replay = replay if use_ai else None
+        self._transition = None  # (observation, action index) awaiting its outcome
+        self._pending_reward = 0.0
+        
+        # Optional OnlineLearner; when set all learning happens in its process
+        self.learner = learner if use_ai else None
+        
         # Boss appearance
-        self.sprite = [
-            "  ╔═══╗  ",
-            "  ║ ▼ ║  ",
-            "╔═╩═══╩═╗",
-            "║ █████ ║",
-            "╠═══════╣",
-            "║ ▓▓▓▓▓ ║",
-            "╚═══════╝"
-        ]
+        self.sprite = self.SPRITE
         self.width = 9
         self.height = 7
         
@@ -33,33 +70,67 @@ class Boss:
         self.direction = 1
         self.damaged = False
         
-        # AI components
-        self.rl_agent = BossRLAgent() if use_ai else None
-        self.pattern_analyzer = PatternAnalyzer() if use_ai else None
+        # AI components (a PlayerProfile supplies that player's own, already
+        # loaded); otherwise the caller's analyzer, so bosses share one database
+        self.profile = profile if use_ai else None
+        if self.profile:
+            self.rl_agent = self.profile.agent(agent)
+            self.pattern_analyzer = self.profile.analyzer
+        else:
+            self.rl_agent = create_agent(agent) if use_ai else None
+            self.pattern_analyzer = analyzer if use_ai else None
         
         # Behavior state
         self.behavior_mode = "balanced"  # balanced, defensive, aggressive
         self.shoot_cooldown = 0
         self.special_attack_cooldown = 0
+        self.burst_cooldown = 0
+        self._volley = None  # Pattern a shoot_burst queued for this frame
         
-        # Load existing model if available
-        if self.use_ai and self.rl_agent:
-            loaded = self.rl_agent.load_model()
-            if loaded:
+        # Load existing model if available (`model`: model_data the caller
+        # already loaded, e.g. a server's shared boss, so no file is read)
+        if self.use_ai and self.rl_agent and not self.profile:
+            if model is not None:
+                self.rl_agent.load_model_data(model)
+            elif self.rl_agent.load_model():
                 print("Boss loaded previous training!")
+        if self.rl_agent:
+            self.rl_agent.rng = rngs.stream("ai")
+            
+        # The shared model as this boss found it, so that games saved side
+        # by side can merge their learning (see checkpoint.merge_model_data)
+        self.base_model = self.rl_agent.model_data() if self.use_ai and self.rl_agent and not self.profile else None
                 
     def take_damage(self):
-        """Apply damage and return True if destroyed"""
+        """Apply damage and return True if destroyed (the reward comes with the frame's events)"""
         self.health -= 1
         self.damaged = True
-        
-        # Notify RL agent of hit
-        if self.use_ai and self.rl_agent:
-            reward = self.rl_agent.calculate_reward("got_hit", self.get_state())
-            self.rl_agent.update(reward, self.get_state())
-            
         return self.health <= 0
         
+    def on_events(self, events):
+        """
+        Reward the agent for a frame's game events (an EventBuffer)
+        
+        Every REWARD_EVENTS signal of the frame (weighted by shot share) is
+        summed into one reward that updates the agent once, against one
+        get_state(), and is credited to the current transition.
+        """
+        if not (self.use_ai and self.rl_agent):
+            return
+        state = self.get_state()
+        reward = 0.0
+        rewarded = False
+        for kind, (name, labels) in self.REWARD_EVENTS.items():
+            amount = events.total(name, **labels)
+            if amount:
+                reward += amount * self.rl_agent.calculate_reward(kind, state)
+                rewarded = True
+        if not rewarded:
+            return
+        if self.learner is None:
+            self.rl_agent.update(reward, state)
+        self._pending_reward += reward
+        
     def get_state(self):
         """Get current boss state for AI"""
         return {
@@ -68,7 +139,7 @@ class Boss:
             "behavior_mode": self.behavior_mode
         }
         
-    def update(self, player_x, player_y, screen_width):
+    def update(self, player_x, player_y, screen_width, snapshot=None, observation=None):
         """
         Update boss position and behavior
         
@@ -76,27 +147,84 @@ class Boss:
             player_x: Player X position
             player_y: Player Y position  
             screen_width: Screen width for boundary checking
+            snapshot: SimSnapshot of the game, required for planner mode
+            observation: Extra game_state entries (bullets, player velocity)
+                         for agents that use them
         """
         self.damaged = False
         self.shoot_cooldown = max(0, self.shoot_cooldown - 1)
         self.special_attack_cooldown = max(0, self.special_attack_cooldown - 1)
+        self.burst_cooldown = max(0, self.burst_cooldown - 1)
         
-        # AI decision making
-        if self.use_ai and self.rl_agent:
-            game_state = {
-                "player_x": player_x,
-                "boss_x": self.x,
-                "player_health": 5,  # TODO: get from game
-                "boss_health": self.health,
-                "player_pattern": "balanced"  # TODO: get from pattern analyzer
-            }
+        # Adopt the learner's newest policy before this frame's decision
+        if self.learner:
+            self.learner.sync(self.rl_agent)
             
+        game_state = {
+            "player_x": player_x,
+            "boss_x": self.x,
+            "player_health": 5,  # TODO: get from game
+            "boss_health": self.health,
+            "player_pattern": "balanced",  # TODO: get from pattern analyzer
+            "boss_max_health": self.max_health,
+            "shoot_ready": self.shoot_cooldown == 0,
+            "screen_width": screen_width
+        }
+        if observation:
+            game_state.update(observation)
+        
+        # AI decision making; the agent's policy fills the frames a
+        # planner decision is still being simulated
+        action = None
+        if self.planner and snapshot is not None:
+            action = self.planner.plan(snapshot, agent=self.rl_agent)
+            
+        if action is not None:
+            if self.use_ai and self.rl_agent:
+                # The agent keeps learning from the planned actions
+                self.rl_agent.observe_action(game_state, action)
+                self._record_transition()
+            self._execute_ai_action(action, player_x, screen_width)
+        elif self.use_ai and self.rl_agent:
             action = self.rl_agent.choose_action(game_state)
+            self._record_transition()
             self._execute_ai_action(action, player_x, screen_width)
         else:
             # Simple behavior
             self._simple_movement(player_x, screen_width)
             
+    def _record_transition(self, done=False):
+        """Close the previous frame's transition with this frame's state and store it"""
+        if self.replay is None and self.learner is None:
+            return
+        observation = self.rl_agent.current_observation()
+        if self._transition is not None:
+            state, action = self._transition
+            store = self.learner.submit if self.learner else self.replay.add
+            store(state, action, self._pending_reward, observation, done)
+        self._transition = None if done else (observation, self.rl_agent.actions.index(self.rl_agent.last_action))
+        self._pending_reward = 0.0
+        
+    def end_fight(self):
+        """Store the final (terminal) transition once the boss or the player is defeated"""
+        if self._transition is not None:
+            self._record_transition(done=True)
+            
+    def replay_for(self, seconds):
+        """Learn from replayed transitions for up to `seconds` (e.g. idle frame time)"""
+        if self.replay is None or seconds <= 0:
+            return 0
+        return self.replay.learn_for(self.rl_agent, seconds)
+        
+    def replay_batches(self, count):
+        """Learn from up to `count` replayed batches (e.g. between fights)"""
+        if self.replay is None:
+            return 0
+        done = 0
+        while done < count and self.replay.learn(self.rl_agent):
+            done += 1
+        return done
+        
     def _execute_ai_action(self, action, player_x, screen_width):
         """Execute action chosen by AI"""
         if action == "move_left":
@@ -113,6 +241,10 @@ class Boss:
                 self.x = min(screen_width - self.width - 2, self.x + self.speed * 1.5)
             else:
                 self.x = max(2, self.x - self.speed * 1.5)
+        elif action == "shoot_burst":
+            if self.burst_cooldown == 0:
+                self._volley = self.BURST_PATTERNS[self.behavior_mode]
+                self.burst_cooldown = self.BURST_COOLDOWN
                 
     def _simple_movement(self, player_x, screen_width):
         """Simple non-AI movement pattern"""
@@ -136,7 +268,7 @@ class Boss:
         else:
             chance = 0.03
             
-        if random.random() < chance:
+        if self.rng.random() < chance:
             self.shoot_cooldown = 20  # Cooldown frames
             return True
         return False
@@ -148,42 +280,60 @@ class Boss:
             
         # Special attack when health is low
         if self.health < self.max_health * 0.3:
-            if random.random() < 0.01:
+            if self.rng.random() < 0.01:
                 self.special_attack_cooldown = 300  # Long cooldown
                 return True
         return False
         
-    def draw(self, stdscr, attr):
-        """Draw boss with health indication"""
-        if self.damaged:
-            attr = curses.color_pair(3) | curses.A_REVERSE
-        elif self.health <= self.max_health // 3:
-            attr = curses.color_pair(3) | curses.A_BOLD
-        elif self.health <= self.max_health // 2:
-            attr = curses.color_pair(1) | curses.A_BOLD
+    def next_volley(self):
+        """
+        Bullet pattern to fire this frame, if any
+        
+        Returns:
+            str: The pattern a shoot_burst queued, else the special attack's
+                 when should_special_attack() says so, else None
+        """
+        volley, self._volley = self._volley, None
+        if volley is None and self.should_special_attack():
+            volley = self.SPECIAL_PATTERN
+        return volley
+        
+    @classmethod
+    def register_sprites(cls, atlas, attr):
+        """Pre-rasterize the boss in each health state and every health bar fill"""
+        atlas.add("boss", "normal", cls.SPRITE, attr)
+        atlas.add("boss", "damaged", cls.SPRITE, color_pair(3) | curses.A_REVERSE)
+        atlas.add("boss", "critical", cls.SPRITE, color_pair(3) | curses.A_BOLD)
+        atlas.add("boss", "hurt", cls.SPRITE, color_pair(1) | curses.A_BOLD)
+        
+        bar_width = len(cls.SPRITE[0])
+        for filled in range(bar_width + 1):
+            bar = "█" * filled + "░" * (bar_width - filled)
+            atlas.add("boss_health", (filled, False), [bar], color_pair(1))
+            atlas.add("boss_health", (filled, True), [bar], color_pair(3))
             
-        for i, line in enumerate(self.sprite):
-            try:
-                stdscr.addstr(int(self.y) + i, int(self.x), line, attr)
-            except curses.error:
-                pass
-                
-        # Draw health bar
-        self._draw_health_bar(stdscr)
+    def sprite_variant(self):
+        """Atlas variant for the current health state"""
+        if self.damaged:
+            return "damaged"
+        if self.health <= self.max_health // 3:
+            return "critical"
+        if self.health <= self.max_health // 2:
+            return "hurt"
+        return "normal"
         
-    def _draw_health_bar(self, stdscr):
-        """Draw boss health bar"""
-        bar_width = self.width
-        filled = int((self.health / self.max_health) * bar_width)
+    def draw(self, stdscr, atlas):
+        """Draw boss with health indication"""
+        atlas.blit(stdscr, "boss", self.sprite_variant(), self.y, self.x)
         
-        health_bar = "█" * filled + "░" * (bar_width - filled)
+        # Draw health bar
+        self._draw_health_bar(stdscr, atlas)
         
-        try:
-            stdscr.addstr(int(self.y) - 1, int(self.x), health_bar, 
-                         curses.color_pair(3) if self.health < self.max_health // 2 
-                         else curses.color_pair(1))
-        except curses.error:
-            pass
+    def _draw_health_bar(self, stdscr, atlas):
+        """Draw boss health bar"""
+        filled = max(0, int((self.health / self.max_health) * self.width))
+        low = self.health < self.max_health // 2
+        atlas.blit(stdscr, "boss_health", (filled, low), self.y - 1, self.x)
             
     def get_center(self):
         """Get center coordinates"""
@@ -0,0 +1,178 @@
+"""Scripted player bots for headless play, benchmarks and soak tests"""
+from ..utils.rng import RandomStream
+
+class Bot:
+    """
+    Input source that plays instead of a human.
+
+    A bot is called once per tick with the GameSimulation and returns the
+    commands for that tick (at most one move and one shot, like a
+    coalesced tick of key presses). Bots only read the state they need
+    (player, boss, enemy bullets), so they add next to nothing to a tick.
+    """
+
+    def __init__(self, seed=None, shoot_chance=0.3):
+        self.rng = RandomStream(seed)
+        self.shoot_chance = shoot_chance
+
+    def __call__(self, sim):
+        move = self.move(sim)
+        shoot = self.shoot(sim)
+        commands = [move] if move else []
+        if shoot:
+            commands.append("shoot")
+        return commands
+
+    def move(self, sim):
+        """"left", "right" or None"""
+        return None
+
+    def shoot(self, sim):
+        return self.rng.random() < self.shoot_chance
+
+    @staticmethod
+    def toward(sim, x, tolerance=1):
+        """Move that brings the ship's center to x"""
+        center = sim.player.x + sim.player.width // 2
+        if x < center - tolerance:
+            return "left"
+        if x > center + tolerance:
+            return "right"
+        return None
+
+    @staticmethod
+    def target_x(sim):
+        """x of the boss's center, else of the lowest enemy, else None"""
+        if sim.boss:
+            return sim.boss.get_center()[0]
+        if len(sim.enemies):
+            xs, ys = sim.enemies.centers()
+            return int(xs[ys.argmax()])
+        return None
+
+class RandomWalker(Bot):
+    """Walks in one direction for a while, then turns or pauses"""
+
+    def __init__(self, seed=None, shoot_chance=0.3, turn_chance=0.1):
+        super().__init__(seed, shoot_chance)
+        self.turn_chance = turn_chance
+        self.direction = None
+
+    def move(self, sim):
+        if self.rng.random() < self.turn_chance:
+            self.direction = self.rng.choice(["left", "right", None])
+        return self.direction
+
+class Dodger(Bot):
+    """
+    Steps out of the way of enemy bullets about to land on the ship;
+    otherwise lines up under the target and shoots
+    """
+
+    def __init__(self, seed=None, shoot_chance=0.5, lookahead=8, margin=2):
+        super().__init__(seed, shoot_chance)
+        self.lookahead = lookahead
+        self.margin = margin
+
+    def move(self, sim):
+        player = sim.player
+        left, right = player.x - self.margin, player.x + player.width + self.margin
+        bullets = sim.enemy_bullets
+        xs, ahead = bullets.x, player.y - bullets.y
+        threats = xs[(left <= xs) & (xs < right) & (-player.height < ahead) & (ahead <= self.lookahead)]
+        if len(threats):
+            # Away from the average threat, unless that runs into a wall
+            center = player.x + player.width // 2
+            away = "left" if threats.mean() >= center else "right"
+            if away == "left" and player.x <= 2:
+                away = "right"
+            elif away == "right" and player.x >= sim.W - player.width - 2:
+                away = "left"
+            return away
+
+        target = self.target_x(sim)
+        return self.toward(sim, target, tolerance=2) if target is not None else None
+
+class CornerCamper(Bot):
+    """Runs to one edge of the screen and shoots from there"""
+
+    def __init__(self, seed=None, shoot_chance=0.6, side="left"):
+        super().__init__(seed, shoot_chance)
+        if side not in ("left", "right"):
+            raise ValueError(f"Unknown side '{side}' (choose left or right)")
+        self.side = side
+
+    def move(self, sim):
+        player = sim.player
+        at_edge = player.x <= 2 if self.side == "left" else player.x >= sim.W - player.width - 2
+        return None if at_edge else self.side
+
+class SpamShooter(Bot):
+    """Fires every tick while following the target"""
+
+    def __init__(self, seed=None, shoot_chance=1.0, track=True):
+        super().__init__(seed, shoot_chance)
+        self.track = track
+
+    def move(self, sim):
+        target = self.target_x(sim) if self.track else None
+        return self.toward(sim, target) if target is not None else None
+
+class ProfileBot(Bot):
+    """
+    Plays like a recorded human, from a PatternAnalyzer player profile.
+
+    It moves about as often as the player did (avg_move_interval) with
+    their left/right preference, drifts back into their preferred x range
+    and fires at their shots_per_second, in bursts if they were a burst
+    shooter.
+    """
+
+    def __init__(self, profile, seed=None, fps=30, burst=3):
+        if not profile:
+            raise ValueError("No recorded sessions to build a player profile from")
+        movement = profile["movement"]
+        shooting = profile["shooting"]
+        positioning = profile["positioning"]
+
+        interval = movement["avg_move_interval"]
+        self.move_chance = min(1.0, 1.0 / (interval * fps)) if interval > 0 else 0.1
+        moves = movement["left_preference"] + movement["right_preference"]
+        self.left_chance = movement["left_preference"] / moves if moves else 0.5
+        self.x_range = positioning["preferred_x_range"]
+        self.burst = burst if shooting["burst_shooter"] else 1
+
+        # Same number of shots per second, grouped into bursts
+        super().__init__(seed, min(1.0, shooting["shots_per_second"] / fps / self.burst))
+        self.burst_left = 0
+
+    def move(self, sim):
+        if self.rng.random() >= self.move_chance:
+            return None
+        low, high = self.x_range
+        if high > low and not low <= sim.player.x <= high:
+            return "right" if sim.player.x < low else "left"
+        return "left" if self.rng.random() < self.left_chance else "right"
+
+    def shoot(self, sim):
+        if self.burst_left:
+            self.burst_left -= 1
+            return True
+        if self.rng.random() < self.shoot_chance:
+            self.burst_left = self.burst - 1
+            return True
+        return False
+
+BOTS = {
+    "random": RandomWalker,
+    "dodger": Dodger,
+    "camper": CornerCamper,
+    "spammer": SpamShooter,
+    "profile": ProfileBot
+}
+
+def create_bot(kind="random", **kwargs):
+    """Instantiate a bot by name (player.bot)"""
+    if kind not in BOTS:
+        raise ValueError(f"Unknown bot '{kind}' (choose from {', '.join(BOTS)})")
+    return BOTS[kind](**kwargs)
@@ -1,105 +1,234 @@
 """Enemy entities"""
-import random
 import curses
+import numpy as np
+from ..rendering.themes import color_pair
+from ..utils.rng import RandomStream
 
-class Enemy:
-    def __init__(self, x, y, enemy_type="fighter"):
-        self.x, self.y = x, y
-        self.enemy_type = enemy_type
-        self.last_shot = 0
-        self.original_x = x
-        self.time = 0
-        self.damaged = False
-        
-        if enemy_type == "fighter":
-            self.sprite = [" ▼ ", "███", " █ "]
-            self.width, self.height = 3, 3
-            self.speed = 0.3
-            self.shoot_chance = 0.012
-            self.move_pattern = "horizontal"
-            self.max_health = 3
-            self.health = self.max_health
-            self.direction = random.choice([-1, 1])
-            
-        elif enemy_type == "bomber":
-            self.sprite = ["  ▼  ", " ███ ", "█████", " ███ "]
-            self.width, self.height = 5, 4
-            self.speed = 0.2
-            self.shoot_chance = 0.020
-            self.move_pattern = "horizontal"
-            self.max_health = 8
-            self.health = self.max_health
-            self.direction = random.choice([-1, 1])
-            
-        elif enemy_type == "interceptor":
-            self.sprite = ["▼", "█", "█"]
-            self.width, self.height = 1, 3
-            self.speed = 0.5
-            self.shoot_chance = 0.008
-            self.move_pattern = "horizontal"
-            self.max_health = 2
-            self.health = self.max_health
-            self.direction = random.choice([-1, 1])
-            
-        elif enemy_type == "ground_turret":
-            self.sprite = ["░▓░", "███", "▀▀▀"]
-            self.width, self.height = 3, 3
-            self.speed = 0
-            self.shoot_chance = 0.018
-            self.move_pattern = "stationary"
-            self.max_health = 10
-            self.health = self.max_health
-            self.direction = 0
-            
-    def take_damage(self):
-        """Apply damage and return True if destroyed"""
-        self.health -= 1
-        self.damaged = True
-        return self.health <= 0
-        
-    def update(self):
-        """Update enemy position and state"""
-        self.time += 0.1
-        self.damaged = False
-        
-        if self.move_pattern == "horizontal":
-            self.x += self.speed * self.direction
-            
-            if self.x <= 2:
-                self.direction = 1
-            elif self.x >= 80 - self.width:
-                self.direction = -1
-                
-        elif self.move_pattern == "stationary":
-            pass
+SPRITES = {
+    "fighter": [" ▼ ", "███", " █ "],
+    "bomber": ["  ▼  ", " ███ ", "█████", " ███ "],
+    "interceptor": ["▼", "█", "█"],
+    "ground_turret": ["░▓░", "███", "▀▀▀"]
+}
+
+# Per-type stats: (width, height, speed, shoot_chance, max_health, moves)
+STATS = {
+    "fighter": (3, 3, 0.3, 0.012, 3, True),
+    "bomber": (5, 4, 0.2, 0.020, 8, True),
+    "interceptor": (1, 3, 0.5, 0.008, 2, True),
+    "ground_turret": (3, 3, 0.0, 0.018, 10, False)
+}
+
+ENEMY_TYPES = list(SPRITES)
+
+# Stat columns indexed by type code (ENEMY_TYPES index)
+WIDTH, HEIGHT, SPEED, SHOOT_CHANCE, MAX_HEALTH, MOVES = (
+    np.array(column) for column in zip(*(STATS[name] for name in ENEMY_TYPES))
+)
+
+# Per-enemy columns (the order SimSnapshot stores them in)
+FIELDS = ["x", "y", "original_x", "time", "health", "direction", "last_shot"]
+
+class EnemyFleet:
+    """
+    All enemies of a wave as parallel NumPy arrays.
+    
+    Each enemy is a row: position, health, direction and type code, with
+    the per-type stats looked up from STATS. step() moves every enemy,
+    bounces them off the real screen edges and decides who shoots with a
+    single batched draw from the fleet's RandomStream; collisions and
+    rendering work on the same arrays, so a frame costs a few array
+    operations however many enemies there are.
+    """
+    
+    def __init__(self, rng=None, capacity=16):
+        self.rng = rng or RandomStream()
+        self.n = 0
+        self._data = np.zeros((capacity, len(FIELDS)))
+        self._types = np.zeros(capacity, dtype=np.int8)
+        self._damaged = np.zeros(capacity, dtype=bool)
+        
+    @classmethod
+    def from_rows(cls, rows, types, rng=None):
+        """
+        Fleet from FIELDS rows and type codes (see SimSnapshot)
+        
+        Returns:
+            EnemyFleet: Independent copy of the rows
+        """
+        fleet = cls(rng, capacity=max(16, len(rows)))
+        fleet.n = len(rows)
+        fleet._data[:fleet.n] = rows
+        fleet._types[:fleet.n] = types
+        return fleet
+        
+    def __len__(self):
+        return self.n
+        
+    def _column(self, name):
+        return self._data[:self.n, FIELDS.index(name)]
+        
+    @property
+    def x(self):
+        return self._column("x")
+        
+    @property
+    def y(self):
+        return self._column("y")
+        
+    @property
+    def health(self):
+        return self._column("health")
+        
+    @property
+    def direction(self):
+        return self._column("direction")
+        
+    @property
+    def types(self):
+        return self._types[:self.n]
+        
+    @property
+    def damaged(self):
+        return self._damaged[:self.n]
+        
+    @property
+    def width(self):
+        return WIDTH[self.types]
+        
+    @property
+    def height(self):
+        return HEIGHT[self.types]
+        
+    def rows(self):
+        """Copy of the FIELDS rows"""
+        return self._data[:self.n].copy()
+        
+    def type_names(self):
+        return [ENEMY_TYPES[code] for code in self.types.tolist()]
+        
+    def spawn(self, x, y, enemy_type="fighter"):
+        """Add an enemy (moving types start in a random direction)"""
+        if self.n == len(self._data):
+            grow = len(self._data)
+            self._data = np.concatenate([self._data, np.zeros_like(self._data[:grow])])
+            self._types = np.concatenate([self._types, np.zeros(grow, dtype=np.int8)])
+            self._damaged = np.concatenate([self._damaged, np.zeros(grow, dtype=bool)])
             
-    def should_shoot(self):
-        """Determine if enemy should shoot this frame"""
-        return random.random() < self.shoot_chance
-        
-    def is_offscreen(self, h, w):
-        """Check if enemy is offscreen (currently always False)"""
-        return False
-        
-    def draw(self, stdscr, attr):
-        """Draw enemy with damage indication"""
-        if self.damaged:
-            attr = curses.color_pair(3) | curses.A_REVERSE
-        elif self.health <= self.max_health // 2:
-            attr = curses.color_pair(3) | curses.A_BOLD
+        code = ENEMY_TYPES.index(enemy_type)
+        direction = (1 if self.rng.random() < 0.5 else -1) if MOVES[code] else 0
+        self._data[self.n] = (x, y, x, 0.0, MAX_HEALTH[code], direction, 0)
+        self._types[self.n] = code
+        self._damaged[self.n] = False
+        self.n += 1
+        
+    def remove(self, indices):
+        """Remove enemies, keeping the others in order"""
+        keep = np.ones(self.n, dtype=bool)
+        keep[indices] = False
+        count = int(keep.sum())
+        self._data[:count] = self._data[:self.n][keep]
+        self._types[:count] = self._types[:self.n][keep]
+        self._damaged[:count] = self._damaged[:self.n][keep]
+        self.n = count
+        
+    def clear(self):
+        self.n = 0
+        
+    def occupied(self, x, y, dx=6, dy=4):
+        """True if an enemy is within dx columns and dy rows of (x, y)"""
+        return bool(np.any((np.abs(self.x - x) < dx) & (np.abs(self.y - y) < dy)))
+        
+    def step(self, screen_width):
+        """
+        Move every enemy and decide who shoots this frame
+        
+        Moving enemies bounce between column 2 and the right edge of the
+        screen. Shot decisions are one batched draw for the whole fleet.
+        
+        Returns:
+            np.ndarray: Indices of the enemies that shoot
+        """
+        n = self.n
+        data = self._data[:n]
+        types = self.types
+        self.damaged[:] = False
+        data[:, FIELDS.index("time")] += 0.1
+        
+        x, direction = self.x, self.direction
+        x += SPEED[types] * direction
+        moves = MOVES[types]
+        direction[moves & (x <= 2)] = 1
+        direction[moves & (x >= screen_width - WIDTH[types])] = -1
+        
+        return np.flatnonzero(self.rng.random(n) < SHOOT_CHANCE[types])
+        
+    def centers(self, indices=None):
+        """
+        Center cells of the enemies (all, or the given indices)
+        
+        Returns:
+            tuple: (x, y) int arrays
+        """
+        indices = slice(None) if indices is None else indices
+        types = self.types[indices]
+        return ((self.x[indices] + WIDTH[types] // 2).astype(np.int64),
+                (self.y[indices] + HEIGHT[types] // 2).astype(np.int64))
+        
+    def bullet_hits(self, bx, by):
+        """
+        Which enemies' sprite areas contain which bullets
+        
+        Args:
+            bx, by: Bullet coordinate arrays
+        
+        Returns:
+            np.ndarray: (bullets, enemies) bool matrix
+        """
+        ex = self.x.astype(np.int64)
+        ey = self.y.astype(np.int64)
+        types = self.types
+        bx, by = np.asarray(bx)[:, None], np.asarray(by)[:, None]
+        return (ex <= bx) & (bx < ex + WIDTH[types]) & (ey <= by) & (by < ey + HEIGHT[types])
+        
+    def damage(self, index):
+        """Apply one hit and return True if the enemy is destroyed"""
+        self._data[index, FIELDS.index("health")] -= 1
+        self._damaged[index] = True
+        return self._data[index, FIELDS.index("health")] <= 0
+        
+    def touching(self, player):
+        """
+        First enemy whose top-left cell lies on the player's ship
+        
+        Returns:
+            int: Enemy index, or None
+        """
+        dx = self.x.astype(np.int64) - player.x
+        dy = self.y.astype(np.int64) - player.y
+        inside = (dx >= 0) & (dx < player.width) & (dy >= 0) & (dy < player.height)
+        if not inside.any():
+            return None
+        ship = np.array([[c != ' ' for c in row] for row in player.ship])
+        rows = np.flatnonzero(inside)
+        touching = rows[ship[dy[rows], dx[rows]]]
+        return int(touching[0]) if len(touching) else None
+        
+    def sprite_variants(self):
+        """Atlas variant per enemy: damaged this frame, hurt (half health) or normal"""
+        hurt = self.health <= MAX_HEALTH[self.types] // 2
+        return np.where(self.damaged, "damaged", np.where(hurt, "hurt", "normal"))
+        
+    @classmethod
+    def register_sprites(cls, atlas, attr):
+        """Pre-rasterize every enemy type in each damage state"""
+        for enemy_type, rows in SPRITES.items():
+            atlas.add(enemy_type, "normal", rows, attr)
+            atlas.add(enemy_type, "damaged", rows, color_pair(3) | curses.A_REVERSE)
+            atlas.add(enemy_type, "hurt", rows, color_pair(3) | curses.A_BOLD)
             
-        for i, line in enumerate(self.sprite):
-            try:
-                stdscr.addstr(int(self.y) + i, int(self.x), line, attr)
-            except curses.error:
-                pass
-                
-    def get_center(self):
-        """Get center coordinates of enemy"""
-        return int(self.x + self.width // 2), int(self.y + self.height // 2)
-        
-    def get_hitbox(self):
-        """Get hitbox coordinates for collision detection"""
-        return [(int(self.x) + dx, int(self.y) + dy) 
-                for dy in range(self.height) 
-                for dx in range(self.width)]
+    def draw(self, stdscr, atlas):
+        """Draw every enemy with its damage indication"""
+        for name, variant, y, x in zip(self.type_names(), self.sprite_variants().tolist(),
+                                       self.y.tolist(), self.x.tolist()):
+            atlas.blit(stdscr, name, variant, y, x)
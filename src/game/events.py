@@ -0,0 +1,135 @@
+"""Frame-scoped game event buffer"""
+import numpy as np
+from .enemy import ENEMY_TYPES
+
+# Event types and their payload fields, in code order. Label fields store
+# an index into LABELS; "weight" is the share of a shot (see BulletStore).
+EVENTS = {
+    "move_left": ("x",),
+    "move_right": ("x",),
+    "shoot": ("x", "y"),
+    "hit": ("target",),
+    "death": ("cause",),
+    "missed": ("weight",),
+    "dodged": ("weight",),
+    "victory": ()
+}
+
+EVENT_NAMES = list(EVENTS)
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}
+
+LABELS = {
+    "target": ["boss"] + ENEMY_TYPES,
+    "cause": ["bullet", "enemy_collision", "boss_collision"]
+}
+
+class EventBuffer:
+    """
+    The game events of one frame, as rows of one NumPy array.
+
+    Each event is a compact (code, value, value) row appended while the
+    frame runs; nothing is dispatched until flush(), which hands the whole
+    batch to every subscriber (behavior tracker, boss rewards, HUD
+    counters) once. Subscribers query the batch with array operations
+    (total(), totals()) or decode only the events they keep (records()).
+    The events stay readable until the next frame's clear().
+    """
+
+    def __init__(self, capacity=64):
+        self.n = 0
+        self._rows = np.zeros((capacity, 3))
+        self._handlers = []
+
+    def subscribe(self, handler):
+        """Call handler(buffer) with every flushed batch"""
+        self._handlers.append(handler)
+
+    def clear(self):
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, name):
+        return bool(np.any(self._rows[:self.n, 0] == EVENT_CODES[name]))
+
+    def emit(self, name, *values):
+        """
+        Record an event, payload in EVENTS field order (labels as strings)
+
+        Raises:
+            KeyError: Unknown event type
+        """
+        fields = EVENTS[name]
+        if self.n == len(self._rows):
+            self._rows = np.concatenate([self._rows, np.zeros_like(self._rows)])
+        row = [EVENT_CODES[name], 0.0, 0.0]
+        for i, (field, value) in enumerate(zip(fields, values), 1):
+            row[i] = LABELS[field].index(value) if field in LABELS else value
+        self._rows[self.n] = row
+        self.n += 1
+
+    def flush(self):
+        """Dispatch the frame's events to every subscriber in one batch"""
+        if not self.n:
+            return
+        for handler in self._handlers:
+            handler(self)
+
+    def total(self, name, **labels):
+        """
+        How many `name` events match the labels (e.g. target="boss")
+
+        Returns:
+            float: Count, or the summed weights for types with a weight
+        """
+        rows = self._rows[:self.n]
+        fields = EVENTS[name]
+        match = rows[:, 0] == EVENT_CODES[name]
+        for field, label in labels.items():
+            match &= rows[:, 1 + fields.index(field)] == LABELS[field].index(label)
+        if "weight" in fields:
+            return float(rows[match, 1 + fields.index("weight")].sum())
+        return float(np.count_nonzero(match))
+
+    def totals(self):
+        """Number of events of each type, in EVENTS order"""
+        return np.bincount(self._rows[:self.n, 0].astype(np.int64), minlength=len(EVENTS))
+
+    def records(self, names=None):
+        """
+        Events decoded into (name, data) pairs, in order
+
+        Args:
+            names: Only these event types (all if None)
+
+        Returns:
+            list: (name, {field: value}) with labels as strings
+        """
+        names = EVENT_NAMES if names is None else names
+        rows = self._rows[:self.n]
+        keep = np.isin(rows[:, 0], [EVENT_CODES[name] for name in names])
+        records = []
+        for code, a, b in rows[keep].tolist():
+            name = EVENT_NAMES[int(code)]
+            data = {}
+            for field, value in zip(EVENTS[name], (a, b)):
+                data[field] = LABELS[field][int(value)] if field in LABELS else _number(value)
+            records.append((name, data))
+        return records
+
+class EventCounter:
+    """Running count of every event type (HUD counters), fed whole batches"""
+
+    def __init__(self):
+        self.counts = np.zeros(len(EVENTS), dtype=np.int64)
+
+    def __call__(self, events):
+        self.counts += events.totals()
+
+    def __getitem__(self, name):
+        return int(self.counts[EVENT_CODES[name]])
+
+def _number(value):
+    """Positions as ints, weights as floats"""
+    return int(value) if value == int(value) else value
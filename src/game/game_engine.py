@@ -1,371 +1,477 @@
 """Main game engine with AI integration"""
 import curses
 import time
-import random
-from ..rendering.themes import init_colors
+from ..rendering.themes import init_colors, color_pair
 from ..rendering.effects import StarField, BG_EFFECTS
+from ..rendering.sprites import SpriteAtlas
+from ..rendering.lod import LODController
+from ..rendering.pipeline import DirectOutput, RenderWorker
+from ..rendering.framebuffer import FrameBuffer
 from ..ai.behavior_tracker import BehaviorTracker
 from ..ai.pattern_analyzer import PatternAnalyzer
+from ..ai.session_store import SessionStore
+from ..ai.retention import SessionCompactor
+from ..ai.planner import LookaheadPlanner
+from ..ai.replay import PrioritizedReplay
+from ..ai.learner import OnlineLearner
+from ..ai.checkpoint import Checkpointer
+from ..ai.player_store import PlayerStore
+from ..ai.linear_agent import AGENTS
+from ..net.spectator import SpectatorServer
+from ..utils.config import load_config
+from ..utils.rng import RNGService
 from .player import Player
-from .enemy import Enemy
+from .enemy import EnemyFleet
 from .boss import Boss
-from .projectiles import Bullet, EnemyBullet
-from .collision import check_collision, check_bullet_collision
+from .projectiles import Bullet, BulletStore
+from .simulation import GameSimulation
+from .events import EventCounter
+from .bots import create_bot
+
+# Keys the game reacts to, as simulation input commands
+KEY_COMMANDS = {
+    ord('q'): "quit", ord('Q'): "quit",
+    curses.KEY_LEFT: "left", ord('a'): "left",
+    curses.KEY_RIGHT: "right", ord('d'): "right",
+    ord(' '): "shoot"
+}
+
+def build_atlas(attr_primary, attr_acc, attr_alt):
+    """Pre-rasterize every entity sprite variant for the current theme"""
+    atlas = SpriteAtlas()
+    Player.register_sprites(atlas, attr_primary)
+    EnemyFleet.register_sprites(atlas, attr_alt)
+    Boss.register_sprites(atlas, attr_primary)
+    Bullet.register_sprites(atlas, attr_acc)
+    BulletStore.register_sprites(atlas, color_pair(3) | curses.A_BOLD)
+    return atlas
 
 class GameEngine:
     """Main game engine orchestrating gameplay and AI"""
     
-    def __init__(self, theme="neo", use_ai=True, mode="normal"):
+    def __init__(self, theme="neo", use_ai=True, mode="normal", config=None):
         self.theme = theme
         self.use_ai = use_ai
         self.mode = mode
+        self.config = config or load_config()
+        self.fps = self.config["game"]["fps"]
         
-        # AI components
-        self.behavior_tracker = BehaviorTracker() if use_ai else None
-        self.pattern_analyzer = PatternAnalyzer() if use_ai else None
+        # One seeded stream per subsystem (game.seed; random when unset)
+        self.rngs = RNGService(self.config["game"]["seed"])
+        # Seeded runs must not depend on timing, so idle-time replay and
+        # planning then do a fixed amount of work per frame
+        self.seeded = self.config["game"]["seed"] is not None
         
-    def run(self, stdscr):
-        """Main game loop"""
-        curses.curs_set(0)
-        stdscr.nodelay(True)
-        stdscr.timeout(30)
+        # Background/HUD detail adapts to measured frame time
+        self.lod = LODController(target_fps=self.fps)
+        self.show_fps = self.config["rendering"]["show_fps"]
+        self._hud_text = None
+        self.counters = EventCounter()  # HUD totals, fed the sim's event batches
         
-        attr_primary, attr_dim, attr_acc, attr_alt, attr_bg = init_colors(self.theme)
-        stdscr.bkgd(' ', attr_bg)
+        # Present frames from a worker thread so terminal writes can't stall the game
+        self.render_thread = self.config["rendering"]["render_thread"]
+        self.output = None
+        self.sim = None
+        
+        # Optional live stream of the frames for spectators
+        network = self.config["network"]
+        self.spectators = SpectatorServer(
+            network["spectate_address"],
+            max_queue=network["spectator_queue"]
+        ) if network["spectate"] else None
+        
+        # With data.player, models, sessions and checkpoints are that player's own
+        data, ai = self.config["data"], self.config["ai"]
+        self.players = PlayerStore(
+            data["players_dir"],
+            capacity=data["player_cache"]
+        ) if use_ai and data["player"] else None
+        self.profile = self.players.acquire(data["player"]) if self.players else None
+        
+        # AI components share one session store connection
+        if self.profile:
+            self.session_store = self.profile.store
+        else:
+            self.session_store = SessionStore() if use_ai else None
+        self.behavior_tracker = BehaviorTracker(
+            store=self.session_store,
+            max_sample_interval=data["position_max_interval"],
+            simplify_tolerance=data["trajectory_tolerance"]
+        ) if use_ai else None
+        if self.profile:
+            self.pattern_analyzer = self.profile.analyzer
+        else:
+            self.pattern_analyzer = PatternAnalyzer(store=self.session_store) if use_ai else None
+        
+        # A scripted bot can play instead of the keyboard (player.bot)
+        bot = self.config["player"]["bot"]
+        if bot == "profile":
+            analyzer = self.pattern_analyzer or PatternAnalyzer()
+            self.bot = create_bot(bot, profile=analyzer.get_player_profile(), fps=self.fps)
+        else:
+            self.bot = create_bot(bot) if bot else None
+        if self.bot:
+            self.bot.rng = self.rngs.stream("bot")
+        
+        # Optional Monte-Carlo lookahead for the boss, bounded per frame
+        self.planner = LookaheadPlanner(
+            budget_ms=ai["planner_budget_ms"],
+            horizon=ai["planner_horizon"],
+            rollouts=ai["planner_rollouts"],
+            seed=self.rngs.stream("planner").generator,
+            steps_per_frame=ai["planner_seeded_steps"] if self.seeded else None,
+            patterns=self.config["boss"]["patterns"]
+        ) if ai["planner"] else None
+        
+        # Optional learner process: transitions go to it, policies come back
+        self.learner = OnlineLearner(
+            ai["agent"],
+            model_data=self.profile.agent(ai["agent"]).model_data() if self.profile else None,
+            publish_interval=ai["learner_publish_interval"],
+            replay_ratio=ai["learner_replay_ratio"],
+            capacity=ai["replay_capacity"],
+            batch_size=ai["replay_batch"],
+            alpha=ai["replay_alpha"],
+            beta=ai["replay_beta"]
+        ).start() if use_ai and ai["learner"] else None
+        
+        # Otherwise every boss frame becomes a transition, replayed in idle
+        # frame time and after fights
+        self.replay = PrioritizedReplay.for_agent(
+            AGENTS[ai["agent"]],
+            ai["replay_capacity"],
+            batch_size=ai["replay_batch"],
+            alpha=ai["replay_alpha"],
+            beta=ai["replay_beta"],
+            seed=self.rngs.stream("replay").generator
+        ) if use_ai and ai["replay"] and not self.learner else None
+        self.replay_end_batches = ai["replay_end_batches"]
+        
+        # Periodic crash-safe checkpoints; a session a crash left unsaved is stored now
+        self.checkpointer = Checkpointer(
+            self.profile.checkpoint_dir if self.profile else ai["checkpoint_dir"],
+            interval=ai["save_model_every"],
+            keep=ai["checkpoint_keep"]
+        ) if use_ai and ai["auto_save"] else None
+        if self.checkpointer:
+            recovered = self.checkpointer.recover(self.session_store)
+            if recovered:
+                print(f"♻️  Recovered unsaved session {recovered} from the last checkpoint")
+        
+        # Old sessions are compacted in the background once the game ends
+        self.compactor = SessionCompactor(
+            self.profile.data_dir if self.profile else "data/player_data",
+            retention_days=data["data_retention_days"]
+        ) if use_ai else None
         
-        H, W = stdscr.getmaxyx()
+    def setup(self, stdscr, render_thread=None):
+        """
+        Prepare the screen, output path, sprites and a fresh game
         
-        # Initialize game state
-        player = Player(H, W)
-        bullets = []
-        enemies = []
-        enemy_bullets = []
-        boss = None
+        Args:
+            stdscr: curses window or AnsiScreen
+            render_thread: Present through a RenderWorker (default:
+                           rendering.render_thread)
         
-        score = 0
-        lives = 5
-        wave = 1
-        game_speed = 0
-        enemy_spawn_counter = 0
-        enemies_killed_this_wave = 0
+        Returns:
+            tuple: (output, sim)
+        """
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        stdscr.nodelay(True)
+        stdscr.timeout(0)
+        
+        self.colors = init_colors(self.theme)
+        attr_primary, attr_dim, attr_acc, attr_alt, attr_bg = self.colors
+        stdscr.bkgd(' ', attr_bg)
+        self.atlas = build_atlas(attr_primary, attr_acc, attr_alt)
         
-        # Movement tracking
-        keys_pressed = {'left': False, 'right': False}
+        # Frames go to the terminal directly or through the render worker;
+        # spectating needs an off-screen frame, which plain curses doesn't have
+        if render_thread is None:
+            render_thread = self.render_thread
+        threaded = render_thread or (self.spectators and not isinstance(stdscr, FrameBuffer))
+        self.output = RenderWorker(stdscr) if threaded else DirectOutput(stdscr)
+        if self.output.target is not stdscr:
+            self.output.target.bkgd(' ', attr_bg)
+        
+        H, W = self.output.getmaxyx()
+        self.sim = GameSimulation(H, W, mode=self.mode, use_ai=self.use_ai,
+                                  behavior_tracker=self.behavior_tracker,
+                                  lives=self.config["player"]["lives"],
+                                  planner=self.planner,
+                                  agent=self.config["ai"]["agent"],
+                                  replay=self.replay,
+                                  learner=self.learner,
+                                  profile=self.profile,
+                                  max_enemies=self.config["game"]["max_enemies"],
+                                  rngs=self.rngs,
+                                  patterns=self.config["boss"]["patterns"],
+                                  analyzer=self.pattern_analyzer)
+        self.sim.events.subscribe(self.counters)
         
         # Background effects
-        stars = StarField(count=min(300, H * W // 50))
-        stars.rebuild(H, W)
+        self.stars = StarField(count=min(300, H * W // 50), rng=self.rngs.stream("effects"))
+        self.stars.rebuild(H, W)
         
-        # Boss mode
-        if self.mode == "boss":
-            boss = Boss(W // 2 - 4, 5, use_ai=self.use_ai)
-            
-        # Track frame times for behavior logging
-        last_position_track = time.time()
-        position_track_interval = 0.1  # Track position every 100ms
-        
-        while lives > 0:
-            game_speed += 1
-            old_h, old_w = H, W
-            H, W = stdscr.getmaxyx()
+        if self.spectators:
+            self.spectators.start()
+        return self.output, self.sim
+        
+    def present(self):
+        """Show the drawn frame and stream it to any spectators"""
+        self.output.present()
+        if self.spectators:
+            self.spectators.broadcast(self.output.target)
             
-            # Handle resize
-            if (H, W) != (old_h, old_w):
-                player = Player(H, W)
-                stars.rebuild(H, W)
-                
-            # Input handling
-            try:
-                ch = stdscr.getch()
-            except:
-                ch = -1
-                
-            if ch == ord('q') or ch == ord('Q'):
-                break
-            elif ch == curses.KEY_LEFT or ch == ord('a'):
-                keys_pressed['left'] = True
-                if self.behavior_tracker:
-                    self.behavior_tracker.track_action("move_left", {"x": player.x})
-            elif ch == curses.KEY_RIGHT or ch == ord('d'):
-                keys_pressed['right'] = True
-                if self.behavior_tracker:
-                    self.behavior_tracker.track_action("move_right", {"x": player.x})
-            elif ch == ord(' '):
-                center_x, center_y = player.get_center()
-                bullets.append(Bullet(center_x, center_y - 1))
-                if self.behavior_tracker:
-                    self.behavior_tracker.track_action("shoot", {"x": center_x, "y": center_y})
-                    
-            # Apply movement
-            if keys_pressed['left']:
-                player.move_left()
-                keys_pressed['left'] = False
-            if keys_pressed['right']:
-                player.move_right()
-                keys_pressed['right'] = False
-                
-            # Track player position periodically
-            current_time = time.time()
-            if self.behavior_tracker and (current_time - last_position_track) >= position_track_interval:
-                self.behavior_tracker.track_position(player.x, player.y)
-                last_position_track = current_time
-                
-            # Update bullets
-            bullets = [b for b in bullets if not b.is_offscreen()]
-            for bullet in bullets:
-                bullet.update()
-                
-            # Update enemy bullets
-            enemy_bullets = [b for b in enemy_bullets if not b.is_offscreen(H)]
-            for bullet in enemy_bullets:
-                bullet.update()
-                
-            # Boss mode logic
-            if boss:
-                boss.update(player.x, player.y, W)
+    def shutdown(self):
+        """Stop the output path and the spectator server"""
+        self.output.stop()
+        if self.spectators:
+            self.spectators.stop()
+        
+    def run(self, stdscr):
+        """Main game loop"""
+        output, sim = self.setup(stdscr)
+        frame_budget = 1.0 / self.fps
+        
+        output.start()
+        try:
+            while not sim.over:
+                frame_start = time.perf_counter()
+                self.check_resize()
                 
-                # Boss shooting
-                if boss.should_shoot():
-                    center_x, center_y = boss.get_center()
-                    enemy_bullets.append(EnemyBullet(center_x, center_y + 1))
+                # Input handling
+                command = KEY_COMMANDS.get(output.getch())
+                events = sim.step(self.input_commands([command] if command else []))
+                if sim.over:
+                    break
                     
-                # Check player bullets hitting boss
-                new_bullets = []
-                for bullet in bullets:
-                    hit = False
-                    if check_bullet_collision(bullet, boss):
-                        if boss.take_damage():
-                            # Boss defeated!
-                            score += 1000
-                            self._show_victory(stdscr, H, W, score, attr_acc, attr_primary)
-                            if self.behavior_tracker:
-                                self.behavior_tracker.save_session()
-                            if boss:
-                                boss.save_training()
-                            return
-                        else:
-                            score += 10
-                            if self.behavior_tracker:
-                                self.behavior_tracker.track_action("hit", {"target": "boss"})
-                        hit = True
-                    if not hit:
-                        new_bullets.append(bullet)
-                bullets = new_bullets
-                
-            else:
-                # Normal mode: wave-based enemies
-                max_enemies = min(8 + wave, 15)
-                
-                if len(enemies) < max_enemies:
-                    if enemy_spawn_counter % 30 == 0:
-                        x = random.randint(5, W - 8)
-                        y_positions = [5, 8, 11, 14]
-                        y = random.choice(y_positions)
+                if "death" in events:
+                    self._flash_screen()
                         
-                        if wave <= 2:
-                            enemy_type = random.choice(["fighter", "interceptor"])
-                        else:
-                            enemy_type = random.choice(["fighter", "bomber", "interceptor"])
-                            
-                        position_free = True
-                        for existing_enemy in enemies:
-                            if (abs(existing_enemy.x - x) < 6 and 
-                                abs(existing_enemy.y - y) < 4):
-                                position_free = False
-                                break
-                                
-                        if position_free:
-                            enemies.append(Enemy(x, y, enemy_type))
-                            
-                enemy_spawn_counter += 1
+                self.draw_frame()
+                self.present()
                 
-                # Update enemies
-                for enemy in enemies:
-                    enemy.update()
-                    if enemy.should_shoot():
-                        center_x, center_y = enemy.get_center()
-                        enemy_bullets.append(EnemyBullet(center_x, center_y + 1))
-                        
-                # Check bullet collisions
-                new_bullets = []
-                for bullet in bullets:
-                    hit = False
-                    for enemy in enemies[:]:
-                        if check_bullet_collision(bullet, enemy):
-                            if enemy.take_damage():
-                                # Enemy destroyed
-                                score += {"fighter": 100, "bomber": 300, 
-                                         "interceptor": 150, "ground_turret": 500}.get(enemy.enemy_type, 100)
-                                
-                                if self.behavior_tracker:
-                                    self.behavior_tracker.track_action("hit", {"target": enemy.enemy_type})
-                                
-                                enemies_killed_this_wave += 1
-                                enemies.remove(enemy)
-                                
-                                # Spawn new enemy
-                                if len(enemies) < max_enemies:
-                                    new_x = random.randint(5, W - 8)
-                                    new_y = random.choice([5, 8, 11, 14])
-                                    new_type = random.choice(["fighter", "bomber", "interceptor"])
-                                    enemies.append(Enemy(new_x, new_y, new_type))
-                            else:
-                                score += 5
-                                
-                            hit = True
-                            break
-                    if not hit:
-                        new_bullets.append(bullet)
-                bullets = new_bullets
+                # Hold the configured frame rate; shed detail if the work doesn't fit
+                work_time = time.perf_counter() - frame_start
+                self.record_frame_time(work_time)
+                self.replay_idle(frame_budget - work_time)
+                self.checkpoint()
+                time.sleep(max(0.0, frame_budget - (time.perf_counter() - frame_start)))
                 
-                # Wave progression
-                if enemies_killed_this_wave >= wave * 5:
-                    wave += 1
-                    enemies_killed_this_wave = 0
-                    
-                    # Enter boss mode after wave 3
-                    if wave == 4 and not boss:
-                        enemies = []
-                        enemy_bullets = []
-                        boss = Boss(W // 2 - 4, 5, use_ai=self.use_ai)
-                        
-            # Check player collisions
-            for enemy in enemies[:]:
-                if check_collision(player, enemy):
-                    lives -= 1
-                    enemies.remove(enemy)
-                    if self.behavior_tracker:
-                        self.behavior_tracker.track_action("death", {"cause": "enemy_collision"})
-                    self._flash_screen(stdscr)
-                    break
-                    
-            if boss and check_collision(player, boss):
-                lives -= 1
-                if self.behavior_tracker:
-                    self.behavior_tracker.track_action("death", {"cause": "boss_collision"})
-                self._flash_screen(stdscr)
-                    
-            for bullet in enemy_bullets[:]:
-                if check_collision(player, bullet):
-                    lives -= 1
-                    enemy_bullets.remove(bullet)
-                    if self.behavior_tracker:
-                        self.behavior_tracker.track_action("death", {"cause": "bullet"})
-                    self._flash_screen(stdscr)
+            self._start_compaction()
+            for _ in range(self.end_screen_frames()):
+                self.draw_end_screen()
+                self.present()
+                time.sleep(0.1)
+                
+            while not sim.victory:
+                ch = output.wait_key()
+                if ch == ord('q') or ch == ord('Q'):
                     break
-                    
-            # Draw everything
-            stdscr.erase()
+        finally:
+            self.shutdown()
             
-            # Background
-            stars.draw(stdscr, H, W, time.time(), attr_dim, attr_primary)
+        self.save_results()
+        
+    def input_commands(self, commands):
+        """The tick's commands: the keyboard's, or the bot's while one plays (keys can still quit)"""
+        if not self.bot or "quit" in commands:
+            return commands
+        return self.bot(self.sim)
+        
+    def check_resize(self):
+        """Follow terminal size changes (the player is re-centered)"""
+        H, W = self.output.getmaxyx()
+        if (H, W) != (self.sim.H, self.sim.W):
+            self.sim.resize(H, W)
+            self.stars.rebuild(H, W)
             
-            # Game objects
-            player.draw(stdscr, attr_primary)
+    def record_frame_time(self, work_time):
+        """Feed frame work time to the LOD controller"""
+        if self.lod.record(work_time):
+            self.stars.set_detail(self.lod.settings["particles"])
             
-            for bullet in bullets:
-                bullet.draw(stdscr, attr_acc)
-                
-            for bullet in enemy_bullets:
-                bullet.draw(stdscr, curses.color_pair(3) | curses.A_BOLD)
-                
-            if boss:
-                boss.draw(stdscr, attr_primary)
-            else:
-                for enemy in enemies:
-                    enemy.draw(stdscr, attr_alt)
-                    
-            # UI
-            self._draw_ui(stdscr, H, W, score, lives, wave, boss, 
-                         len(enemies), len(enemy_bullets), attr_primary, attr_acc, attr_dim)
-                         
-            stdscr.refresh()
-            time.sleep(0.03)
+    def draw_frame(self):
+        """Draw background, game objects and HUD onto the output target"""
+        attr_primary, attr_dim, attr_acc, attr_alt, attr_bg = self.colors
+        screen, sim = self.output.target, self.sim
+        H, W = sim.H, sim.W
+        screen.erase()
+        
+        # Background
+        self.stars.draw(screen, H, W, time.time(), attr_dim, attr_primary,
+                        update=self.lod.update_effects(sim.frame))
+        
+        # Game objects
+        sim.render(screen, self.atlas)
+        
+        # UI
+        self._draw_ui(screen, H, W, sim.score, sim.lives, sim.wave, sim.boss,
+                     len(sim.enemies), len(sim.enemy_bullets), attr_primary, attr_acc, attr_dim,
+                     refresh=self.lod.refresh_hud(sim.frame))
+                     
+    def end_screen_frames(self):
+        """Number of 0.1 s frames the end screen is shown for"""
+        return 30 if self.sim.victory else 20
+        
+    def draw_end_screen(self):
+        """Draw the victory or game over screen for the finished game"""
+        attr_primary, attr_dim, attr_acc, attr_alt, attr_bg = self.colors
+        H, W = self.sim.H, self.sim.W
+        if self.sim.victory:
+            self._draw_victory(self.output.target, H, W, self.sim.score, attr_acc, attr_primary)
+        else:
+            self._draw_game_over(self.output.target, H, W, self.sim.score,
+                                 attr_acc, attr_primary, attr_dim)
             
-        # Game over
-        self._show_game_over(stdscr, H, W, score, attr_acc, attr_primary, attr_dim)
+    def replay_idle(self, spare):
+        """
+        Spend half of a frame's spare time on replayed boss training
         
-        # Save session data
+        Seeded runs replay ai.replay_seeded_batches instead, since batches
+        that depend on timing would make the boss differ between runs.
+        """
+        if not self.sim.boss:
+            return
+        if self.seeded:
+            self.sim.boss.replay_batches(self.config["ai"]["replay_seeded_batches"])
+        elif spare > 0:
+            self.sim.boss.replay_for(spare * 0.5)
+            
+    def checkpoint(self, force=False):
+        """Capture a checkpoint between frames when one is due (written in the background)"""
+        if not self.checkpointer or not (force or self.checkpointer.due()):
+            return
+        boss = self.sim.boss
+        agent = boss.rl_agent if boss and boss.use_ai else None
+        self.checkpointer.submit(self.checkpointer.capture(agent, self.behavior_tracker))
+        
+    def save_results(self):
+        """Save the session and boss training after a game"""
+        # No background write may land after (and overwrite) the final save
+        if self.checkpointer:
+            self.checkpointer.close()
+            
         if self.behavior_tracker:
             filepath = self.behavior_tracker.save_session()
             print(f"\n📊 Session data saved: {filepath}")
+            # Mark the session saved at once: a crash during the replay
+            # below must not make the next start recover it again
+            if self.checkpointer:
+                self.checkpointer.write(self.checkpointer.capture(tracker=self.behavior_tracker,
+                                                                 complete=True))
             
-        # Save boss training
-        if boss:
-            boss.save_training()
-            print("🧠 Boss training saved!")
+        # The learner's final model replaces the (periodically swapped) live one
+        final_model = self.learner.close() if self.learner else None
+        
+        if self.sim.boss:
+            if final_model and self.sim.boss.rl_agent:
+                self.sim.boss.rl_agent.load_model_data(final_model)
+            batches = self.sim.boss.replay_batches(self.replay_end_batches)
+            if batches:
+                print(f"🔁 Replayed {batches} batches after the fight")
+            if not self.checkpointer:
+                self.sim.boss.save_training()
+                print("🧠 Boss training saved!")
+                
+        # The final checkpoint saves the model and marks the session as saved
+        if self.checkpointer:
+            boss = self.sim.boss
+            agent = boss.rl_agent if boss and boss.use_ai else None
+            self.checkpointer.write(self.checkpointer.capture(agent, self.behavior_tracker,
+                                                             complete=True))
+            if agent:
+                print("🧠 Boss training saved!")
             
-    def _draw_ui(self, stdscr, H, W, score, lives, wave, boss, enemy_count, bullet_count, 
-                 attr_primary, attr_acc, attr_dim):
-        """Draw game UI"""
-        score_text = f"SKOR: {score}"
-        lives_text = f"♥ CAN: {lives}"
+    def _start_compaction(self):
+        """Start the retention job while the end screen is showing"""
+        if self.compactor:
+            self.compactor.start()
+            
+    def wait_for_compaction(self, timeout=10.0):
+        """
+        Wait for the background retention job
         
-        if boss:
-            wave_text = f"BOSS: {boss.health}/{boss.max_health} HP"
-        else:
-            wave_text = f"WAVE: {wave}"
+        Returns:
+            dict or None: Compaction report, None if not run or still running
+        """
+        if not self.compactor:
+            return None
+        return self.compactor.wait(timeout)
+        
+    def _draw_ui(self, stdscr, H, W, score, lives, wave, boss, enemy_count, bullet_count, 
+                 attr_primary, attr_acc, attr_dim, refresh=True):
+        """Draw game UI (text is rebuilt only when refresh is set)"""
+        if refresh or self._hud_text is None:
+            score_text = f"SKOR: {score}"
+            lives_text = f"♥ CAN: {lives}"
+            
+            if boss:
+                wave_text = f"BOSS: {boss.health}/{boss.max_health} HP"
+            else:
+                wave_text = f"WAVE: {wave}"
+                
+            stats_text = None
+            if self.show_fps:
+                fps = 1.0 / max(self.lod.avg_frame_time, 1.0 / self.fps)
+                stats_text = f"FPS: {fps:.0f}  LOD: {self.lod.level}"
+                
+            counts = self.counters
+            counter_text = f"HITS: {counts['hit']}  DODGED: {counts['dodged']}"
+                
+            self._hud_text = (score_text, lives_text, wave_text, stats_text, counter_text)
             
+        score_text, lives_text, wave_text, stats_text, counter_text = self._hud_text
         controls = "←→ hareket  SPACE ateş  Q çık"
         
         try:
             stdscr.addstr(0, 2, score_text, attr_primary)
             stdscr.addstr(0, 15, wave_text, attr_acc if boss else attr_primary)
             stdscr.addstr(0, W - len(lives_text) - 2, lives_text, attr_primary)
+            if stats_text:
+                stdscr.addstr(1, 2, stats_text, attr_dim)
+            stdscr.addstr(1, W - len(counter_text) - 2, counter_text, attr_dim)
             
             if H > 5:
                 stdscr.addstr(H - 1, max(0, (W - len(controls)) // 2), controls, attr_dim)
         except curses.error:
             pass
             
-    def _flash_screen(self, stdscr):
+    def _flash_screen(self):
         """Flash screen on hit"""
         for _ in range(3):
-            stdscr.clear()
-            stdscr.refresh()
+            self.output.target.clear()
+            self.present()
             time.sleep(0.05)
             
-    def _show_game_over(self, stdscr, H, W, score, attr_acc, attr_primary, attr_dim):
-        """Show game over screen"""
-        for _ in range(20):
-            stdscr.clear()
-            game_over = "OYUN BİTTİ!"
-            final_score = f"TOPLAM SKOR: {score}"
-            restart_msg = "Q: Çık"
-            
-            try:
-                stdscr.addstr(H // 2 - 1, (W - len(game_over)) // 2, game_over, attr_acc)
-                stdscr.addstr(H // 2, (W - len(final_score)) // 2, final_score, attr_primary)
-                stdscr.addstr(H // 2 + 2, (W - len(restart_msg)) // 2, restart_msg, attr_dim)
-            except curses.error:
-                pass
-                
-            stdscr.refresh()
-            time.sleep(0.1)
-            
-        stdscr.timeout(-1)
-        while True:
-            try:
-                ch = stdscr.getch()
-            except:
-                continue
-            if ch == ord('q') or ch == ord('Q'):
-                break
-                
-    def _show_victory(self, stdscr, H, W, score, attr_acc, attr_primary):
-        """Show victory screen"""
-        for _ in range(30):
-            stdscr.clear()
-            victory = "🎉 KAZANDIN! 🎉"
-            final_score = f"TOPLAM SKOR: {score}"
-            msg = "Boss'u yendin!"
+    def _draw_game_over(self, stdscr, H, W, score, attr_acc, attr_primary, attr_dim):
+        """Draw game over screen"""
+        stdscr.clear()
+        game_over = "OYUN BİTTİ!"
+        final_score = f"TOPLAM SKOR: {score}"
+        restart_msg = "Q: Çık"
+        
+        try:
+            stdscr.addstr(H // 2 - 1, (W - len(game_over)) // 2, game_over, attr_acc)
+            stdscr.addstr(H // 2, (W - len(final_score)) // 2, final_score, attr_primary)
+            stdscr.addstr(H // 2 + 2, (W - len(restart_msg)) // 2, restart_msg, attr_dim)
+        except curses.error:
+            pass
             
-            try:
-                stdscr.addstr(H // 2 - 2, (W - len(victory)) // 2, victory, attr_acc)
-                stdscr.addstr(H // 2, (W - len(msg)) // 2, msg, attr_primary)
-                stdscr.addstr(H // 2 + 1, (W - len(final_score)) // 2, final_score, attr_primary)
-            except curses.error:
-                pass
-                
-            stdscr.refresh()
-            time.sleep(0.1)
+    def _draw_victory(self, stdscr, H, W, score, attr_acc, attr_primary):
+        """Draw victory screen"""
+        stdscr.clear()
+        victory = "🎉 KAZANDIN! 🎉"
+        final_score = f"TOPLAM SKOR: {score}"
+        msg = "Boss'u yendin!"
+        
+        try:
+            stdscr.addstr(H // 2 - 2, (W - len(victory)) // 2, victory, attr_acc)
+            stdscr.addstr(H // 2, (W - len(msg)) // 2, msg, attr_primary)
+            stdscr.addstr(H // 2 + 1, (W - len(final_score)) // 2, final_score, attr_primary)
+        except curses.error:
+            pass
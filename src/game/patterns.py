@@ -0,0 +1,139 @@
+"""Data-driven boss bullet patterns"""
+import numpy as np
+from ..utils.rng import RandomStream
+
+# Pattern specs by name (boss.patterns in the config overrides or adds to them).
+# Angles are degrees from straight down; speeds are rows per frame.
+#   fan:  `count` bullets spread over `arc`, centered straight down or, with
+#         `aim`, on the player; `stagger` slows each later bullet by that
+#         fraction so an aimed volley arrives as a stream
+#   ring: `count` bullets all around, turned `spin` degrees further every
+#         frame; `twist` speeds bullets up along the ring, which unwinds
+#         the ring into a spiral
+#   wall: a row across the screen every `spacing` columns with a `gap`
+#         columns wide opening at a random place
+PATTERNS = {
+    "spread": {"shape": "fan", "count": 7, "arc": 80, "speed": 0.8},
+    "aimed": {"shape": "fan", "count": 5, "arc": 10, "speed": 1.2, "aim": True, "stagger": 0.1},
+    "spiral": {"shape": "ring", "count": 16, "speed": 0.5, "spin": 23, "twist": 1.0},
+    "wall": {"shape": "wall", "spacing": 2, "gap": 9, "speed": 0.5}
+}
+
+class PatternEmitter:
+    """
+    Turns a pattern name into a whole volley of bullets.
+
+    Each shape computes every bullet's position and velocity in one set of
+    array operations, and BulletStore.spawn() takes the volley in one go,
+    so a 100-bullet wall costs about as much as a single shot. Each bullet
+    weighs 1/count of a shot (see BulletStore). The spiral's rotation comes
+    from the frame number and the wall's gap from the given RandomStream,
+    so volleys replay with the game's seed. emit_many() computes the
+    volleys of many bosses at once (VecBossEnv) with the same shapes.
+    """
+
+    def __init__(self, rng=None, patterns=None, aspect=2.0):
+        self.rng = rng or RandomStream()
+        self.patterns = {name: dict(spec) for name, spec in PATTERNS.items()}
+        for name, spec in (patterns or {}).items():
+            self.patterns[name] = {**self.patterns.get(name, {}), **spec}
+        # Terminal cells are about twice as tall as wide; sideways speeds
+        # are stretched so that fans and rings look round
+        self.aspect = aspect
+
+    def max_bullets(self, width):
+        """Most bullets one volley of any pattern has on a screen this wide"""
+        sizes = [len(range(1, width - 1, spec["spacing"])) if spec["shape"] == "wall" else spec["count"]
+                 for spec in self.patterns.values()]
+        return max(sizes, default=0)
+
+    def emit(self, name, origin, target, width, frame=0):
+        """
+        Bullets of one volley
+
+        Args:
+            name: Pattern name
+            origin: (x, y) the volley starts from (below the boss)
+            target: (x, y) of the player, for aimed patterns
+            width: Screen width, for walls
+            frame: Game frame, for rotating patterns
+
+        Returns:
+            tuple: (x, y, vx, vy, weight) arrays for BulletStore.spawn()
+
+        Raises:
+            ValueError: Unknown pattern or shape
+        """
+        _, x, y, vx, vy, weight = self.emit_many(name, np.array([origin], dtype=np.float64),
+                                                 np.array([target], dtype=np.float64),
+                                                 width, np.array([frame]))
+        return x, y, vx, vy, weight
+
+    def emit_many(self, name, origins, targets, width, frames):
+        """
+        One volley from each of several bosses
+
+        Args:
+            name: Pattern name
+            origins: (k, 2) array of volley start positions
+            targets: (k, 2) array of player positions
+            width: Screen width
+            frames: (k,) game frame of each volley
+
+        Returns:
+            tuple: (owner, x, y, vx, vy, weight) arrays, grouped by owner
+                   (the origins row each bullet belongs to) in row order
+
+        Raises:
+            ValueError: Unknown pattern or shape
+        """
+        if name not in self.patterns:
+            raise ValueError(f"Unknown bullet pattern '{name}' (choose from {', '.join(self.patterns)})")
+        spec = self.patterns[name]
+        shape = getattr(self, f"_{spec['shape']}", None)
+        if shape is None:
+            raise ValueError(f"Unknown shape '{spec['shape']}' in bullet pattern '{name}'")
+        # Shapes return (k, m) arrays, plus a mask of the bullets that exist
+        x, y, vx, vy, keep = shape(spec, origins, targets, width, frames)
+        if keep is None:
+            keep = np.ones(x.shape, dtype=bool)
+        owner = np.nonzero(keep)[0]
+        counts = keep.sum(axis=1)
+        weight = 1.0 / np.maximum(1, counts[owner])
+        return owner, x[keep], y[keep], vx[keep], vy[keep], weight
+
+    def _velocities(self, angles, speeds):
+        return np.sin(angles) * speeds * self.aspect, np.cos(angles) * speeds
+
+    def _from_origins(self, origins, count):
+        return (np.repeat(origins[:, :1], count, axis=1),
+                np.repeat(origins[:, 1:], count, axis=1))
+
+    def _fan(self, spec, origins, targets, width, frames):
+        count = spec["count"]
+        center = np.zeros((len(origins), 1))
+        if spec.get("aim"):
+            dx = targets[:, 0] - origins[:, 0]
+            dy = np.maximum(1, targets[:, 1] - origins[:, 1])
+            center = np.arctan2(dx / self.aspect, dy)[:, None]
+        angles = center + np.radians(np.linspace(-spec["arc"] / 2, spec["arc"] / 2, count))
+        speeds = spec["speed"] * (1 - spec.get("stagger", 0.0) * np.arange(count))
+        vx, vy = self._velocities(angles, np.maximum(speeds, 0.1))
+        return (*self._from_origins(origins, count), vx, vy, None)
+
+    def _ring(self, spec, origins, targets, width, frames):
+        count = spec["count"]
+        steps = np.arange(count) / count
+        angles = np.radians(spec.get("spin", 0) * np.asarray(frames))[:, None] + 2 * np.pi * steps
+        vx, vy = self._velocities(angles, spec["speed"] * (1 + spec.get("twist", 0.0) * steps))
+        return (*self._from_origins(origins, count), vx, vy, None)
+
+    def _wall(self, spec, origins, targets, width, frames):
+        columns = np.arange(1, width - 1, spec["spacing"])
+        gap = spec["gap"]
+        # One gap per volley, drawn in row order
+        starts = np.array([self.rng.randint(1, max(1, width - gap - 1)) for _ in range(len(origins))])
+        keep = (columns < starts[:, None]) | (columns >= starts[:, None] + gap)
+        x = np.broadcast_to(columns.astype(np.float64), keep.shape)
+        y = np.repeat(origins[:, 1:], len(columns), axis=1)
+        return x, y, np.zeros(keep.shape), np.full(keep.shape, float(spec["speed"])), keep
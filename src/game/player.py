@@ -1,18 +1,19 @@
 """Player entity and controls"""
-import curses
 
 class Player:
+    SHIP = [
+        "  ▲  ",
+        " ███ ", 
+        "█████",
+        " █ █ "
+    ]
+    
     def __init__(self, h, w):
         self.h, self.w = h, w
         self.x = w // 2
         self.y = h - 5
         self.speed = 2
-        self.ship = [
-            "  ▲  ",
-            " ███ ", 
-            "█████",
-            " █ █ "
-        ]
+        self.ship = self.SHIP
         self.width = 5
         self.height = 4
         
@@ -25,13 +26,14 @@ class Player:
     def get_center(self):
         return self.x + self.width // 2, self.y
         
-    def draw(self, stdscr, attr):
-        for i, line in enumerate(self.ship):
-            try:
-                stdscr.addstr(self.y + i, self.x, line, attr)
-            except curses.error:
-                pass
-                
+    @classmethod
+    def register_sprites(cls, atlas, attr):
+        """Pre-rasterize the ship into the sprite atlas"""
+        atlas.add("player", "normal", cls.SHIP, attr)
+        
+    def draw(self, stdscr, atlas):
+        atlas.blit(stdscr, "player", "normal", self.y, self.x)
+        
     def get_hitbox(self):
         """Returns list of occupied coordinates for collision detection"""
         return [(self.x + dx, self.y + dy) 
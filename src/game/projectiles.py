@@ -1,5 +1,8 @@
 """Projectile entities (bullets)"""
-import curses
+import numpy as np
+
+# Per-bullet columns of a BulletStore (the order SimSnapshot stores them in)
+BULLET_FIELDS = ["x", "y", "vx", "vy", "weight"]
 
 class Bullet:
     """Player's bullet"""
@@ -13,27 +16,131 @@ class Bullet:
     def is_offscreen(self):
         return self.y < 0
         
-    def draw(self, stdscr, attr):
-        try:
-            stdscr.addstr(self.y, self.x, self.char, attr)
-        except curses.error:
-            pass
+    @classmethod
+    def register_sprites(cls, atlas, attr):
+        atlas.add("bullet", "normal", ["|"], attr)
+        
+    def draw(self, stdscr, atlas):
+        atlas.blit(stdscr, "bullet", "normal", self.y, self.x)
 
-class EnemyBullet:
-    """Enemy's bullet"""
-    def __init__(self, x, y):
-        self.x, self.y = x, y
-        self.char = "●"
-        self.speed = 1
+class BulletStore:
+    """
+    Every enemy bullet as parallel NumPy arrays.
+    
+    A bullet is a row of position, velocity (cells per frame, so bullets
+    can travel diagonally and at any speed) and weight: the share of a
+    shot it stands for, 1 for a single shot and 1/n for each bullet of an
+    n-bullet volley, so a missed volley costs the boss what one missed
+    shot does. Whole volleys are added with one spawn() and stepped,
+    collided and removed with a few array operations.
+    """
+    
+    def __init__(self, capacity=64):
+        self.n = 0
+        self._data = np.zeros((capacity, len(BULLET_FIELDS)))
         
-    def update(self):
-        self.y += self.speed
+    @classmethod
+    def from_rows(cls, rows):
+        """Store from BULLET_FIELDS rows (see SimSnapshot)"""
+        store = cls(capacity=max(64, len(rows)))
+        store.n = len(rows)
+        store._data[:store.n] = rows
+        return store
+        
+    def __len__(self):
+        return self.n
+        
+    @property
+    def x(self):
+        """Cell columns"""
+        return np.floor(self._data[:self.n, 0]).astype(np.int64)
+        
+    @property
+    def y(self):
+        """Cell rows"""
+        return np.floor(self._data[:self.n, 1]).astype(np.int64)
+        
+    def rows(self):
+        """Copy of the BULLET_FIELDS rows"""
+        return self._data[:self.n].copy()
+        
+    def spawn(self, x, y, vx=0.0, vy=1.0, weight=1.0):
+        """
+        Add bullets (scalars add one, arrays a whole volley)
+        
+        Args:
+            x, y: Start positions
+            vx, vy: Velocities in cells per frame (default: straight down)
+            weight: Share of a shot each bullet stands for
+        """
+        x, y, vx, vy, weight = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64))
+                                                     for v in (x, y, vx, vy, weight)))
+        count = len(x)
+        if self.n + count > len(self._data):
+            grow = max(len(self._data), self.n + count - len(self._data))
+            self._data = np.concatenate([self._data, np.zeros((grow, len(BULLET_FIELDS)))])
+        self._data[self.n:self.n + count] = np.column_stack([x, y, vx, vy, weight])
+        self.n += count
+        
+    def step(self, h, w):
+        """
+        Drop the bullets that have left the screen, then move the rest
+        
+        Returns:
+            float: Total weight of the dropped bullets (shots that missed)
+        """
+        x, y = self.x, self.y
+        out = (y >= h) | (y < 0) | (x < 0) | (x >= w)
+        missed = 0.0
+        if out.any():
+            missed = float(self._data[:self.n][out, 4].sum())
+            self.remove(out)
+        data = self._data[:self.n]
+        data[:, :2] += data[:, 2:4]
+        return missed
+        
+    def passed(self, line, left, right):
+        """
+        Bullets that crossed row `line` this frame between columns left and right
+        
+        Returns:
+            float: Their total weight
+        """
+        data = self._data[:self.n]
+        x, y = data[:, 0], data[:, 1]
+        crossed = (y - data[:, 3] < line) & (y >= line) & (x >= left) & (x < right)
+        return float(data[crossed, 4].sum()) if crossed.any() else 0.0
+        
+    def hits(self, player):
+        """
+        Bullets on a solid cell of the player's ship
+        
+        Returns:
+            np.ndarray: Bullet indices (empty if none)
+        """
+        dx = self.x - player.x
+        dy = self.y - player.y
+        inside = (dx >= 0) & (dx < player.width) & (dy >= 0) & (dy < player.height)
+        if not inside.any():
+            return np.flatnonzero(inside)
+        ship = np.array([[c != ' ' for c in row] for row in player.ship])
+        rows = np.flatnonzero(inside)
+        return rows[ship[dy[rows], dx[rows]]]
+        
+    def remove(self, indices):
+        """Remove bullets (indices or a bool mask), keeping the others in order"""
+        keep = np.ones(self.n, dtype=bool)
+        keep[indices] = False
+        count = int(keep.sum())
+        self._data[:count] = self._data[:self.n][keep]
+        self.n = count
+        
+    def clear(self):
+        self.n = 0
         
-    def is_offscreen(self, h):
-        return self.y >= h
+    @classmethod
+    def register_sprites(cls, atlas, attr):
+        atlas.add("enemy_bullet", "normal", ["●"], attr)
         
-    def draw(self, stdscr, attr):
-        try:
-            stdscr.addstr(self.y, self.x, self.char, attr)
-        except curses.error:
-            pass
+    def draw(self, stdscr, atlas):
+        atlas.blit_many(stdscr, "enemy_bullet", "normal", self.y, self.x)
@@ -0,0 +1,336 @@
+"""Game state and rules, independent of any screen"""
+import numpy as np
+from .player import Player
+from .enemy import EnemyFleet
+from .boss import Boss
+from .projectiles import Bullet, BulletStore
+from .patterns import PatternEmitter
+from .events import EventBuffer
+from .collision import check_collision, check_bullet_collision
+from .snapshot import SimSnapshot
+from ..utils.rng import RNGService
+
+ENEMY_SCORES = {"fighter": 100, "bomber": 300, "interceptor": 150, "ground_turret": 500}
+
+# Frames after a hit in which the ship can't lose another life, so that a
+# whole volley (bullets arriving together or in a stream) costs one life
+INVULNERABLE_FRAMES = 24
+
+class GameSimulation:
+    """
+    One game's entities, score and wave progression.
+
+    step() advances a single tick from a list of input commands
+    ("left", "right", "shoot", "quit") and render() draws the entities
+    onto any screen-like target, so the simulation can run without a
+    terminal, on its own thread, or many at once. Wave enemies live in an
+    EnemyFleet and enemy bullets in a BulletStore, which the boss's
+    pattern volleys (PatternEmitter) spawn into in one go. All randomness
+    comes from the RNGService streams ("game" for spawns and enemy fire,
+    "boss", "ai", "patterns"), so a seed reproduces a game. Game events
+    collect in an EventBuffer and reach the behavior tracker, the boss's
+    rewards and any other subscriber in one batch at the end of the tick.
+    """
+
+    def __init__(self, H, W, mode="normal", use_ai=True, behavior_tracker=None, lives=5,
+                 planner=None, agent="tabular", replay=None, learner=None, profile=None,
+                 seed=None, max_enemies=15, rngs=None, patterns=None, analyzer=None, boss_model=None):
+        self.H, self.W = H, W
+        self.rngs = rngs or RNGService(seed)
+        self.rng = self.rngs.stream("game")
+        self.max_enemies = max_enemies
+        self.use_ai = use_ai
+        self.behavior_tracker = behavior_tracker
+        self.planner = planner
+        self.agent = agent
+        self.replay = replay
+        self.learner = learner
+        self.profile = profile
+        self.analyzer = analyzer
+        self.boss_model = boss_model
+
+        self.player = Player(H, W)
+        self.bullets = []
+        self.enemies = EnemyFleet(self.rng)
+        self.enemy_bullets = BulletStore()
+        self.emitter = PatternEmitter(self.rngs.stream("patterns"), patterns)
+
+        self.events = EventBuffer()
+        if behavior_tracker:
+            self.events.subscribe(behavior_tracker.track_events)
+        self.events.subscribe(self._reward_boss)
+        self.boss = self.create_boss() if mode == "boss" else None
+
+        self.score = 0
+        self.lives = lives
+        self.invulnerable = 0  # Frames of INVULNERABLE_FRAMES left
+        self.wave = 1
+        self.frame = 0
+        self.enemy_spawn_counter = 0
+        self.enemies_killed_this_wave = 0
+
+        self.quit = False
+        self.victory = False
+
+    @property
+    def over(self):
+        """True once the game has ended for any reason"""
+        return self.quit or self.victory or self.lives <= 0
+
+    def resize(self, H, W):
+        """Adapt to a new screen size (the player is re-centered)"""
+        self.H, self.W = H, W
+        self.player = Player(H, W)
+
+    def create_boss(self, x=None, y=5):
+        """A Boss wired to this game's AI options (agent, planner, replay, learner, profile, ...)"""
+        return Boss(self.W // 2 - 4 if x is None else x, y, use_ai=self.use_ai,
+                    planner=self.planner, agent=self.agent, replay=self.replay,
+                    learner=self.learner, profile=self.profile, rngs=self.rngs,
+                    analyzer=self.analyzer, model=self.boss_model)
+
+    def snapshot(self, rng=True):
+        """Compact copy of the full game state (see SimSnapshot)"""
+        return SimSnapshot.capture(self, rng=rng)
+
+    def restore(self, snapshot):
+        """Return to a state captured with snapshot()"""
+        snapshot.restore(self)
+
+    def _reward_boss(self, events):
+        if self.boss:
+            self.boss.on_events(events)
+
+    def step(self, commands=()):
+        """
+        Advance the game by one tick
+
+        Args:
+            commands: Input commands received since the last tick, in order
+
+        Returns:
+            EventBuffer: The tick's events, already dispatched to the
+                         subscribers (e.g. "death" in events)
+        """
+        events = self.events
+        events.clear()
+        self._step(commands)
+        events.flush()
+
+        # The fight's last transition includes the rewards just dispatched
+        if self.boss and (self.victory or self.lives <= 0):
+            self.boss.end_fight()
+        return events
+
+    def _step(self, commands):
+        self.frame += 1
+        events = self.events
+        player = self.player
+        start_x = player.x
+
+        for command in commands:
+            if command == "quit":
+                self.quit = True
+                return
+            elif command == "left":
+                events.emit("move_left", player.x)
+                player.move_left()
+            elif command == "right":
+                events.emit("move_right", player.x)
+                player.move_right()
+            elif command == "shoot":
+                center_x, center_y = player.get_center()
+                self.bullets.append(Bullet(center_x, center_y - 1))
+                events.emit("shoot", center_x, center_y)
+
+        # Track player position (recorded only when it changes)
+        if self.behavior_tracker:
+            self.behavior_tracker.sample_position(player.x, player.y)
+
+        # Update bullets
+        self.bullets = [b for b in self.bullets if not b.is_offscreen()]
+        for bullet in self.bullets:
+            bullet.update()
+
+        # Update enemy bullets (a boss shot leaving the screen missed)
+        missed = self.enemy_bullets.step(self.H, self.W)
+        if missed:
+            events.emit("missed", missed)
+
+        if self.boss:
+            self._step_boss(player.x - start_x)
+            if self.victory:
+                return
+        else:
+            self._step_waves()
+
+        self._check_player_collisions()
+
+    def _step_boss(self, player_velocity=0):
+        """Boss movement, shooting and damage"""
+        boss = self.boss
+        # The planner rolls out forks of the current state; no RNG needed for that
+        snapshot = self.snapshot(rng=False) if boss.planner else None
+        boss.update(self.player.x, self.player.y, self.W, snapshot,
+                    self._boss_observation(player_velocity))
+
+        if boss.should_shoot():
+            center_x, center_y = boss.get_center()
+            self.enemy_bullets.spawn(center_x, center_y + 1)
+
+        # Pattern volleys (the agent's shoot_burst, the special attack)
+        volley = boss.next_volley()
+        if volley:
+            center_x, center_y = boss.get_center()
+            self.enemy_bullets.spawn(*self.emitter.emit(volley, (center_x, center_y + 1),
+                                                        self.player.get_center(), self.W, self.frame))
+
+        # Check player bullets hitting boss
+        new_bullets = []
+        for bullet in self.bullets:
+            if not check_bullet_collision(bullet, boss):
+                new_bullets.append(bullet)
+                continue
+            self.events.emit("hit", "boss")
+            if boss.take_damage():
+                # Boss defeated!
+                self.score += 1000
+                self.victory = True
+                self.events.emit("victory")
+                return
+            self.score += 10
+        self.bullets = new_bullets
+
+    def _boss_observation(self, player_velocity):
+        """What the boss's agent may see beyond positions (LinearQAgent features)"""
+        left = int(self.boss.x)
+        right = left + self.boss.width
+        return {
+            "player_velocity": player_velocity,
+            "incoming_bullets": sum(1 for b in self.bullets if left <= b.x < right),
+            "boss_bullets": len(self.enemy_bullets)
+        }
+
+    def _spawn_position(self):
+        return self.rng.randint(5, self.W - 8), self.rng.choice([5, 8, 11, 14])
+
+    def _step_waves(self):
+        """Normal mode: wave-based enemies"""
+        max_enemies = min(8 + self.wave, self.max_enemies)
+        enemies = self.enemies
+
+        if len(enemies) < max_enemies and self.enemy_spawn_counter % 30 == 0:
+            x, y = self._spawn_position()
+
+            if self.wave <= 2:
+                enemy_type = self.rng.choice(["fighter", "interceptor"])
+            else:
+                enemy_type = self.rng.choice(["fighter", "bomber", "interceptor"])
+
+            if not enemies.occupied(x, y):
+                enemies.spawn(x, y, enemy_type)
+
+        self.enemy_spawn_counter += 1
+
+        # Move the whole fleet; shooters fire from their centers
+        shooters = enemies.step(self.W)
+        if len(shooters):
+            xs, ys = enemies.centers(shooters)
+            self.enemy_bullets.spawn(xs, ys + 1)
+
+        if self.bullets and len(enemies):
+            self._hit_enemies(max_enemies)
+
+        # Wave progression
+        if self.enemies_killed_this_wave >= self.wave * 5:
+            self.wave += 1
+            self.enemies_killed_this_wave = 0
+
+            # Enter boss mode after wave 3
+            if self.wave == 4 and not self.boss:
+                self.enemies.clear()
+                self.enemy_bullets.clear()
+                self.boss = self.create_boss()
+
+    def _hit_enemies(self, max_enemies):
+        """Player bullets against the fleet: each hits the first live enemy it overlaps"""
+        enemies = self.enemies
+        hits = enemies.bullet_hits([b.x for b in self.bullets], [b.y for b in self.bullets])
+        destroyed = np.zeros(len(enemies), dtype=bool)
+        names = None
+        spent = set()
+        # Only bullets overlapping an enemy need a closer look, in order
+        for i in np.flatnonzero(hits.any(axis=1)).tolist():
+            targets = np.flatnonzero(hits[i] & ~destroyed)
+            if not len(targets):
+                continue
+            spent.add(i)
+            index = int(targets[0])
+            if enemies.damage(index):
+                # Enemy destroyed
+                names = names or enemies.type_names()
+                self.score += ENEMY_SCORES.get(names[index], 100)
+                self.events.emit("hit", names[index])
+                self.enemies_killed_this_wave += 1
+                destroyed[index] = True
+            else:
+                self.score += 5
+        if spent:
+            self.bullets = [b for i, b in enumerate(self.bullets) if i not in spent]
+
+        if destroyed.any():
+            enemies.remove(destroyed)
+            # Replacements for the destroyed enemies
+            for _ in range(int(destroyed.sum())):
+                if len(enemies) >= max_enemies:
+                    break
+                new_x, new_y = self._spawn_position()
+                enemies.spawn(new_x, new_y, self.rng.choice(["fighter", "bomber", "interceptor"]))
+
+    def _player_hit(self, cause):
+        if self.invulnerable:
+            return
+        self.lives -= 1
+        self.invulnerable = INVULNERABLE_FRAMES
+        self.events.emit("death", cause)
+
+    def _check_player_collisions(self):
+        player = self.player
+        self.invulnerable = max(0, self.invulnerable - 1)
+
+        rammed = self.enemies.touching(player) if len(self.enemies) else None
+        if rammed is not None:
+            self.enemies.remove([rammed])
+            self._player_hit("enemy_collision")
+
+        if self.boss and check_collision(player, self.boss):
+            self._player_hit("boss_collision")
+
+        if len(self.enemy_bullets):
+            # Bullets on the ship are used up, also while it is invulnerable
+            struck = self.enemy_bullets.hits(player)
+            if len(struck):
+                self.enemy_bullets.remove(struck)
+                self._player_hit("bullet")
+
+            # Bullets that just got past the ship's bottom edge next to it were dodged
+            dodged = self.enemy_bullets.passed(player.y + player.height,
+                                               player.x - 1, player.x + player.width + 1)
+            if dodged:
+                self.events.emit("dodged", dodged)
+
+    def render(self, screen, atlas):
+        """Draw all game objects onto a curses window or frame buffer"""
+        # The ship blinks while invulnerable
+        if not self.invulnerable or self.frame % 4 < 2:
+            self.player.draw(screen, atlas)
+
+        for bullet in self.bullets:
+            bullet.draw(screen, atlas)
+
+        self.enemy_bullets.draw(screen, atlas)
+
+        if self.boss:
+            self.boss.draw(screen, atlas)
+        else:
+            self.enemies.draw(screen, atlas)
@@ -0,0 +1,116 @@
+"""Compact, array-backed snapshots of a GameSimulation"""
+import numpy as np
+from .enemy import EnemyFleet
+from .boss import Boss
+from .projectiles import Bullet, BulletStore
+
+# Columns of the "boss" array ("enemies" rows are EnemyFleet FIELDS)
+BOSS_FIELDS = ["x", "y", "health", "shoot_cooldown", "special_attack_cooldown", "direction",
+               "burst_cooldown", "max_health"]
+
+# Boss fields restored as ints (the rest stay floats, as in the entity)
+INT_FIELDS = {"y", "health", "direction", "last_shot", "shoot_cooldown", "special_attack_cooldown",
+              "burst_cooldown", "max_health"}
+
+# Scalar game state copied as-is
+SCALARS = ["H", "W", "score", "lives", "invulnerable", "wave", "frame", "enemy_spawn_counter",
+           "enemies_killed_this_wave", "quit", "victory"]
+
+class SimSnapshot:
+    """
+    The full state of a GameSimulation in a handful of small arrays.
+
+    Entity lists become arrays: player bullets as (n, 2) int coordinates,
+    enemy bullets, enemies and the boss as float rows of BULLET_FIELDS,
+    EnemyFleet FIELDS and BOSS_FIELDS (plus type and behavior-mode codes). Arrays are read-only, so
+    a snapshot can be restored or loaded into rollouts any number of times.
+    """
+
+    def __init__(self, scalars, arrays, rng_state=None):
+        self.scalars = scalars
+        self._arrays = arrays
+        self.rng_state = rng_state
+
+    @classmethod
+    def capture(cls, sim, rng=True):
+        """
+        Snapshot a simulation
+
+        Args:
+            sim: GameSimulation to copy
+            rng: Include the states of the simulation's random streams, so
+                 that restoring and stepping again replays the same game
+
+        Returns:
+            SimSnapshot: Independent of any later change to sim
+        """
+        scalars = {name: getattr(sim, name) for name in SCALARS}
+        scalars["player_x"] = sim.player.x
+
+        boss = sim.boss
+        if boss:
+            boss_row = [getattr(boss, field) for field in BOSS_FIELDS]
+            boss_mode = Boss.MODES.index(boss.behavior_mode)
+        else:
+            boss_row, boss_mode = [], -1
+        scalars["boss_mode"] = boss_mode
+
+        arrays = {
+            "bullets": np.array([(b.x, b.y) for b in sim.bullets], dtype=np.int64).reshape(-1, 2),
+            "enemy_bullets": sim.enemy_bullets.rows(),
+            "enemies": sim.enemies.rows(),
+            "enemy_types": sim.enemies.types.copy(),
+            "boss": np.array(boss_row, dtype=np.float64)
+        }
+        for array in arrays.values():
+            array.flags.writeable = False
+
+        return cls(scalars, arrays, sim.rngs.state() if rng else None)
+
+    def __getitem__(self, name):
+        """Read-only array by name"""
+        return self._arrays[name]
+
+    @property
+    def has_boss(self):
+        return len(self._arrays["boss"]) > 0
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def restore(self, sim):
+        """
+        Put a simulation back into this snapshot's state
+
+        The boss object is reused when the simulation has one, so its AI
+        (Q-table, planner) is not reloaded.
+        """
+        scalars = self.scalars
+        if (sim.H, sim.W) != (scalars["H"], scalars["W"]):
+            sim.resize(scalars["H"], scalars["W"])
+        for name in SCALARS:
+            setattr(sim, name, scalars[name])
+        sim.player.x = scalars["player_x"]
+
+        sim.bullets = [Bullet(int(x), int(y)) for x, y in self._arrays["bullets"]]
+        sim.enemy_bullets = BulletStore.from_rows(self._arrays["enemy_bullets"])
+
+        sim.enemies = EnemyFleet.from_rows(self._arrays["enemies"], self._arrays["enemy_types"], sim.rng)
+
+        if self.has_boss:
+            row = self._arrays["boss"].tolist()
+            if sim.boss is None:
+                sim.boss = sim.create_boss(row[0], row[1])
+            _set_fields(sim.boss, BOSS_FIELDS, row)
+            sim.boss.behavior_mode = Boss.MODES[scalars["boss_mode"]]
+            sim.boss.damaged = False
+        else:
+            sim.boss = None
+
+        if self.rng_state is not None:
+            sim.rngs.set_state(self.rng_state)
+
+def _set_fields(entity, fields, values):
+    for field, value in zip(fields, values):
+        setattr(entity, field, int(value) if field in INT_FIELDS else value)
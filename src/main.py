@@ -12,7 +12,311 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.game.game_engine import GameEngine
+from src.game.async_runtime import AsyncGameRuntime
+from src.game.bots import BOTS
 from src.rendering.themes import THEMES
+from src.rendering.ansi import AnsiScreen, ansi_wrapper
+from src.rendering.pipeline import RenderWorker
+from src.net.viewer import SpectatorViewer
+from src.net.game_server import GameServer, run_bench
+from src.net.game_client import RemotePlayer
+from src.ai.retention import SessionCompactor
+from src.ai.session_store import SessionStore
+from src.ai.columnar import ShardWriter
+from src.ai.linear_agent import AGENTS, create_agent
+from src.ai.vec_env import train_agent
+from src.ai.offline import OfflineTrainer
+from src.ai.sweep import METRICS, PARAMS, Sweep, default_space, grid_configs, parse_space, random_configs
+from src.ai.player_store import PlayerStore
+from src.ai.pattern_analyzer import PatternAnalyzer
+from src.utils.config import load_config
+
+def bot_profile(config, use_ai):
+    """
+    The play-style profile `--bot profile` would play from
+
+    Same source as the engine: the player's own sessions when a player is
+    named (and the AI is on), the shared session store otherwise.
+
+    Returns:
+        dict or None: None if there are no recorded sessions yet
+    """
+    player = config["data"]["player"]
+    if use_ai and player:
+        players = PlayerStore(config["data"]["players_dir"])
+        try:
+            return players.get(player).profile()
+        finally:
+            players.close()
+    analyzer = PatternAnalyzer()
+    try:
+        return analyzer.get_player_profile()
+    finally:
+        analyzer.store.close()
+
+def run_compaction(args):
+    """Run the session retention job from the command line"""
+    config = load_config()
+    days = args.days if args.days is not None else config["data"]["data_retention_days"]
+    
+    print(f"🧹 Compacting sessions older than {days} days in {args.data_dir}...")
+    report = SessionCompactor(args.data_dir, retention_days=days, shard_dir=args.shards).run()
+    print_compaction_report(report)
+    
+def run_shard_export(args):
+    """Export stored sessions to columnar shards"""
+    store = SessionStore(args.data_dir)
+    writer = ShardWriter(args.out)
+    exported = writer.export_from_store(store)
+    store.close()
+    
+    shards = writer.manifest["shards"]
+    print(f"📦 Exported {exported} sessions to {args.out} "
+          f"({len(shards)} shards, {sum(s['events'] for s in shards)} events, "
+          f"{sum(s['positions'] for s in shards)} positions)")
+    
+def print_compaction_report(report):
+    """Print a compaction summary"""
+    if not report:
+        return
+    print(f"🧹 Compacted {report['sessions']} sessions into {report['days']} daily aggregates, "
+          f"imported {report['json_files']} legacy files, "
+          f"reclaimed {report['bytes_reclaimed'] / 1024:.1f} KB")
+
+def print_render_stats(output):
+    """Print render worker statistics"""
+    if not isinstance(output, RenderWorker):
+        return
+    print(f"🧵 Render worker: presented {output.presented} frames, "
+          f"dropped {output.dropped} stale, "
+          f"{output.avg_present_time * 1000:.2f} ms/frame avg")
+
+def run_server(args):
+    """Host game sessions, or benchmark how many one core sustains"""
+    config = load_config()
+    fps = config["game"]["fps"]
+    
+    if args.bench:
+        print(f"⏱️  Benchmarking headless sessions at {fps} FPS "
+              f"({'no frames' if args.no_frames else 'with frames'}, {args.seconds:.0f}s each, "
+              f"{args.bot} bots)")
+        print(f"{'sessions':>8} {'step ms':>8} {'cpu':>6} {'p99 lat ms':>10} {'sessions/core':>13}")
+        for count in (int(n) for n in args.bench.split(",")):
+            try:
+                report = run_bench(count, seconds=args.seconds, fps=fps, frames=not args.no_frames,
+                                   boss=args.mode == "boss", use_ai=not args.no_ai, bot=args.bot)
+            except ValueError as e:
+                print(f"❌ {e}")
+                return
+            print(f"{count:>8} {report['avg_step_ms']:>8.3f} {report['utilization']:>6.0%} "
+                  f"{report['p99_latency_ms']:>10.1f} {report['sessions_per_core']:>13.0f}")
+        return
+    
+    server = GameServer(args.address, fps=fps, use_ai=not args.no_ai,
+                        lives=config["player"]["lives"]).start()
+    print(f"🛰️  Serving games on {args.address} (Ctrl+C to stop)")
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        
+    report = server.report()
+    print(f"\n🛰️  Hosted {report['sessions']} sessions (peak {report['peak_sessions']}), "
+          f"{report['avg_step_ms']:.2f} ms/tick avg, {report['utilization']:.0%} of a core")
+    for session in report["per_session"]:
+        print(f"   #{session['id']}: {session['ticks']} ticks, "
+              f"latency avg {session['avg_latency_ms']:.1f} ms / p99 {session['p99_latency_ms']:.1f} ms")
+
+def run_remote_player(args):
+    """Play a game hosted by another process"""
+    player = RemotePlayer(args.address, boss=args.mode == "boss", player=args.player)
+    try:
+        ansi_wrapper(player.run)
+    except OSError as e:
+        print(f"❌ Could not connect to {args.address}: {e}")
+        return
+    status = player.client.status if player.client else None
+    if status:
+        print(f"🎮 Final score: {status['score']}")
+
+def run_training(args):
+    """Train the boss model offline on vectorized boss fights"""
+    profile = player_profile(args.player)
+    if args.from_sessions:
+        run_session_training(args, profile)
+        return
+        
+    agent = profile.agent(args.agent) if profile else create_agent(args.agent)
+    resumed = agent.load_model()
+    owner = f"{profile.name}'s " if profile else ""
+    print(f"🧠 {'Resuming' if resumed else 'Training new'} {owner}{args.agent} boss model on "
+          f"{args.envs} parallel fights for {args.steps} steps")
+    report = train_agent(agent, envs=args.envs, steps=args.steps, seed=args.seed,
+                         patterns=load_config()["boss"]["patterns"])
+    agent.save_model()
+    print(f"🧠 {report['env_steps']:,} env steps at {report['env_steps_per_sec']:,.0f}/s, "
+          f"{report['episodes']} fights, boss won {report['boss_win_rate']:.1%}, "
+          f"avg return {report['avg_return']:.1f}, reward/step {report['reward_per_step']:.3f}")
+
+def player_name(value):
+    """argparse type for --player (names become directory names)"""
+    try:
+        return PlayerStore.key(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def player_profile(name):
+    """A player's profile for the CLI commands, or None without --player"""
+    if not name:
+        return None
+    data = load_config()["data"]
+    return PlayerStore(data["players_dir"], capacity=1).get(name)
+
+def run_session_training(args, profile=None):
+    """Train the boss model from recorded player sessions (a player's own, with --player)"""
+    if profile:
+        store, data_dir = profile.store, profile.data_dir
+        trainer = OfflineTrainer(args.agent, store=store, workers=args.workers,
+                                 iterations=args.iterations, seed=args.seed,
+                                 model_dir=profile.model_dir)
+    else:
+        store, data_dir = SessionStore(args.data_dir), args.data_dir
+        trainer = OfflineTrainer(args.agent, store=store, workers=args.workers,
+                                 iterations=args.iterations, seed=args.seed)
+    print(f"🧠 Replaying stored sessions against the {args.agent} boss model "
+          f"({trainer.workers} worker processes)")
+    report = trainer.train(limit=args.limit)
+    store.close()
+    
+    if report["model_path"] is None:
+        print(f"❌ No usable sessions in {data_dir} ({report['sessions']} stored)")
+        return
+    print(f"🧠 {report['transitions']:,} transitions from {report['sessions']} sessions "
+          f"({report['segments']} segments) in {report['collect_sec']:.1f}s, "
+          f"{args.iterations} fitted Q-iterations in {report['fit_sec']:.1f}s, "
+          f"reward/step {report['reward_per_step']:.3f}, TD error {report['td_error']:.3f}")
+    print(f"💾 Saved {report['model_path']}")
+
+def run_sweep(args):
+    """Tune the boss hyperparameters on simulated fights and save the best model"""
+    try:
+        space = parse_space(args.space) if args.space else default_space(args.agent)
+        configs = random_configs(space, args.random, args.seed) if args.random else grid_configs(space)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    profile = player_profile(args.player)
+    sweep = Sweep(args.agent, configs, repeats=args.repeats, workers=args.workers,
+                  envs=args.envs, steps=args.steps, points=args.points,
+                  eval_envs=args.eval_envs, eval_steps=args.eval_steps, metric=args.metric,
+                  fps=load_config()["game"]["fps"], seed=args.seed,
+                  **({"model_dir": profile.model_dir} if profile else {}))
+    print(f"🔬 Sweeping {len(configs)} {args.agent} configurations x {args.repeats} seeds "
+          f"({len(configs) * args.repeats} trials, {min(sweep.workers, len(configs) * args.repeats)} "
+          f"worker processes), ranked by {args.metric}")
+    report = sweep.run(lambda done, total: print(f"   {done}/{total} trials", end="\r", flush=True))
+    print(f"🔬 {report['env_steps']:,} training steps in {report['elapsed_sec']:.1f}s "
+          f"({report['env_steps'] / max(report['elapsed_sec'], 1e-9):,.0f}/s)")
+    print_sweep_results(report["results"], args.top)
+    
+    best = report["results"][0]
+    curve = ", ".join(f"{steps / 1000:.0f}k {ci_text(point, '%')}" for steps, point in best["curve"])
+    print(f"📈 Best learning curve (win rate by training steps): {curve}")
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        sweep.save_report(report, args.report)
+        print(f"📝 Wrote {args.report}")
+    if not args.no_save:
+        print(f"💾 Saved best model to {sweep.save_best(report)}")
+
+def ci_text(value, unit=""):
+    """Format a (mean, half-width) pair, or a dash for no data"""
+    if value is None:
+        return "-"
+    mean, half = value
+    if unit == "%":
+        return f"{mean:.0%}±{half:.0%}"
+    return f"{mean:.1f}±{half:.1f}{unit}"
+
+def print_sweep_results(results, top=10):
+    """Print the best sweep configurations with 95% confidence intervals"""
+    names = [name for name in PARAMS if name in results[0]["params"]]
+    print("   " + " ".join(f"{name:>16}" for name in names) +
+          f" {'win rate':>12} {'kill time':>12} {'damage':>10} {'return':>14}")
+    for result in results[:top]:
+        print("   " + " ".join(f"{result['params'][name]:>16.4g}" for name in names) +
+              f" {ci_text(result['win_rate'], '%'):>12} {ci_text(result['time_to_kill'], 's'):>12}"
+              f" {ci_text(result['damage']):>10} {ci_text(result['return']):>14}")
+
+def run_viewer(args):
+    """Watch a game streamed by another process"""
+    address = args.address or load_config()["network"]["spectate_address"]
+    try:
+        viewer = SpectatorViewer(address)
+    except OSError as e:
+        print(f"❌ Could not connect to {address}: {e}")
+        return
+    ansi_wrapper(viewer.run)
+    print(f"👀 Watched {viewer.decoder.frames} frames "
+          f"({viewer.bytes_received / 1024:.1f} KB received)")
+
+def print_spectator_stats(server):
+    """Print spectator bandwidth and fan-out cost"""
+    if not server:
+        return
+    stats = server.stats()
+    print(f"📺 Spectators: {stats['peak_clients']} peak, {stats['frames']} frames, "
+          f"{stats['avg_frame_bytes']:.0f} bytes/frame ({stats['compression_ratio']:.0f}x), "
+          f"encode {stats['encode_ms']:.2f} ms/frame, "
+          f"fan-out {stats['fanout_us_per_client']:.0f} µs/client/frame")
+    for client in stats["clients"]:
+        print(f"   {client['address']}: {client['bytes_per_sec'] / 1024:.1f} KB/s, "
+              f"{client['frames_sent']} sent, {client['frames_dropped']} dropped, "
+              f"{client['keyframes']} keyframes")
+
+def print_planner_stats(planner):
+    """Print boss lookahead planning statistics"""
+    if not planner or not planner.decisions:
+        return
+    stats = planner.stats()
+    print(f"🔮 Planner: {stats['decisions']} decisions, "
+          f"{stats['rollouts_per_decision']:.0f} rollouts of {stats['steps_per_decision']:.0f} frames each, "
+          f"one every {stats['frames_per_decision']:.1f} frames, "
+          f"{stats['avg_ms']:.2f} ms avg / {stats['max_ms']:.2f} ms max per frame")
+
+def print_replay_stats(replay):
+    """Print experience replay statistics"""
+    if not replay or not replay.added:
+        return
+    print(f"🔁 Replay: {len(replay)} transitions stored, "
+          f"{replay.updates} batch updates of {replay.batch_size}")
+
+def print_learner_stats(learner):
+    """Print background learner statistics"""
+    if not learner:
+        return
+    stats = learner.stats()
+    print(f"🧬 Learner: {stats['sent']} transitions sent ({stats['dropped']} dropped), "
+          f"{stats['updates']} batch updates, {stats['versions']} policy versions, "
+          f"{stats['swaps']} hot-swaps")
+
+def print_checkpoint_stats(checkpointer):
+    """Print background checkpoint statistics"""
+    if not checkpointer or not checkpointer.written:
+        return
+    print(f"💾 Checkpoints: {checkpointer.written} written "
+          f"({checkpointer.coalesced} coalesced, {checkpointer.failed} failed), "
+          f"last write {checkpointer.last_write_ms:.1f} ms")
+
+def print_runtime_stats(runtime):
+    """Print asyncio runtime statistics"""
+    if not runtime:
+        return
+    print(f"⚡ asyncio runtime: {runtime.ticks} ticks, {runtime.keys} keys "
+          f"(up to {runtime.max_keys_per_tick} coalesced into one tick), "
+          f"{runtime.checkpoints} checkpoints")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -35,9 +339,363 @@ def main():
         default="normal",
         help="Game mode: normal (waves) or boss (boss fight)"
     )
+    parser.add_argument(
+        "--backend",
+        choices=["curses", "ansi"],
+        default="curses",
+        help="Terminal output: curses, or raw ANSI with one write per frame"
+    )
+    parser.add_argument(
+        "--runtime",
+        choices=["loop", "asyncio"],
+        default="loop",
+        help="Game runtime: classic frame loop, or asyncio tasks with coalesced input"
+    )
+    parser.add_argument(
+        "--render-thread",
+        action="store_true",
+        help="Present frames from a worker thread so slow terminals don't stall the game"
+    )
+    parser.add_argument(
+        "--agent",
+        choices=list(AGENTS),
+        default=None,
+        help="Boss learning agent (default ai.agent)"
+    )
+    parser.add_argument(
+        "--planner",
+        action="store_true",
+        help="Boss plans ahead with Monte-Carlo rollouts (ai.planner_budget_ms per frame)"
+    )
+    parser.add_argument(
+        "--player",
+        type=player_name,
+        default=None,
+        help="Player name: the boss uses and trains this player's own model and sessions"
+    )
+    parser.add_argument(
+        "--bot",
+        choices=list(BOTS),
+        default=None,
+        help="Let a scripted bot play instead of the keyboard (player.bot); q still quits"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed every random stream (game.seed); with --bot the whole game replays"
+    )
+    parser.add_argument(
+        "--learner",
+        action="store_true",
+        help="Train the boss in a background process and hot-swap its policy (ai.learner)"
+    )
+    parser.add_argument(
+        "--spectate",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="ADDRESS",
+        help="Stream the game to spectators (host:port or unix:/path, default network.spectate_address)"
+    )
+    
+    subparsers = parser.add_subparsers(dest="command")
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Compact old sessions into daily aggregates"
+    )
+    compact_parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help="Retention window (default: data.data_retention_days)"
+    )
+    compact_parser.add_argument(
+        "--data-dir",
+        default="data/player_data",
+        help="Player data directory"
+    )
+    compact_parser.add_argument(
+        "--shards",
+        default=None,
+        help="Archive raw events to columnar shards in this directory before deleting them"
+    )
+    shards_parser = subparsers.add_parser(
+        "export-shards",
+        help="Export sessions to memory-mappable columnar shards"
+    )
+    shards_parser.add_argument(
+        "--data-dir",
+        default="data/player_data",
+        help="Player data directory"
+    )
+    shards_parser.add_argument(
+        "--out",
+        default="data/shards",
+        help="Shard directory"
+    )
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Host many headless game sessions for remote clients"
+    )
+    serve_parser.add_argument(
+        "--address",
+        default="127.0.0.1:7800",
+        help="host:port or unix:/path to listen on"
+    )
+    serve_parser.add_argument(
+        "--bench",
+        default=None,
+        metavar="N[,N...]",
+        help="Instead of serving, run N scripted sessions and report how many a core sustains"
+    )
+    serve_parser.add_argument(
+        "--seconds",
+        type=float,
+        default=5.0,
+        help="Bench duration per session count"
+    )
+    serve_parser.add_argument(
+        "--no-frames",
+        action="store_true",
+        help="Bench without rendering and encoding frames"
+    )
+    serve_parser.add_argument(
+        "--no-ai",
+        action="store_true",
+        help="Disable trackers and boss AI in hosted sessions"
+    )
+    serve_parser.add_argument(
+        "--mode",
+        choices=["normal", "boss"],
+        default="normal",
+        help="Game mode of bench sessions"
+    )
+    serve_parser.add_argument(
+        "--bot",
+        choices=list(BOTS),
+        default="random",
+        help="Bot playing each bench session"
+    )
+    connect_parser = subparsers.add_parser(
+        "connect",
+        help="Play a game hosted by 'serve'"
+    )
+    connect_parser.add_argument(
+        "address",
+        nargs="?",
+        default="127.0.0.1:7800",
+        help="host:port or unix:/path"
+    )
+    connect_parser.add_argument(
+        "--mode",
+        choices=["normal", "boss"],
+        default="normal",
+        help="Game mode"
+    )
+    connect_parser.add_argument(
+        "--player",
+        type=player_name,
+        default=None,
+        help="Player name, so the server's boss learns your play separately"
+    )
+    train_parser = subparsers.add_parser(
+        "train",
+        help="Train the boss model on vectorized simulated fights"
+    )
+    train_parser.add_argument(
+        "--agent",
+        choices=list(AGENTS),
+        default="tabular",
+        help="Boss agent to train"
+    )
+    train_parser.add_argument(
+        "--envs",
+        type=int,
+        default=1024,
+        help="Number of fights stepped in lockstep"
+    )
+    train_parser.add_argument(
+        "--steps",
+        type=int,
+        default=2000,
+        help="Lockstep steps to train for"
+    )
+    train_parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for the fights and exploration"
+    )
+    train_parser.add_argument(
+        "--player",
+        type=player_name,
+        default=None,
+        help="Train this player's boss model (and use their sessions with --from-sessions)"
+    )
+    train_parser.add_argument(
+        "--from-sessions",
+        action="store_true",
+        help="Replay recorded player sessions instead of scripted players"
+    )
+    train_parser.add_argument(
+        "--data-dir",
+        default="data/player_data",
+        help="Player data directory (--from-sessions)"
+    )
+    train_parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Only use the N most recent sessions (--from-sessions)"
+    )
+    train_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes replaying sessions (default: CPU count)"
+    )
+    train_parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="Fitted Q-iterations over the replayed transitions (--from-sessions)"
+    )
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Tune boss hyperparameters on simulated fights and save the best model"
+    )
+    sweep_parser.add_argument(
+        "--agent",
+        choices=list(AGENTS),
+        default="tabular",
+        help="Boss agent to tune"
+    )
+    sweep_parser.add_argument(
+        "--space",
+        action="append",
+        metavar="NAME=SPEC",
+        help=f"Values to try: V1,V2,... or LOW:HIGH (random sweeps); NAME is one of "
+             f"{', '.join(PARAMS)}. Repeatable (default: a grid around the agent's defaults)"
+    )
+    sweep_parser.add_argument(
+        "--random",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Sample N random configurations instead of the full grid"
+    )
+    sweep_parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Training seeds per configuration"
+    )
+    sweep_parser.add_argument(
+        "--envs",
+        type=int,
+        default=256,
+        help="Fights stepped in lockstep per trial"
+    )
+    sweep_parser.add_argument(
+        "--steps",
+        type=int,
+        default=2000,
+        help="Lockstep training steps per trial"
+    )
+    sweep_parser.add_argument(
+        "--points",
+        type=int,
+        default=5,
+        help="Evaluations along training (learning curve points)"
+    )
+    sweep_parser.add_argument(
+        "--eval-envs",
+        type=int,
+        default=256,
+        help="Greedy evaluation fights per point"
+    )
+    sweep_parser.add_argument(
+        "--eval-steps",
+        type=int,
+        default=1500,
+        help="Frames before an evaluation fight counts as lost"
+    )
+    sweep_parser.add_argument(
+        "--metric",
+        choices=list(METRICS),
+        default="win_rate",
+        help="Metric configurations are ranked by"
+    )
+    sweep_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)"
+    )
+    sweep_parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for the sampled configurations, training and evaluation fights"
+    )
+    sweep_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Configurations to print"
+    )
+    sweep_parser.add_argument(
+        "--report",
+        default=None,
+        help="Write the ranked results as JSON to this file"
+    )
+    sweep_parser.add_argument(
+        "--player",
+        type=player_name,
+        default=None,
+        help="Save the best model as this player's boss model"
+    )
+    sweep_parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Only report; keep the saved boss model"
+    )
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="Watch a game streamed with --spectate"
+    )
+    watch_parser.add_argument(
+        "address",
+        nargs="?",
+        default=None,
+        help="host:port or unix:/path (default network.spectate_address)"
+    )
     
     args = parser.parse_args()
     
+    if args.command == "compact":
+        run_compaction(args)
+        return
+    if args.command == "export-shards":
+        run_shard_export(args)
+        return
+    if args.command == "watch":
+        run_viewer(args)
+        return
+    if args.command == "serve":
+        run_server(args)
+        return
+    if args.command == "connect":
+        run_remote_player(args)
+        return
+    if args.command == "train":
+        run_training(args)
+        return
+    if args.command == "sweep":
+        run_sweep(args)
+        return
+    
     print("🎮 NEMESIS - AI-Powered Adaptive Boss Battle")
     print("=" * 50)
     
@@ -49,16 +707,78 @@ def main():
     
     print(f"🎨 Theme: {args.theme}")
     print(f"🎯 Mode: {args.mode}")
+    print(f"🖥️  Backend: {args.backend}")
+    print(f"⚙️  Runtime: {args.runtime}")
+    if args.render_thread:
+        print("🧵 Render thread: ON")
+    if args.agent:
+        print(f"🧠 Boss agent: {args.agent}")
+    if args.planner:
+        print("🔮 Boss planner: ON")
+    if args.learner:
+        print("🧬 Background learner: ON")
+    if args.player:
+        print(f"👤 Player: {args.player}")
+    if args.bot:
+        print(f"🤖 Bot: {args.bot}")
+    if args.seed is not None:
+        print(f"🎲 Seed: {args.seed}")
+    if args.spectate is not None:
+        print(f"📺 Spectators: {args.spectate or 'network.spectate_address'}")
     print("\nStarting game...")
     print("=" * 50)
     
     try:
+        config = load_config()
+        if args.render_thread:
+            config["rendering"]["render_thread"] = True
+        if args.planner:
+            config["ai"]["planner"] = True
+        if args.learner:
+            config["ai"]["learner"] = True
+        if args.player:
+            config["data"]["player"] = args.player
+        if args.bot:
+            config["player"]["bot"] = args.bot
+        if args.seed is not None:
+            config["game"]["seed"] = args.seed
+        if args.agent:
+            config["ai"]["agent"] = args.agent
+        if args.spectate is not None:
+            config["network"]["spectate"] = True
+            if args.spectate:
+                config["network"]["spectate_address"] = args.spectate
+        if config["player"]["bot"] == "profile" and not bot_profile(config, not args.no_ai):
+            print("❌ No recorded sessions for the profile bot to play from "
+                  "(play a game first, or pick another --bot)")
+            return
+            
         engine = GameEngine(
             theme=args.theme,
             use_ai=not args.no_ai,
-            mode=args.mode
+            mode=args.mode,
+            config=config
         )
-        curses.wrapper(engine.run)
+        runtime = AsyncGameRuntime(engine) if args.runtime == "asyncio" else None
+        run = runtime.run if runtime else engine.run
+        
+        if args.backend == "ansi":
+            screen = AnsiScreen()
+            ansi_wrapper(run, screen=screen)
+            print(f"\n📡 ANSI output: {screen.avg_bytes_per_frame:.0f} bytes/frame avg "
+                  f"over {screen.frames} frames ({screen.bytes_total / 1024:.1f} KB total)")
+        else:
+            curses.wrapper(run)
+        print_render_stats(engine.output)
+        print_runtime_stats(runtime)
+        print_planner_stats(engine.planner)
+        print_replay_stats(engine.replay)
+        print_learner_stats(engine.learner)
+        print_checkpoint_stats(engine.checkpointer)
+        print_spectator_stats(engine.spectators)
+        print_compaction_report(engine.wait_for_compaction())
+        if args.seed is None:
+            print(f"🎲 Seed: {engine.rngs.seed} (--seed replays it)")
     except KeyboardInterrupt:
         print("\n\n👋 Game interrupted. Thanks for playing!")
     except Exception as e:
@@ -0,0 +1 @@
+"""Networking: spectator streaming and multi-session server"""
@@ -0,0 +1,111 @@
+"""Client for the multi-session game server"""
+import select
+from ..game.game_engine import KEY_COMMANDS
+from ..rendering.framebuffer import FrameBuffer
+from ..rendering.themes import PAIR_COLORS
+from .protocol import (
+    FRAME, STATUS, FrameDecoder, connect, decode_status, hello_message, input_message,
+    split_messages
+)
+
+class GameClient:
+    """
+    One player's connection to a GameServer
+
+    send() forwards input commands; poll() processes whatever the server
+    sent, keeping the latest status and the reconstructed frame.
+    """
+
+    def __init__(self, address, h=40, w=100, frames=True, boss=False, player=None):
+        self.sock = connect(address)
+        self.sock.sendall(hello_message(h, w, frames=frames, boss=boss, player=player))
+        self.decoder = FrameDecoder()
+        self.buffer = bytearray()
+        self.status = None
+        self.closed = False
+
+    @property
+    def frame(self):
+        return self.decoder.frame
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def send(self, commands):
+        if commands and not self.closed:
+            self.sock.sendall(input_message(commands))
+
+    def poll(self, timeout=0.0):
+        """
+        Receive and apply pending messages
+
+        Returns:
+            bool: True if a new frame arrived
+        """
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return False
+        data = self.sock.recv(1 << 16)
+        if not data:
+            self.closed = True
+            return False
+
+        self.buffer += data
+        updated = False
+        for body in split_messages(self.buffer):
+            if body[0] == FRAME:
+                updated = self.decoder.apply(body[1:]) or updated
+            elif body[0] == STATUS:
+                self.status = decode_status(body)
+        return updated
+
+    def close(self):
+        self.sock.close()
+
+class RemotePlayer:
+    """Plays a game hosted by a GameServer on an AnsiScreen"""
+
+    def __init__(self, address, boss=False, player=None):
+        self.address = address
+        self.boss = boss
+        self.player = player
+        self.client = None
+
+    def run(self, screen):
+        screen.timeout(0)
+        h, w = screen.terminal_size()
+        self.client = client = GameClient(self.address, h, w, boss=self.boss, player=self.player)
+        try:
+            while not client.closed:
+                ready, _, _ = select.select([client, screen.fd_in], [], [], 0.5)
+
+                if screen.fd_in in ready:
+                    commands = []
+                    while True:
+                        ch = screen.getch()
+                        if ch == -1:
+                            break
+                        command = KEY_COMMANDS.get(ch)
+                        if command:
+                            commands.append(command)
+                    client.send(commands)
+
+                if client in ready and client.poll():
+                    if client.decoder.palette != PAIR_COLORS:
+                        # Show the server's theme colors
+                        PAIR_COLORS.clear()
+                        PAIR_COLORS.update(client.decoder.palette)
+                        screen.clear()
+                    self._show(screen, client.frame)
+                if client.status and client.status["over"]:
+                    break
+        finally:
+            client.close()
+
+    def _show(self, screen, frame):
+        h, w = screen.terminal_size()
+        shown = FrameBuffer(h, w)
+        rows, cols = min(h, frame.h), min(w, frame.w)
+        shown.chars[:rows, :cols] = frame.chars[:rows, :cols]
+        shown.attrs[:rows, :cols] = frame.attrs[:rows, :cols]
+        screen.present(shown)
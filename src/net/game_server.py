@@ -0,0 +1,572 @@
+"""Headless server hosting many game sessions in one process"""
+import collections
+import selectors
+import socket
+import sqlite3
+import threading
+import time
+import numpy as np
+from ..ai.behavior_tracker import BehaviorTracker
+from ..ai.checkpoint import merge_model_data
+from ..ai.session_store import SessionStore
+from ..ai.player_store import PlayerStore
+from ..ai.pattern_analyzer import PatternAnalyzer
+from ..ai.linear_agent import create_agent
+from ..game.async_runtime import coalesce_commands
+from ..game.bots import create_bot
+from ..game.game_engine import build_atlas
+from ..game.simulation import GameSimulation
+from ..rendering.framebuffer import FrameBuffer
+from ..rendering.themes import PAIR_COLORS, init_colors
+from .protocol import (
+    CODE_COMMANDS, HELLO, INPUT, WANT_FRAMES, BOSS_MODE, FRAME, MIN_SCREEN, MAX_SCREEN, MAX_CLIENT_MESSAGE,
+    decode_hello, encode_frame, encode_palette, frame_message, open_listener, split_messages, status_message
+)
+
+class Connection:
+    """A client socket with its receive buffer and bounded send queue"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbox = bytearray()
+        self.outbox = collections.deque()
+        self.pending = memoryview(b"")
+        self.session = None
+        self.needs_keyframe = True
+        self.dropped = 0
+
+    @property
+    def backlog(self):
+        return len(self.outbox) + (1 if self.pending else 0)
+
+class GameSession:
+    """
+    One hosted game: its own simulation, behavior tracker and boss agent
+    (the player's, when the client named one), the connection it is played
+    from (None for bench sessions) and tick latency statistics.
+    """
+
+    def __init__(self, session_id, sim, tracker=None, frame=None, input_source=None, boss_mode=False,
+                 profile=None):
+        self.id = session_id
+        self.sim = sim
+        self.boss_mode = boss_mode
+        self.tracker = tracker
+        self.profile = profile
+        self.frame = frame
+        self.input_source = input_source
+        self.connection = None
+        self.pending = []
+        self.last_frame = None
+
+        self.deadline = 0.0
+        self.ticks = 0
+        self.games = 1
+        self.step_time = 0.0
+        self.lateness = collections.deque(maxlen=2048)
+
+    def stats(self):
+        lateness = np.array(self.lateness) * 1000 if self.lateness else np.zeros(1)
+        return {
+            "id": self.id,
+            "ticks": self.ticks,
+            "games": self.games,
+            "avg_step_ms": self.step_time / max(self.ticks, 1) * 1000,
+            "avg_latency_ms": float(lateness.mean()),
+            "p99_latency_ms": float(np.percentile(lateness, 99)),
+            "max_latency_ms": float(lateness.max())
+        }
+
+class SessionWriter:
+    """
+    Saves finished games on a background thread.
+
+    submit() copies a game's session and boss model on the server thread;
+    the database insert and the model file are written by the writer
+    thread, one game after another, so the scheduler never waits on the
+    disk. Games of the shared boss all save to one model file, so each
+    merges what it learned into the file as it is by then instead of
+    overwriting it. done() hands back the games whose saves finished.
+    shared_model is the shared boss's model_data as last saved (new games
+    start from it without reading the file).
+    """
+
+    def __init__(self, shared_model=None):
+        self.shared_model = shared_model
+        self._cond = threading.Condition()
+        self._jobs = collections.deque()
+        self._done = collections.deque()
+        self._closing = False
+        self._thread = None
+
+        # Statistics
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, session):
+        """Queue a finished GameSession's tracker session and boss model"""
+        job = {"session": session, "store": None, "data": None, "agent": None}
+        if session.tracker:
+            job["store"] = session.tracker.store
+            job["data"] = session.tracker.finish()
+        boss = session.sim.boss
+        if boss and boss.use_ai and boss.rl_agent:
+            job["agent"] = boss.rl_agent
+            job["model"] = boss.rl_agent.model_data()
+            job["base"] = boss.base_model
+
+        with self._cond:
+            self._jobs.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="session-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closing:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                job = self._jobs.popleft()
+            try:
+                self.write(job)
+                self.written += 1
+            except (OSError, sqlite3.Error):
+                self.failed += 1
+            self._done.append(job["session"])
+
+    def write(self, job):
+        """Save one game (writer thread)"""
+        if job["data"] is not None:
+            job["store"].save_session(job["data"])
+
+        agent = job["agent"]
+        if agent is None:
+            return
+        model = job["model"]
+        if job["base"] is not None:
+            current = type(agent)(model_dir=agent.model_dir)
+            if current.load_model():
+                model = merge_model_data(current.model_data(), job["base"], model)
+        agent.save_model(model_data=model)
+        if job["base"] is not None:
+            self.shared_model = model
+
+    def done(self):
+        """GameSessions saved since the last call"""
+        sessions = []
+        while self._done:
+            sessions.append(self._done.popleft())
+        return sessions
+
+    def close(self, timeout=30.0):
+        """Finish every queued save and stop the writer thread"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+class GameServer:
+    """
+    Hosts any number of independent games on one thread.
+
+    Clients connect over TCP or a Unix socket, send HELLO (screen size,
+    whether they want frames, boss mode, optionally a player name) and
+    then INPUT messages; after
+    every tick they get a STATUS message and, if requested, a compressed
+    FRAME delta. Each session has its own tick deadline; every scheduler
+    pass steps each due session at most once, starting one session
+    further along each time, so an overloaded server slows all games
+    equally instead of starving the ones at the end of the list.
+    Finished games are saved by a SessionWriter thread.
+    """
+
+    def __init__(self, address="127.0.0.1:7800", fps=30, use_ai=True, persist=True,
+                 theme="neo", lives=5, max_outbox=8, restart=False, store=None, players=None):
+        self.address = address
+        self.budget = 1.0 / fps
+        self.use_ai = use_ai
+        self.persist = persist
+        self.lives = lives
+        self.max_outbox = max_outbox
+        self.restart = restart
+
+        attr_primary, attr_dim, attr_acc, attr_alt, attr_bg = init_colors(theme)
+        self.attrs = (attr_primary, attr_dim, attr_acc)
+        self.atlas = build_atlas(attr_primary, attr_acc, attr_alt)
+        self._own_store = store is None and use_ai
+        self.store = store or (SessionStore() if use_ai else None)
+        # Shared by every anonymous boss, as is the store's one connection
+        self.analyzer = PatternAnalyzer(store=self.store) if use_ai else None
+        # Named players get their own boss; open profiles are LRU-bounded
+        self.players = players or (PlayerStore() if use_ai else None)
+        self.writer = SessionWriter()
+
+        self.sessions = []
+        self.finished = []
+        self._next_id = 1
+        self._cursor = 0
+        self._selector = None
+        self._listener = None
+        self._running = False
+
+        self.started_at = None
+        self.busy_time = 0.0
+        self.peak_sessions = 0
+
+    def start(self):
+        if self.use_ai and self.writer.shared_model is None:
+            # The shared boss model is read once; games after that start
+            # from what the writer last saved
+            agent = create_agent()
+            if agent.load_model():
+                self.writer.shared_model = agent.model_data()
+        self._selector = selectors.DefaultSelector()
+        if self.address:
+            self._listener = open_listener(self.address)
+            self._selector.register(self._listener, selectors.EVENT_READ, None)
+        self.started_at = time.perf_counter()
+        self._running = True
+        return self
+
+    def stop(self):
+        self._running = False
+        for session in list(self.sessions):
+            self._finish(session)
+        self.writer.close()
+        self._release_saved()
+        if self.players:
+            self.players.close()
+        if self._own_store:
+            self.store.close()
+        if self._listener:
+            self._selector.unregister(self._listener)
+            self._listener.close()
+        self._selector.close()
+
+    def add_session(self, h, w, boss=False, frames=True, input_source=None, player=None, seed=None):
+        """
+        Create a session (bench sessions pass an input_source instead of a client)
+
+        Args:
+            input_source: Called with the GameSimulation each tick, returns
+                          commands (e.g. a game.bots.Bot)
+            player: Player name; the session uses (and trains) that player's
+                    profile instead of the shared boss
+            seed: Seed of the session's random streams (restarts continue them)
+
+        Raises:
+            ValueError: Invalid player name, or the player is already in a game
+        """
+        profile = self.players.acquire(player) if player and self.players else None
+        store = profile.store if profile else self.store
+        tracker = BehaviorTracker(store=store) if self.use_ai else None
+        sim = self._simulation(h, w, boss, tracker, profile, seed=seed)
+        frame = FrameBuffer(h, w) if frames else None
+
+        session = GameSession(self._next_id, sim, tracker, frame, input_source, boss_mode=boss,
+                              profile=profile)
+        session.deadline = time.perf_counter()
+        self._next_id += 1
+        self.sessions.append(session)
+        self.peak_sessions = max(self.peak_sessions, len(self.sessions))
+        return session
+
+    def serve(self, duration=None):
+        """Run the event loop until stop() or for duration seconds"""
+        end = time.perf_counter() + duration if duration else None
+        while self._running:
+            now = time.perf_counter()
+            if end and now >= end:
+                break
+            if self.sessions:
+                timeout = max(0.0, min(s.deadline for s in self.sessions) - now)
+            else:
+                timeout = 0.1
+            if end:
+                timeout = min(timeout, max(0.0, end - now))
+
+            if self._selector.get_map():
+                events = self._selector.select(timeout)
+            else:
+                time.sleep(timeout)
+                events = []
+
+            for key, mask in events:
+                if key.data is None:
+                    self._accept()
+                    continue
+                if mask & selectors.EVENT_READ:
+                    self._read(key.data)
+                if mask & selectors.EVENT_WRITE and key.data.sock.fileno() != -1:
+                    self._flush(key.data)
+
+            self._run_due()
+            self._release_saved()
+
+    def _run_due(self):
+        """One round-robin pass over the sessions whose tick is due"""
+        if not self.sessions:
+            return
+        count = len(self.sessions)
+        start = self._cursor % count
+        order = self.sessions[start:] + self.sessions[:start]
+        self._cursor = start + 1
+
+        for session in order:
+            if session.deadline <= time.perf_counter():
+                self._step(session)
+
+    def _step(self, session):
+        start = time.perf_counter()
+        commands, session.pending = session.pending, []
+        if session.input_source:
+            commands += session.input_source(session.sim)
+
+        sim = session.sim
+        sim.step(coalesce_commands(commands))
+        if session.connection:
+            self._send_tick(session)
+        elif session.frame is not None:
+            # Bench sessions still pay for rendering and encoding
+            self._render(session)
+
+        end = time.perf_counter()
+        session.ticks += 1
+        session.step_time += end - start
+        session.lateness.append(end - session.deadline)
+        self.busy_time += end - start
+
+        session.deadline += self.budget
+        if session.deadline < end - self.budget:
+            # Too far behind to catch up: resync instead of bursting
+            session.deadline = end
+
+        if sim.over:
+            if self.restart:
+                self._restart(session)
+            else:
+                self._finish(session)
+
+    def _render(self, session):
+        """Draw the session's game and encode it against the last frame sent"""
+        attr_primary, attr_dim, attr_acc = self.attrs
+        sim, frame = session.sim, session.frame
+        frame.erase()
+        sim.render(frame, self.atlas)
+        hud = f"SKOR: {sim.score}  ♥ CAN: {sim.lives}  "
+        hud += f"BOSS: {sim.boss.health}/{sim.boss.max_health} HP" if sim.boss else f"WAVE: {sim.wave}"
+        frame.addstr(0, 2, hud, attr_primary)
+
+        keyframe = session.connection is not None and session.connection.needs_keyframe
+        body = encode_frame(frame, None if keyframe else session.last_frame)
+        session.last_frame = frame.copy()
+        return body
+
+    def _send_tick(self, session):
+        conn, sim = session.connection, session.sim
+        if conn.backlog >= self.max_outbox:
+            # Client isn't keeping up: skip this tick, resync with a keyframe
+            conn.dropped += 1
+            conn.needs_keyframe = True
+            return
+
+        if session.frame is not None:
+            if conn.needs_keyframe:
+                conn.outbox.append(frame_message(bytes([FRAME]) + encode_palette(PAIR_COLORS)))
+            conn.outbox.append(frame_message(bytes([FRAME]) + self._render(session)))
+            conn.needs_keyframe = False
+        boss_health = sim.boss.health if sim.boss else 0
+        conn.outbox.append(status_message(sim.frame, sim.score, sim.lives, sim.wave,
+                                          boss_health, sim.over, sim.victory))
+        self._flush(conn)
+
+    def _simulation(self, h, w, boss, tracker, profile, seed=None, rngs=None):
+        """A game whose boss uses the server's analyzer and shared model (or the profile's)"""
+        return GameSimulation(h, w, mode="boss" if boss else "normal", use_ai=self.use_ai,
+                              behavior_tracker=tracker, lives=self.lives, profile=profile,
+                              seed=seed, rngs=rngs, analyzer=self.analyzer,
+                              boss_model=self.writer.shared_model)
+
+    def _restart(self, session):
+        sim = session.sim
+        session.sim = self._simulation(sim.H, sim.W, session.boss_mode, session.tracker,
+                                       session.profile, rngs=sim.rngs)
+        session.games += 1
+
+    def _finish(self, session):
+        """Save a finished game and close its connection"""
+        if session not in self.sessions:
+            return
+        self.sessions.remove(session)
+        self.finished.append(session)
+
+        if self.persist:
+            # The profile (and its database) stays pinned until the save is done
+            self.writer.submit(session)
+        elif session.profile:
+            self.players.release(session.profile)
+
+        conn = session.connection
+        if conn:
+            conn.session = None
+            self._flush(conn)
+            self._close(conn)
+
+    def _release_saved(self):
+        """Release the player profiles of games the writer has saved"""
+        for session in self.writer.done():
+            if session.profile:
+                self.players.release(session.profile)
+
+    def _accept(self):
+        try:
+            sock, _ = self._listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._selector.register(sock, selectors.EVENT_READ, Connection(sock))
+
+    def _read(self, conn):
+        try:
+            data = conn.sock.recv(1 << 16)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+
+        conn.inbox += data
+        try:
+            self._handle(conn, split_messages(conn.inbox, MAX_CLIENT_MESSAGE))
+        except ValueError:
+            # Oversized or malformed message: only this client goes
+            self._drop(conn)
+
+    def _drop(self, conn):
+        """End a client's game and close its connection"""
+        if conn.session:
+            self._finish(conn.session)
+        self._close(conn)
+
+    def _handle(self, conn, bodies):
+        """
+        Act on a client's messages
+
+        Raises:
+            ValueError: Malformed message
+        """
+        for body in bodies:
+            if not body:
+                continue
+            kind = body[0]
+            if kind == HELLO and conn.session is None:
+                flags, h, w, player = decode_hello(body)
+                h = min(max(h, MIN_SCREEN[0]), MAX_SCREEN[0])
+                w = min(max(w, MIN_SCREEN[1]), MAX_SCREEN[1])
+                try:
+                    session = self.add_session(h, w, boss=bool(flags & BOSS_MODE),
+                                               frames=bool(flags & WANT_FRAMES), player=player)
+                except ValueError:
+                    # Unusable name or player already in a game: play against the shared boss
+                    session = self.add_session(h, w, boss=bool(flags & BOSS_MODE),
+                                               frames=bool(flags & WANT_FRAMES))
+                session.connection = conn
+                conn.session = session
+            elif kind == INPUT and conn.session:
+                conn.session.pending.extend(CODE_COMMANDS[c] for c in body[1:] if c in CODE_COMMANDS)
+
+    def _flush(self, conn):
+        if conn.sock.fileno() == -1:
+            return
+        try:
+            while True:
+                if not conn.pending:
+                    if not conn.outbox:
+                        break
+                    conn.pending = memoryview(conn.outbox.popleft())
+                sent = conn.sock.send(conn.pending)
+                conn.pending = conn.pending[sent:]
+        except BlockingIOError:
+            pass
+        except OSError:
+            conn.outbox.clear()
+            conn.pending = memoryview(b"")
+
+        events = selectors.EVENT_READ
+        if conn.pending or conn.outbox:
+            events |= selectors.EVENT_WRITE
+        try:
+            self._selector.modify(conn.sock, events, conn)
+        except (KeyError, ValueError):
+            pass
+
+    def _close(self, conn):
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+
+    def report(self):
+        """
+        Per-session tick latency and overall CPU use
+
+        Returns:
+            dict: sessions, utilization (busy share of one core),
+                  sessions_per_core estimate and per-session stats
+        """
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        sessions = self.sessions + self.finished
+        stats = [s.stats() for s in sessions]
+        utilization = self.busy_time / elapsed if elapsed else 0.0
+        ticks = sum(s["ticks"] for s in stats)
+        return {
+            "sessions": len(sessions),
+            "peak_sessions": self.peak_sessions,
+            "elapsed": elapsed,
+            "ticks": ticks,
+            "avg_step_ms": self.busy_time / max(ticks, 1) * 1000,
+            "utilization": utilization,
+            "sessions_per_core": self.peak_sessions / utilization if utilization else 0.0,
+            "p99_latency_ms": max((s["p99_latency_ms"] for s in stats), default=0.0),
+            "per_session": stats
+        }
+
+def run_bench(sessions, seconds=5.0, fps=30, frames=True, boss=False, use_ai=False, seed=0,
+              bot="random"):
+    """
+    Measure how many sessions one core sustains
+
+    Runs `sessions` games played by bots (see game.bots) in this process
+    for `seconds` without sockets (but with rendering and frame encoding
+    if frames is set) and reports the server's utilization and tick latency.
+
+    Raises:
+        ValueError: Unknown bot, or "profile" without recorded sessions
+    """
+    options = {}
+    if bot == "profile":
+        # Checked before any session is built, so nothing is left half open
+        analyzer = PatternAnalyzer()
+        options = {"profile": analyzer.get_player_profile(), "fps": fps}
+        analyzer.store.close()
+        if not options["profile"]:
+            raise ValueError("No recorded sessions to build a player profile from")
+    server = GameServer(address=None, fps=fps, use_ai=use_ai, persist=False, restart=True)
+    for i in range(sessions):
+        server.add_session(40, 100, boss=boss, frames=frames, seed=seed + i,
+                           input_source=create_bot(bot, seed=seed + i, **options))
+    server.start()
+    server.serve(duration=seconds)
+    report = server.report()
+    server.stop()
+    return report
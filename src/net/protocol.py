@@ -0,0 +1,252 @@
+"""Wire format for streaming terminal frames"""
+import socket
+import struct
+import zlib
+import numpy as np
+from ..rendering.framebuffer import FrameBuffer
+
+KEYFRAME = 1
+DELTA = 2
+PALETTE = 3
+
+# kind, height, width, span count, run count (padded to keep the arrays aligned)
+HEADER = struct.Struct("<BxxxHHII")
+LENGTH = struct.Struct("<I")
+
+def encode_frame(frame, previous=None, level=1):
+    """
+    Encode a frame as a zlib-compressed, run-length encoded cell delta
+
+    Changed cells are sent as spans of consecutive cell indices plus one
+    stream of (count, char, attr) runs covering all of them, so blank
+    areas and repeated characters cost a few bytes before compression.
+
+    Args:
+        frame: FrameBuffer to send
+        previous: Frame the receiver already has (None sends a keyframe)
+        level: zlib compression level
+
+    Returns:
+        bytes: Message body, without the length prefix
+    """
+    chars = frame.chars.reshape(-1)
+    attrs = frame.attrs.reshape(-1)
+
+    if previous is None or (previous.h, previous.w) != (frame.h, frame.w):
+        kind = KEYFRAME
+        idx = np.arange(chars.size)
+    else:
+        kind = DELTA
+        idx = np.flatnonzero((chars != previous.chars.reshape(-1)) |
+                             (attrs != previous.attrs.reshape(-1)))
+
+    # Spans of consecutive changed cells
+    span_first = np.flatnonzero(np.diff(idx, prepend=-2) != 1)
+    starts = idx[span_first]
+    lengths = np.diff(span_first, append=idx.size)
+
+    # Runs of identical cells within the changed stream
+    c = chars[idx]
+    a = attrs[idx].astype(np.uint32)
+    run_first = np.flatnonzero(np.diff(c, prepend=np.uint32(0xffffffff)).astype(bool) |
+                               np.diff(a, prepend=np.uint32(0xffffffff)).astype(bool))
+    if idx.size:
+        run_first[0] = 0
+    counts = np.diff(run_first, append=idx.size)
+
+    payload = b"".join((
+        HEADER.pack(kind, frame.h, frame.w, len(starts), len(counts)),
+        starts.astype("<u4").tobytes(),
+        lengths.astype("<u4").tobytes(),
+        counts.astype("<u4").tobytes(),
+        c[run_first].astype("<u4").tobytes(),
+        a[run_first].astype("<u4").tobytes()
+    ))
+    return zlib.compress(payload, level)
+
+def encode_palette(pair_colors):
+    """
+    Encode the color pair table the frame attributes refer to
+
+    Args:
+        pair_colors: {pair number: (fg, bg)} as in themes.PAIR_COLORS
+
+    Returns:
+        bytes: Message body, without the length prefix
+    """
+    table = np.array([(pair, fg, bg) for pair, (fg, bg) in sorted(pair_colors.items())],
+                     dtype="<i4").reshape(-1, 3)
+    payload = HEADER.pack(PALETTE, 0, 0, len(table), 0) + table.tobytes()
+    return zlib.compress(payload)
+
+def frame_message(body):
+    """Length-prefix a message body for the stream"""
+    return LENGTH.pack(len(body)) + body
+
+def split_messages(buffer, max_size=None):
+    """
+    Remove complete messages from the front of a receive buffer
+
+    Args:
+        buffer: bytearray of received data, consumed in place
+        max_size: Largest message body accepted (None for no limit)
+
+    Returns:
+        list: Message bodies
+
+    Raises:
+        ValueError: A message declares a body larger than max_size
+    """
+    messages = []
+    offset = 0
+    while len(buffer) - offset >= LENGTH.size:
+        (size,) = LENGTH.unpack_from(buffer, offset)
+        if max_size is not None and size > max_size:
+            raise ValueError(f"Message of {size} bytes exceeds the {max_size}-byte limit")
+        end = offset + LENGTH.size + size
+        if len(buffer) < end:
+            break
+        messages.append(bytes(buffer[offset + LENGTH.size:end]))
+        offset = end
+    del buffer[:offset]
+    return messages
+
+class FrameDecoder:
+    """Rebuilds the sender's frame from keyframes and deltas"""
+
+    def __init__(self):
+        self.frame = None
+        self.palette = {}
+        self.frames = 0
+        self.keyframes = 0
+
+    def apply(self, body):
+        """
+        Apply one message
+
+        Returns:
+            bool: True if the frame changed (False for palettes and for
+                  deltas with no frame to apply them to)
+        """
+        payload = zlib.decompress(body)
+        kind, h, w, nspans, nruns = HEADER.unpack_from(payload)
+        if kind == PALETTE:
+            table = np.frombuffer(payload, dtype="<i4", offset=HEADER.size).reshape(-1, 3)
+            self.palette = {int(pair): (int(fg), int(bg)) for pair, fg, bg in table}
+            return False
+            
+        arrays = np.frombuffer(payload, dtype="<u4", offset=HEADER.size)
+        starts, lengths, counts, run_chars, run_attrs = np.split(
+            arrays, np.cumsum([nspans, nspans, nruns, nruns])
+        )[:5]
+
+        if kind == KEYFRAME:
+            if self.frame is None or (self.frame.h, self.frame.w) != (h, w):
+                self.frame = FrameBuffer(h, w)
+            self.keyframes += 1
+        elif self.frame is None or (self.frame.h, self.frame.w) != (h, w):
+            return False
+
+        # Cell index of every changed cell, span by span
+        lengths = lengths.astype(np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+        self.frame.chars.reshape(-1)[positions] = np.repeat(run_chars, counts)
+        self.frame.attrs.reshape(-1)[positions] = np.repeat(run_attrs, counts)
+        self.frames += 1
+        return True
+
+# Game server messages: a kind byte, then a fixed struct or a frame body
+HELLO = 16      # client -> server: flags, height, width[, player name]
+INPUT = 17      # client -> server: command codes
+STATUS = 18     # server -> client: game state after a tick
+FRAME = 19      # server -> client: encode_frame() body
+
+WANT_FRAMES = 1
+BOSS_MODE = 2
+GAME_OVER = 1
+VICTORY = 2
+
+HELLO_MSG = struct.Struct("<BBHH")
+# Largest message body a server accepts from a client
+MAX_CLIENT_MESSAGE = 1 << 16
+# Screen sizes a server plays at; HELLO sizes outside are clamped
+MIN_SCREEN = (20, 40)
+MAX_SCREEN = (100, 300)
+STATUS_MSG = struct.Struct("<BBxxIiiii")
+
+COMMAND_CODES = {"left": 1, "right": 2, "shoot": 3, "quit": 4}
+CODE_COMMANDS = {code: command for command, code in COMMAND_CODES.items()}
+
+def hello_message(h, w, frames=True, boss=False, player=None):
+    flags = (WANT_FRAMES if frames else 0) | (BOSS_MODE if boss else 0)
+    name = player.encode("utf-8") if player else b""
+    return frame_message(HELLO_MSG.pack(HELLO, flags, h, w) + name)
+
+def decode_hello(body):
+    """
+    Returns:
+        tuple: (flags, height, width, player name or None)
+
+    Raises:
+        ValueError: Body too short for a HELLO
+    """
+    if len(body) < HELLO_MSG.size:
+        raise ValueError(f"HELLO of {len(body)} bytes, expected at least {HELLO_MSG.size}")
+    _, flags, h, w = HELLO_MSG.unpack_from(body)
+    name = body[HELLO_MSG.size:].decode("utf-8", "replace")
+    return flags, h, w, name or None
+
+def input_message(commands):
+    return frame_message(bytes([INPUT] + [COMMAND_CODES[c] for c in commands]))
+
+def status_message(tick, score, lives, wave, boss_health, over=False, victory=False):
+    flags = (GAME_OVER if over else 0) | (VICTORY if victory else 0)
+    return frame_message(STATUS_MSG.pack(STATUS, flags, tick, score, lives, wave, boss_health))
+
+def decode_status(body):
+    """
+    Returns:
+        dict: tick, score, lives, wave, boss_health, over, victory
+    """
+    _, flags, tick, score, lives, wave, boss_health = STATUS_MSG.unpack(body)
+    return {
+        "tick": tick,
+        "score": score,
+        "lives": lives,
+        "wave": wave,
+        "boss_health": boss_health,
+        "over": bool(flags & GAME_OVER),
+        "victory": bool(flags & VICTORY)
+    }
+
+def parse_address(address):
+    """
+    Parse "host:port" or "unix:/path/to/socket"
+
+    Returns:
+        tuple: (socket family, address)
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+def open_listener(address, backlog=16):
+    """Bound, listening, non-blocking server socket for an address"""
+    family, addr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(addr)
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+def connect(address):
+    """Connected client socket for an address"""
+    family, addr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(addr)
+    return sock
@@ -0,0 +1,266 @@
+"""Spectator server broadcasting frame deltas to any number of viewers"""
+import collections
+import os
+import selectors
+import socket
+import threading
+import time
+from ..rendering.pipeline import FrameMailbox
+from ..rendering.themes import PAIR_COLORS
+from .protocol import encode_frame, encode_palette, frame_message, open_listener
+
+class SpectatorClient:
+    """One connected viewer: its send queue and statistics"""
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.queue = collections.deque()
+        self.pending = memoryview(b"")
+        self.needs_keyframe = True
+        self.connected_at = time.monotonic()
+
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.keyframes = 0
+        self.bytes_sent = 0
+        self.send_time = 0.0
+
+    @property
+    def backlog(self):
+        return len(self.queue) + (1 if self.pending else 0)
+
+    def bandwidth(self):
+        """Average bytes per second sent to this viewer"""
+        elapsed = time.monotonic() - self.connected_at
+        return self.bytes_sent / elapsed if elapsed > 0 else 0.0
+
+class SpectatorServer:
+    """
+    Streams the game's frames to spectators over TCP or a Unix socket.
+
+    broadcast() only copies the frame into a single-slot mailbox; a
+    server thread encodes each frame once as a compressed delta against
+    the previous one and fans it out to every client. A client whose
+    queue already holds max_queue frames has frames dropped and is
+    resynchronized with a keyframe once it catches up, so one slow
+    viewer never delays the game or the other viewers.
+    """
+
+    def __init__(self, address="127.0.0.1:7777", max_queue=4, compression=1):
+        self.address = address
+        self.max_queue = max_queue
+        self.compression = compression
+
+        self.clients = []
+        self.mailbox = FrameMailbox()
+        self._last = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+        # Encoding and fan-out statistics
+        self.frames = 0
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.encode_time = 0.0
+        self.fanout_time = 0.0      # includes the sends made while fanning out
+        self.deferred_send_time = 0.0   # sends when a socket becomes writable again
+        self.client_frames = 0
+        self.peak_clients = 0
+        self.finished_clients = []
+
+    def start(self):
+        self._listener = open_listener(self.address)
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="spectator-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        for client in list(self.clients):
+            self._drop_client(client)
+        self._selector.close()
+        self._listener.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        if self.address.startswith("unix:"):
+            try:
+                os.unlink(self.address[len("unix:"):])
+            except OSError:
+                pass
+
+    def broadcast(self, frame):
+        """Queue a frame for the spectators (called from the game loop)"""
+        if not self._running:
+            return
+        self.mailbox.publish(frame.copy())
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self):
+        while self._running:
+            for key, mask in self._selector.select(timeout=0.1):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    client = key.data
+                    if mask & selectors.EVENT_READ:
+                        self._read(client)
+                    if mask & selectors.EVENT_WRITE and client in self.clients:
+                        start = time.perf_counter()
+                        self._flush(client)
+                        self.deferred_send_time += time.perf_counter() - start
+
+            frame = self.mailbox.take(0)
+            if frame is not None:
+                self._fan_out(frame)
+
+    def _accept(self):
+        try:
+            sock, address = self._listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = SpectatorClient(sock, address or self.address)
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        with self._lock:
+            self.clients.append(client)
+            self.peak_clients = max(self.peak_clients, len(self.clients))
+
+    def _read(self, client):
+        # Viewers don't send anything; a readable socket means it closed
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop_client(client)
+
+    def _drop_client(self, client):
+        with self._lock:
+            if client not in self.clients:
+                return
+            self.clients.remove(client)
+            self.finished_clients.append(client)
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def _fan_out(self, frame):
+        start = time.perf_counter()
+        delta = frame_message(encode_frame(frame, self._last, self.compression))
+        keyframe = delta if self._last is None else None
+        self._last = frame
+        encoded = time.perf_counter()
+
+        self.frames += 1
+        self.raw_bytes += frame.chars.nbytes + frame.attrs.nbytes
+        self.encoded_bytes += len(delta)
+        self.encode_time += encoded - start
+
+        for client in list(self.clients):
+            if client.backlog >= self.max_queue:
+                # Too far behind: skip this frame, resync with a keyframe later
+                client.frames_dropped += 1
+                client.needs_keyframe = True
+                continue
+
+            if client.needs_keyframe:
+                if keyframe is None:
+                    keyframe = frame_message(encode_frame(frame, None, self.compression))
+                # The palette travels with every keyframe so the viewer shows the theme
+                client.queue.append(frame_message(encode_palette(PAIR_COLORS)) + keyframe)
+                client.keyframes += 1
+                client.needs_keyframe = False
+            else:
+                client.queue.append(delta)
+            self.client_frames += 1
+            self._flush(client)
+
+        self.fanout_time += time.perf_counter() - encoded
+
+    def _flush(self, client):
+        """Send as much queued data as the socket accepts"""
+        start = time.perf_counter()
+        try:
+            while True:
+                if not client.pending:
+                    if not client.queue:
+                        break
+                    client.pending = memoryview(client.queue.popleft())
+                    client.frames_sent += 1
+                sent = client.sock.send(client.pending)
+                client.bytes_sent += sent
+                client.pending = client.pending[sent:]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop_client(client)
+            return
+        finally:
+            client.send_time += time.perf_counter() - start
+
+        events = selectors.EVENT_READ
+        if client.pending or client.queue:
+            events |= selectors.EVENT_WRITE
+        self._selector.modify(client.sock, events, client)
+
+    def stats(self):
+        """
+        Bandwidth and fan-out cost summary
+
+        Returns:
+            dict: Totals plus a per-client list
+        """
+        with self._lock:
+            clients = self.clients + self.finished_clients
+
+        frames = max(self.frames, 1)
+        client_frames = max(self.client_frames, 1)
+        fanout_time = self.fanout_time + self.deferred_send_time
+        return {
+            "frames": self.frames,
+            "peak_clients": self.peak_clients,
+            "avg_frame_bytes": self.encoded_bytes / frames,
+            "compression_ratio": self.raw_bytes / max(self.encoded_bytes, 1),
+            "encode_ms": self.encode_time / frames * 1000,
+            "fanout_us_per_client": fanout_time / client_frames * 1e6,
+            "clients": [{
+                "address": str(c.address),
+                "bytes_sent": c.bytes_sent,
+                "bytes_per_sec": c.bandwidth(),
+                "frames_sent": c.frames_sent,
+                "frames_dropped": c.frames_dropped,
+                "keyframes": c.keyframes,
+                "send_ms": c.send_time * 1000
+            } for c in clients]
+        }
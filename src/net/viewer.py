@@ -0,0 +1,63 @@
+"""Terminal viewer for the spectator stream"""
+import select
+from ..rendering.framebuffer import FrameBuffer
+from ..rendering.themes import PAIR_COLORS
+from .protocol import FrameDecoder, connect, split_messages
+
+class SpectatorViewer:
+    """
+    Connects to a SpectatorServer and shows the game on an AnsiScreen.
+
+    Every received message is applied in order (deltas build on each
+    other) but the screen is repainted once per batch, so a viewer that
+    fell behind catches up in a single write. Press q to stop watching.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.sock = connect(address)
+        self.decoder = FrameDecoder()
+        self.buffer = bytearray()
+        self.bytes_received = 0
+
+    def run(self, screen):
+        screen.timeout(0)
+        try:
+            while True:
+                ready, _, _ = select.select([self.sock, screen.fd_in], [], [], 0.5)
+
+                if screen.fd_in in ready:
+                    ch = screen.getch()
+                    if ch == ord('q') or ch == ord('Q'):
+                        break
+
+                if self.sock in ready:
+                    data = self.sock.recv(1 << 16)
+                    if not data:
+                        break
+                    self.bytes_received += len(data)
+                    self.buffer += data
+
+                    updated = False
+                    for body in split_messages(self.buffer):
+                        updated = self.decoder.apply(body) or updated
+                    if self.decoder.palette != PAIR_COLORS:
+                        # Show the game's theme colors
+                        PAIR_COLORS.clear()
+                        PAIR_COLORS.update(self.decoder.palette)
+                        screen.clear()
+                        updated = self.decoder.frame is not None
+                    if updated:
+                        screen.present(self._fit(self.decoder.frame, *screen.terminal_size()))
+        finally:
+            self.sock.close()
+
+    def _fit(self, frame, h, w):
+        """Crop or pad the game's frame to this terminal"""
+        if (frame.h, frame.w) == (h, w):
+            return frame.copy()
+        fitted = FrameBuffer(h, w)
+        rows, cols = min(h, frame.h), min(w, frame.w)
+        fitted.chars[:rows, :cols] = frame.chars[:rows, :cols]
+        fitted.attrs[:rows, :cols] = frame.attrs[:rows, :cols]
+        return fitted
@@ -0,0 +1,222 @@
+"""Raw ANSI terminal backend: one os.write per frame"""
+import curses
+import os
+import select
+import termios
+import tty
+import unicodedata
+from .framebuffer import FrameBuffer
+from .themes import PAIR_COLORS
+
+CSI = "\x1b["
+
+# Escape sequences for the keys the game reads, mapped to curses key codes
+ESCAPE_KEYS = {
+    b"\x1b[A": curses.KEY_UP, b"\x1bOA": curses.KEY_UP,
+    b"\x1b[B": curses.KEY_DOWN, b"\x1bOB": curses.KEY_DOWN,
+    b"\x1b[C": curses.KEY_RIGHT, b"\x1bOC": curses.KEY_RIGHT,
+    b"\x1b[D": curses.KEY_LEFT, b"\x1bOD": curses.KEY_LEFT
+}
+
+ATTR_SGR = (
+    (curses.A_BOLD, "1"),
+    (curses.A_DIM, "2"),
+    (curses.A_UNDERLINE, "4"),
+    (curses.A_BLINK, "5"),
+    (curses.A_REVERSE, "7")
+)
+
+class AnsiScreen(FrameBuffer):
+    """
+    Drop-in replacement for the curses stdscr that bypasses curses.
+
+    Drawing goes into the cell buffer; refresh() diffs it against the
+    last presented frame, encodes the changed runs as cursor moves and
+    SGR sequences and emits the whole frame with a single os.write.
+    Bytes written per frame are counted for comparison with curses.
+    """
+
+    def __init__(self, fd_out=1, fd_in=0):
+        self.fd_out = fd_out
+        self.fd_in = fd_in
+        h, w = self.terminal_size()
+        super().__init__(h, w)
+
+        self._presented = None
+        self._sgr_cache = {}
+        self._wide_cache = {}
+        self._input = b""
+        self._delay = -1    # ms to wait in getch, -1 blocks (curses semantics)
+
+        # Output instrumentation
+        self.frames = 0
+        self.bytes_last_frame = 0
+        self.bytes_total = 0
+
+    def terminal_size(self):
+        """Terminal size in rows and columns, without touching the buffer"""
+        try:
+            size = os.get_terminal_size(self.fd_out)
+        except OSError:
+            return 24, 80
+        return max(1, size.lines), max(1, size.columns)
+
+    def getmaxyx(self):
+        """Current terminal size; the buffer follows resizes"""
+        h, w = self.terminal_size()
+        if (h, w) != (self.h, self.w):
+            self.resize(h, w)
+            self._presented = None
+        return self.h, self.w
+
+    def clear(self):
+        """Erase and force a full repaint on the next refresh"""
+        self.erase()
+        self._presented = None
+
+    def nodelay(self, flag):
+        self._delay = 0 if flag else -1
+
+    def timeout(self, ms):
+        self._delay = ms
+
+    def keypad(self, flag):
+        pass
+
+    @property
+    def avg_bytes_per_frame(self):
+        return self.bytes_total / self.frames if self.frames else 0.0
+
+    def _sgr(self, attr):
+        """SGR sequence selecting an attribute value"""
+        seq = self._sgr_cache.get(attr)
+        if seq is None:
+            codes = ["0"]
+            codes.extend(code for flag, code in ATTR_SGR if attr & flag)
+            fg, bg = PAIR_COLORS.get((attr & curses.A_COLOR) >> 8, (-1, -1))
+            if fg >= 0:
+                codes.append(str(30 + fg))
+            if bg >= 0:
+                codes.append(str(40 + bg))
+            seq = f"{CSI}{';'.join(codes)}m"
+            self._sgr_cache[attr] = seq
+        return seq
+
+    def _is_wide(self, code):
+        """True for characters the terminal draws two columns wide"""
+        wide = self._wide_cache.get(code)
+        if wide is None:
+            wide = unicodedata.east_asian_width(chr(code)) in ("W", "F")
+            self._wide_cache[code] = wide
+        return wide
+
+    def compose(self):
+        """
+        Encode the changes since the last presented frame
+
+        Returns:
+            bytes: Cursor moves, SGR sequences and characters
+        """
+        ys, xs = self.changed_cells(self._presented)
+        out = []
+        if self._presented is None:
+            out.append(f"{CSI}0m{CSI}2J")
+
+        chars = self.chars[ys, xs].tolist()
+        attrs = self.attrs[ys, xs].tolist()
+        cursor_y = cursor_x = -1
+        current_attr = None
+
+        for y, x, ch, attr in zip(ys.tolist(), xs.tolist(), chars, attrs):
+            if y == cursor_y and cursor_x >= 0 and 0 < x - cursor_x <= 3:
+                # Re-sending a few unchanged cells is cheaper than a cursor move
+                for gx in range(cursor_x, x):
+                    gap_attr = int(self.attrs[y, gx])
+                    if gap_attr != current_attr:
+                        out.append(self._sgr(gap_attr))
+                        current_attr = gap_attr
+                    out.append(chr(self.chars[y, gx]))
+            elif y != cursor_y or x != cursor_x:
+                out.append(f"{CSI}{y + 1};{x + 1}H")
+            if attr != current_attr:
+                out.append(self._sgr(attr))
+                current_attr = attr
+            out.append(chr(ch))
+            cursor_y, cursor_x = y, x + 1
+            if ch > 0x10ff and self._is_wide(ch):
+                # The terminal advanced two columns; re-anchor before the next cell
+                cursor_x = -1
+
+        if out:
+            out.append(f"{CSI}0m")
+        return "".join(out).encode("utf-8")
+
+    def refresh(self):
+        """Present the frame with one write"""
+        data = self.compose()
+        view = memoryview(data)
+        while view:
+            written = os.write(self.fd_out, view)
+            view = view[written:]
+
+        self._presented = self.copy()
+        self.frames += 1
+        self.bytes_last_frame = len(data)
+        self.bytes_total += len(data)
+
+    def present(self, frame):
+        """Show a frame snapshot drawn elsewhere (e.g. by the game thread)"""
+        if (frame.h, frame.w) != (self.h, self.w):
+            self._presented = None
+        self.h, self.w = frame.h, frame.w
+        self.chars, self.attrs = frame.chars, frame.attrs
+        self.refresh()
+
+    def getch(self):
+        """Read one key (curses codes for arrows), -1 if none within the delay"""
+        if not self._input:
+            timeout = None if self._delay < 0 else self._delay / 1000.0
+            ready, _, _ = select.select([self.fd_in], [], [], timeout)
+            if not ready:
+                return -1
+            self._input += os.read(self.fd_in, 1024)
+            if not self._input:
+                return -1
+
+        for seq, key in ESCAPE_KEYS.items():
+            if self._input.startswith(seq):
+                self._input = self._input[len(seq):]
+                return key
+
+        # Plain byte or the first byte of a UTF-8 character
+        for size in range(1, 5):
+            try:
+                ch = self._input[:size].decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+            self._input = self._input[size:]
+            return ord(ch)
+
+        self._input = self._input[1:]
+        return -1
+
+def ansi_wrapper(func, *args, screen=None, **kwargs):
+    """
+    Counterpart of curses.wrapper for the ANSI backend
+
+    Puts the terminal in cbreak/no-echo mode on the alternate screen with
+    the cursor hidden, calls func(screen, ...) and always restores it.
+    """
+    screen = screen or AnsiScreen()
+    fd_in = screen.fd_in
+    saved = termios.tcgetattr(fd_in) if os.isatty(fd_in) else None
+
+    try:
+        if saved is not None:
+            tty.setcbreak(fd_in)
+        os.write(screen.fd_out, f"{CSI}?1049h{CSI}?25l{CSI}2J".encode())
+        return func(screen, *args, **kwargs)
+    finally:
+        os.write(screen.fd_out, f"{CSI}0m{CSI}?25h{CSI}?1049l".encode())
+        if saved is not None:
+            termios.tcsetattr(fd_in, termios.TCSADRAIN, saved)
@@ -1,26 +1,54 @@
 """Visual effects for background animations"""
-import random
 import math
 import curses
+from ..utils.rng import RandomStream
 
-class StarField:
-    def __init__(self, count=220, seed=42):
+class Effect:
+    """
+    Base for background effects.
+    
+    detail (0..1) is the fraction of particles drawn; draw(update=False)
+    renders the particles where they are without advancing them. Both
+    are driven by the LOD controller. Each effect draws from its own
+    RandomStream (the engine hands in the run's "effects" stream), so
+    effects never touch the game's random numbers.
+    """
+    detail = 1.0
+    
+    def set_detail(self, fraction):
+        self.detail = max(0.0, min(1.0, fraction))
+        
+    def _visible(self, particles):
+        """Leading share of particles drawn at the current detail"""
+        if self.detail >= 1.0:
+            return particles
+        return particles[:int(len(particles) * self.detail)]
+        
+    def rebuild(self, h, w):
+        pass
+
+class StarField(Effect):
+    def __init__(self, count=220, seed=42, rng=None):
         self.count = count
-        random.seed(seed)
+        self.rng = rng or RandomStream(seed)
         self.stars = []
+        self.last_t = 0.0
     
     def rebuild(self, h, w):
         self.stars = []
         chars = ['.', '·', '•', '∙']
         for _ in range(self.count):
-            y = random.randint(0, max(0, h - 1))
-            x = random.randint(0, max(0, w - 1))
-            sp = random.uniform(0.05, 0.4)
-            ch = random.choice(chars)
-            self.stars.append([y, x, sp, ch, random.random() * 2 * math.pi])
+            y = self.rng.randint(0, max(0, h - 1))
+            x = self.rng.randint(0, max(0, w - 1))
+            sp = self.rng.uniform(0.05, 0.4)
+            ch = self.rng.choice(chars)
+            self.stars.append([y, x, sp, ch, self.rng.random() * 2 * math.pi])
     
-    def draw(self, stdscr, h, w, t, attr_dim, attr_bold):
-        for y, x, spd, ch, ph in self.stars:
+    def draw(self, stdscr, h, w, t, attr_dim, attr_bold, update=True):
+        if update:
+            self.last_t = t
+        t = self.last_t
+        for y, x, spd, ch, ph in self._visible(self.stars):
             dy = math.sin(t * spd + ph) * 0.1
             dx = math.cos(t * spd + ph) * 0.2
             yy = int(max(0, min(h - 1, y + dy)))
@@ -31,99 +59,106 @@ class StarField:
             except curses.error:
                 pass
 
-class MatrixRain:
-    def __init__(self, density=0.08, seed=123):
-        random.seed(seed)
+class MatrixRain(Effect):
+    def __init__(self, density=0.08, seed=123, rng=None):
+        self.rng = rng or RandomStream(seed)
         self.density = density
         self.columns = []
     
     def rebuild(self, h, w):
         self.columns = []
         for x in range(w):
-            if random.random() < self.density:
-                L = random.randint(4, max(5, h // 2))
-                head = random.randint(-h, 0)
+            if self.rng.random() < self.density:
+                L = self.rng.randint(4, max(5, h // 2))
+                head = self.rng.randint(-h, 0)
                 self.columns.append({
                     'x': x,
                     'len': L,
                     'head': head,
-                    'spd': random.uniform(0.3, 1.2)
+                    'spd': self.rng.uniform(0.3, 1.2)
                 })
     
-    def draw(self, stdscr, h, w, t, attr_dim, attr_bold):
-        for col in self.columns:
-            col['head'] += col['spd']
+    def draw(self, stdscr, h, w, t, attr_dim, attr_bold, update=True):
+        for col in self._visible(self.columns):
+            if update:
+                col['head'] += col['spd']
             head = int(col['head'])
             for i in range(col['len']):
                 y = head - i
                 if 0 <= y < h:
-                    ch = random.choice("0123456789abcdefghijklmnopqrstuvwxyz")
+                    ch = self.rng.choice("0123456789abcdefghijklmnopqrstuvwxyz")
                     attr = attr_bold if i == 0 else attr_dim
                     try:
                         stdscr.addstr(y, col['x'], ch, attr)
                     except curses.error:
                         pass
             if head - col['len'] > h:
-                col['head'] = random.randint(-h, 0)
-                col['len'] = random.randint(4, max(5, h // 2))
-                col['spd'] = random.uniform(0.3, 1.2)
+                col['head'] = self.rng.randint(-h, 0)
+                col['len'] = self.rng.randint(4, max(5, h // 2))
+                col['spd'] = self.rng.uniform(0.3, 1.2)
 
-class Snow:
-    def __init__(self, flakes=180):
+class Snow(Effect):
+    def __init__(self, flakes=180, rng=None):
+        self.rng = rng or RandomStream()
         self.flakes = flakes
         self.s = []
     
     def rebuild(self, h, w):
-        self.s = [[random.randint(-h, 0), random.randint(0, w - 1), 
-                   random.uniform(0.1, 0.6)] for _ in range(self.flakes)]
+        self.s = [[self.rng.randint(-h, 0), self.rng.randint(0, w - 1), 
+                   self.rng.uniform(0.1, 0.6)] for _ in range(self.flakes)]
     
-    def draw(self, stdscr, h, w, t, attr_dim, attr_bold):
-        for fl in self.s:
-            fl[0] += fl[2]
+    def draw(self, stdscr, h, w, t, attr_dim, attr_bold, update=True):
+        for fl in self._visible(self.s):
+            if update:
+                fl[0] += fl[2]
             y = int(fl[0])
             x = int(fl[1] + math.sin(t * 0.8 + fl[1] * 0.1))
             if y >= h:
-                fl[0] = random.randint(-h // 2, 0)
+                fl[0] = self.rng.randint(-h // 2, 0)
             if 0 <= y < h and 0 <= x < w:
                 try:
                     stdscr.addstr(y, x, '*', attr_dim)
                 except curses.error:
                     pass
 
-class Rain:
-    def __init__(self, drops=220):
+class Rain(Effect):
+    def __init__(self, drops=220, rng=None):
+        self.rng = rng or RandomStream()
         self.drops = drops
         self.d = []
     
     def rebuild(self, h, w):
-        self.d = [[random.randint(-h, 0), random.randint(0, w - 1), 
-                   random.uniform(0.6, 1.4)] for _ in range(self.drops)]
+        self.d = [[self.rng.randint(-h, 0), self.rng.randint(0, w - 1), 
+                   self.rng.uniform(0.6, 1.4)] for _ in range(self.drops)]
     
-    def draw(self, stdscr, h, w, t, attr_dim, attr_bold):
-        for dr in self.d:
-            dr[0] += dr[2]
+    def draw(self, stdscr, h, w, t, attr_dim, attr_bold, update=True):
+        for dr in self._visible(self.d):
+            if update:
+                dr[0] += dr[2]
             y = int(dr[0])
             x = dr[1]
             if y >= h:
-                dr[0] = random.randint(-h // 3, 0)
+                dr[0] = self.rng.randint(-h // 3, 0)
             if 0 <= y < h and 0 <= x < w:
                 try:
                     stdscr.addstr(y, x, '|', attr_dim)
                 except curses.error:
                     pass
 
-class Bubbles:
-    def __init__(self, count=120):
+class Bubbles(Effect):
+    def __init__(self, count=120, rng=None):
+        self.rng = rng or RandomStream()
         self.count = count
         self.b = []
     
     def rebuild(self, h, w):
-        self.b = [[random.randint(0, h - 1), random.randint(0, w - 1), 
-                   random.uniform(0.05, 0.25)] for _ in range(self.count)]
+        self.b = [[self.rng.randint(0, h - 1), self.rng.randint(0, w - 1), 
+                   self.rng.uniform(0.05, 0.25)] for _ in range(self.count)]
     
-    def draw(self, stdscr, h, w, t, attr_dim, attr_bold):
-        for bb in self.b:
-            bb[0] -= bb[2]
+    def draw(self, stdscr, h, w, t, attr_dim, attr_bold, update=True):
+        for bb in self._visible(self.b):
+            if update:
+                bb[0] -= bb[2]
             y = int(bb[0])
             x = int(bb[1] + math.sin(t * 0.8 + bb[1] * 0.05))
             if y < 0:
@@ -134,11 +169,16 @@ class Bubbles:
                 except curses.error:
                     pass
 
-class Noise:
-    def draw(self, stdscr, h, w, t, attr_dim, attr_bold):
-        for _ in range((h * w) // 200):
-            y = random.randint(0, h - 1)
-            x = random.randint(0, w - 1)
+class Noise(Effect):
+    def __init__(self, rng=None):
+        self.rng = rng or RandomStream()
+        self.points = []
+        
+    def draw(self, stdscr, h, w, t, attr_dim, attr_bold, update=True):
+        if update:
+            self.points = [(self.rng.randint(0, h - 1), self.rng.randint(0, w - 1))
+                           for _ in range(int((h * w) // 200 * self.detail))]
+        for y, x in self.points:
             try:
                 stdscr.addstr(y, x, '.', attr_dim)
             except curses.error:
@@ -0,0 +1,100 @@
+"""Cell frame buffer shared by the non-curses output paths"""
+import curses
+import numpy as np
+
+class FrameBuffer:
+    """
+    Screen-sized grid of characters and curses-style attributes.
+
+    Offers the subset of the curses window API the game draws with
+    (addstr, erase, clear, bkgd, getmaxyx) so entities can render into
+    it unchanged. Writes outside the grid are clipped silently.
+    """
+
+    def __init__(self, h, w):
+        self.bg_char = ord(' ')
+        self.bg_attr = 0
+        self.resize(h, w)
+
+    def resize(self, h, w):
+        """Reallocate the grid for a new screen size"""
+        self.h, self.w = max(1, h), max(1, w)
+        self.chars = np.full((self.h, self.w), self.bg_char, dtype=np.uint32)
+        self.attrs = np.full((self.h, self.w), self.bg_attr, dtype=np.int64)
+
+    def getmaxyx(self):
+        return self.h, self.w
+
+    def bkgd(self, ch, attr=0):
+        """Set the background character and attribute used by erase()"""
+        self.bg_char = ord(ch) if isinstance(ch, str) else ch
+        self.bg_attr = attr
+        self.erase()
+
+    def erase(self):
+        """Fill the grid with the background"""
+        self.chars.fill(self.bg_char)
+        self.attrs.fill(self.bg_attr)
+
+    def clear(self):
+        self.erase()
+
+    def addstr(self, y, x, text, attr=0):
+        """Write a string at (y, x), clipped to the grid"""
+        y, x = int(y), int(x)
+        if not 0 <= y < self.h or x >= self.w or not text:
+            return
+
+        cells = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        if x < 0:
+            cells = cells[-x:]
+            x = 0
+        cells = cells[:self.w - x]
+
+        self.chars[y, x:x + len(cells)] = cells
+        self.attrs[y, x:x + len(cells)] = self.merge_attr(attr)
+
+    def blit(self, sprite, y, x):
+        """Copy a pre-rasterized sprite block at (y, x), clipped to the grid"""
+        y, x = int(y), int(x)
+        y0, x0 = max(0, y), max(0, x)
+        y1, x1 = min(self.h, y + sprite.h), min(self.w, x + sprite.w)
+        if y0 >= y1 or x0 >= x1:
+            return
+
+        self.chars[y0:y1, x0:x1] = sprite.chars[y0 - y:y1 - y, x0 - x:x1 - x]
+        self.attrs[y0:y1, x0:x1] = self.merge_attr(sprite.attr)
+
+    def stamp(self, sprite, ys, xs):
+        """Copy a one-cell sprite to many (y, x) cells in one scatter, clipped to the grid"""
+        ys, xs = np.asarray(ys, dtype=np.int64), np.asarray(xs, dtype=np.int64)
+        inside = (ys >= 0) & (ys < self.h) & (xs >= 0) & (xs < self.w)
+        ys, xs = ys[inside], xs[inside]
+        self.chars[ys, xs] = sprite.chars[0, 0]
+        self.attrs[ys, xs] = self.merge_attr(sprite.attr)
+
+    def merge_attr(self, attr):
+        """Combine with the background like curses: its color only fills in a missing pair"""
+        if attr & curses.A_COLOR:
+            return attr | (self.bg_attr & ~curses.A_COLOR)
+        return attr | self.bg_attr
+
+    def copy(self):
+        """Independent snapshot of the current contents"""
+        snapshot = FrameBuffer.__new__(FrameBuffer)
+        snapshot.bg_char, snapshot.bg_attr = self.bg_char, self.bg_attr
+        snapshot.h, snapshot.w = self.h, self.w
+        snapshot.chars = self.chars.copy()
+        snapshot.attrs = self.attrs.copy()
+        return snapshot
+
+    def changed_cells(self, previous):
+        """
+        Cells that differ from another buffer of the same size
+
+        Returns:
+            tuple: (ys, xs) arrays in row-major order
+        """
+        if previous is None or (previous.h, previous.w) != (self.h, self.w):
+            return np.nonzero(np.ones((self.h, self.w), dtype=bool))
+        return np.nonzero((self.chars != previous.chars) | (self.attrs != previous.attrs))
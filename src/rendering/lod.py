@@ -0,0 +1,77 @@
+"""Level-of-detail control driven by measured frame time"""
+
+# Ordered from full detail to the cheapest setting
+LOD_LEVELS = [
+    {"particles": 1.0, "effect_every": 1, "hud_every": 1},
+    {"particles": 0.6, "effect_every": 1, "hud_every": 2},
+    {"particles": 0.35, "effect_every": 2, "hud_every": 4},
+    {"particles": 0.15, "effect_every": 3, "hud_every": 8},
+    {"particles": 0.0, "effect_every": 4, "hud_every": 15}
+]
+
+class LODController:
+    """
+    Watches how long each frame's work takes and trades background and
+    HUD detail for frame time.
+
+    The smoothed frame time must stay above high_water * budget for
+    degrade_after frames before detail drops, and below low_water *
+    budget for recover_after frames before it comes back, so the level
+    doesn't oscillate around the threshold.
+    """
+
+    def __init__(self, target_fps=30, levels=None, high_water=0.85, low_water=0.5,
+                 degrade_after=8, recover_after=90, smoothing=0.1):
+        self.budget = 1.0 / target_fps
+        self.levels = levels or LOD_LEVELS
+        self.high_water = high_water
+        self.low_water = low_water
+        self.degrade_after = degrade_after
+        self.recover_after = recover_after
+        self.smoothing = smoothing
+
+        self.level = 0
+        self.avg_frame_time = 0.0
+        self.level_changes = 0
+        self._over = 0
+        self._under = 0
+
+    @property
+    def settings(self):
+        """Detail settings of the current level"""
+        return self.levels[self.level]
+
+    def record(self, frame_time):
+        """
+        Feed the work time of the last frame (excluding sleep)
+
+        Returns:
+            bool: True if the level changed
+        """
+        if self.avg_frame_time == 0.0:
+            self.avg_frame_time = frame_time
+        else:
+            self.avg_frame_time += self.smoothing * (frame_time - self.avg_frame_time)
+
+        load = self.avg_frame_time / self.budget
+        self._over = self._over + 1 if load > self.high_water else 0
+        self._under = self._under + 1 if load < self.low_water else 0
+
+        if self._over >= self.degrade_after and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif self._under >= self.recover_after and self.level > 0:
+            self.level -= 1
+        else:
+            return False
+
+        self._over = self._under = 0
+        self.level_changes += 1
+        return True
+
+    def update_effects(self, frame):
+        """Whether background effects advance on this frame"""
+        return frame % self.settings["effect_every"] == 0
+
+    def refresh_hud(self, frame):
+        """Whether HUD text is rebuilt on this frame"""
+        return frame % self.settings["hud_every"] == 0
@@ -0,0 +1,218 @@
+"""Frame presentation on or off the simulation thread"""
+import curses
+import queue
+import threading
+import time
+import numpy as np
+from .framebuffer import FrameBuffer
+
+class FrameMailbox:
+    """
+    Single-slot hand-off of frame snapshots between threads.
+
+    Publishing replaces any frame the consumer hasn't taken yet, so the
+    consumer always gets the newest one and the producer never waits.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self.closed = False
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, frame):
+        with self._cond:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self.published += 1
+            self._cond.notify()
+
+    def take(self, timeout=None):
+        """Newest unconsumed frame, or None if none arrives within timeout"""
+        with self._cond:
+            if self._frame is None and not self.closed:
+                self._cond.wait(timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+def present_curses(stdscr, frame, previous=None):
+    """
+    Copy a frame buffer onto a curses window
+
+    Only rows that differ from the previously presented frame are
+    written, one addstr per run of equal attributes.
+    """
+    if previous is None or (previous.h, previous.w) != (frame.h, frame.w):
+        rows = range(frame.h)
+    else:
+        changed = (frame.chars != previous.chars) | (frame.attrs != previous.attrs)
+        rows = np.flatnonzero(changed.any(axis=1)).tolist()
+
+    for y in rows:
+        text = frame.chars[y].tobytes().decode("utf-32-le")
+        row_attrs = frame.attrs[y]
+        starts = [0] + (np.flatnonzero(np.diff(row_attrs)) + 1).tolist()
+        ends = starts[1:] + [frame.w]
+        for start, end in zip(starts, ends):
+            try:
+                stdscr.addstr(y, start, text[start:end], int(row_attrs[start]))
+            except curses.error:
+                # Writing the bottom-right cell moves the cursor off screen
+                pass
+    stdscr.refresh()
+
+class DirectOutput:
+    """Draw straight to the screen from the game thread (the classic path)"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.target = screen
+
+    def getmaxyx(self):
+        return self.screen.getmaxyx()
+
+    def present(self):
+        self.screen.refresh()
+
+    def getch(self):
+        try:
+            return self.screen.getch()
+        except curses.error:
+            return -1
+
+    def wait_key(self):
+        """Block until a key is pressed"""
+        self.screen.timeout(-1)
+        return self.getch()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class RenderWorker:
+    """
+    Presents frames on a separate thread so a slow terminal can't hold
+    up the game loop.
+
+    The game draws into target, an off-screen frame buffer, and
+    present() publishes an immutable copy of it. The worker thread
+    writes the newest published frame to the terminal (through curses
+    or an AnsiScreen); frames published while it was busy are dropped.
+    With curses the worker also owns getch(), since curses must only be
+    used from one thread, and forwards keys through a queue.
+    """
+
+    def __init__(self, screen, poll_interval=0.005):
+        self.screen = screen
+        self.poll_interval = poll_interval
+        self.mailbox = FrameMailbox()
+        self.keys = queue.SimpleQueue()
+
+        h, w = self._screen_size()
+        self.target = FrameBuffer(h, w)
+
+        # Raw ANSI output reads stdin directly, curses input goes through the worker
+        self.ansi = isinstance(screen, FrameBuffer)
+        self.presented = 0
+        self.present_time = 0.0
+        self._previous = None
+        self._running = False
+        self._thread = None
+        self._error = None
+
+    def _screen_size(self):
+        if isinstance(self.screen, FrameBuffer):
+            return self.screen.terminal_size()
+        return self.screen.getmaxyx()
+
+    def getmaxyx(self):
+        """Current screen size; the off-screen target follows resizes"""
+        h, w = self._screen_size()
+        if (h, w) != self.target.getmaxyx():
+            self.target.resize(h, w)
+        return self.target.getmaxyx()
+
+    @property
+    def dropped(self):
+        return self.mailbox.dropped
+
+    @property
+    def avg_present_time(self):
+        return self.present_time / self.presented if self.presented else 0.0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="render-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Present the last published frame and stop the worker"""
+        self._running = False
+        self.mailbox.close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._error:
+            raise self._error
+
+    def present(self):
+        if self._error:
+            raise self._error
+        self.mailbox.publish(self.target.copy())
+
+    def getch(self):
+        if self.ansi:
+            return self.screen.getch()
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return -1
+
+    def wait_key(self):
+        """Block until a key is pressed"""
+        if self.ansi:
+            self.screen.timeout(-1)
+            return self.screen.getch()
+        return self.keys.get()
+
+    def _run(self):
+        try:
+            while True:
+                frame = self.mailbox.take(self.poll_interval)
+                if frame is not None:
+                    self._present(frame)
+                elif not self._running:
+                    break
+                if not self.ansi:
+                    self._poll_keys()
+        except Exception as e:
+            self._error = e
+
+    def _present(self, frame):
+        start = time.perf_counter()
+        if self.ansi:
+            self.screen.present(frame)
+        else:
+            present_curses(self.screen, frame, self._previous)
+        self._previous = frame
+        self.presented += 1
+        self.present_time += time.perf_counter() - start
+
+    def _poll_keys(self):
+        while True:
+            try:
+                ch = self.screen.getch()
+            except curses.error:
+                return
+            if ch == -1:
+                return
+            self.keys.put(ch)
@@ -10,29 +10,54 @@ THEMES = {
     "dark": (curses.COLOR_WHITE, curses.COLOR_BLUE, curses.COLOR_WHITE, curses.COLOR_BLACK),
 }
 
-def init_colors(theme_name="neo"):
-    """Initialize color pairs for the given theme"""
+# Pair number -> (fg, bg) of the active theme, read by non-curses backends
+PAIR_COLORS = {}
+
+def curses_active():
+    """True once curses.initscr() has run"""
     try:
-        curses.start_color()
-        curses.use_default_colors()
+        curses.has_colors()
+        return True
     except curses.error:
-        pass
-    
+        return False
+
+def color_pair(n):
+    """curses.color_pair() that also works without initscr (ANSI backend)"""
+    try:
+        return curses.color_pair(n)
+    except curses.error:
+        return n << 8
+
+def init_colors(theme_name="neo"):
+    """Initialize color pairs for the given theme"""
     bg_color = curses.COLOR_BLACK
     fg_primary, fg_dim, acc1, acc2 = THEMES.get(theme_name, list(THEMES.values())[0])
     
-    curses.init_pair(1, fg_primary, bg_color)
-    curses.init_pair(2, fg_dim, bg_color)
-    curses.init_pair(3, acc1, bg_color)
-    curses.init_pair(4, acc2, bg_color)
-    curses.init_pair(5, fg_primary, bg_color)
-    curses.init_pair(6, -1, bg_color)
-    curses.init_pair(7, curses.COLOR_BLACK, bg_color)
+    PAIR_COLORS.clear()
+    PAIR_COLORS.update({
+        1: (fg_primary, bg_color),
+        2: (fg_dim, bg_color),
+        3: (acc1, bg_color),
+        4: (acc2, bg_color),
+        5: (fg_primary, bg_color),
+        6: (-1, bg_color),
+        7: (curses.COLOR_BLACK, bg_color)
+    })
+    
+    if curses_active():
+        try:
+            curses.start_color()
+            curses.use_default_colors()
+        except curses.error:
+            pass
+        
+        for pair, (fg, bg) in PAIR_COLORS.items():
+            curses.init_pair(pair, fg, bg)
     
     return (
-        curses.color_pair(1) | curses.A_BOLD,    # attr_primary
-        curses.color_pair(2) | curses.A_DIM,     # attr_dim
-        curses.color_pair(3) | curses.A_BOLD,    # attr_acc
-        curses.color_pair(4),                     # attr_alt
-        curses.color_pair(6)                      # attr_bg
+        color_pair(1) | curses.A_BOLD,    # attr_primary
+        color_pair(2) | curses.A_DIM,     # attr_dim
+        color_pair(3) | curses.A_BOLD,    # attr_acc
+        color_pair(4),                     # attr_alt
+        color_pair(6)                      # attr_bg
     )
@@ -0,0 +1,91 @@
+"""Game configuration loading"""
+import copy
+from pathlib import Path
+
+import yaml
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "config" / "game_config.yaml"
+
+DEFAULTS = {
+    "game": {"theme": "neo", "fps": 30, "max_enemies": 15, "seed": None},
+    "player": {"lives": 5, "speed": 2, "bullet_speed": 1, "bot": None},
+    "boss": {"enabled": True, "use_ai": True, "initial_health": 50, "difficulty": "adaptive",
+             "patterns": {}},
+    "ai": {
+        "learning_rate": 0.1,
+        "discount_factor": 0.95,
+        "exploration_rate": 0.2,
+        "epsilon_decay": 0.995,
+        "analysis_sessions": 10,
+        "min_sessions_for_training": 3,
+        "save_model_every": 5,
+        "auto_save": True,
+        "checkpoint_dir": "models/checkpoints",
+        "checkpoint_keep": 3,
+        "agent": "tabular",
+        "planner": False,
+        "planner_budget_ms": 4.0,
+        "planner_horizon": 40,
+        "planner_rollouts": 8,
+        "planner_seeded_steps": 10,
+        "replay": True,
+        "replay_capacity": 50000,
+        "replay_batch": 64,
+        "replay_alpha": 0.6,
+        "replay_beta": 0.4,
+        "replay_end_batches": 500,
+        "replay_seeded_batches": 8,
+        "learner": False,
+        "learner_publish_interval": 0.5,
+        "learner_replay_ratio": 8
+    },
+    "data": {
+        "track_player_behavior": True,
+        "save_sessions": True,
+        "data_retention_days": 30,
+        "position_max_interval": 1.0,
+        "trajectory_tolerance": 1.0,
+        "player": None,
+        "players_dir": "data/players",
+        "player_cache": 8
+    },
+    "rendering": {
+        "background": "stars",
+        "show_fps": False,
+        "particle_effects": True,
+        "render_thread": False
+    },
+    "network": {
+        "spectate": False,
+        "spectate_address": "127.0.0.1:7777",
+        "spectator_queue": 4
+    }
+}
+
+def _merge(base, override):
+    """Recursively merge override into base"""
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+def load_config(path=None):
+    """
+    Load game configuration, falling back to defaults for missing keys
+
+    Args:
+        path: YAML file to read (defaults to config/game_config.yaml)
+
+    Returns:
+        dict: Configuration sections (game, player, boss, ai, data, rendering, network)
+    """
+    config = copy.deepcopy(DEFAULTS)
+    path = Path(path) if path else CONFIG_PATH
+
+    if path.exists():
+        with open(path, 'r') as f:
+            _merge(config, yaml.safe_load(f) or {})
+
+    return config
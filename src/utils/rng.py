@@ -0,0 +1,93 @@
+"""Seedable, independent random streams for every subsystem"""
+import zlib
+import numpy as np
+
+class RandomStream:
+    """
+    One subsystem's random numbers.
+
+    Backed by its own NumPy Generator, so nothing else can reseed or
+    advance it. Scalar draws (random, randint, uniform, choice) are
+    served from a prefilled buffer of uniforms, which makes them about as
+    cheap as the `random` module's; array draws (random(n), integers)
+    go to the Generator directly.
+    """
+
+    def __init__(self, seed=None, buffer=1024):
+        self.generator = np.random.default_rng(seed)
+        self.buffer_size = buffer
+        self._buffer = []
+        self._pos = 0
+
+    def _refill(self):
+        self._buffer = self.generator.random(self.buffer_size).tolist()
+        self._pos = 0
+
+    def random(self, size=None):
+        """Uniform float in [0, 1), or an array of `size` of them"""
+        if size is not None:
+            return self.generator.random(size)
+        if self._pos == len(self._buffer):
+            self._refill()
+        value = self._buffer[self._pos]
+        self._pos += 1
+        return value
+
+    def randint(self, low, high):
+        """Integer in [low, high], both included (like random.randint)"""
+        return low + int(self.random() * (high - low + 1))
+
+    def uniform(self, low, high):
+        return low + (high - low) * self.random()
+
+    def choice(self, sequence):
+        return sequence[int(self.random() * len(sequence))]
+
+    def integers(self, low, high=None, size=None):
+        """Generator.integers (array draws)"""
+        return self.generator.integers(low, high, size=size)
+
+    @property
+    def state(self):
+        """Everything needed to replay the stream from here"""
+        return (self.generator.bit_generator.state, list(self._buffer), self._pos)
+
+    @state.setter
+    def state(self, state):
+        generator_state, buffer, pos = state
+        self.generator.bit_generator.state = generator_state
+        self._buffer = list(buffer)
+        self._pos = pos
+
+class RNGService:
+    """
+    Hands out one named RandomStream per subsystem ("game", "boss", "ai",
+    "effects", ...).
+
+    Every stream is derived from the run's seed and its own name, so
+    streams are statistically independent, a subsystem drawing more or
+    fewer numbers never shifts another one, and adding a stream leaves the
+    existing ones unchanged. Without a seed the run gets fresh entropy;
+    `seed` then reports what to pass to reproduce it.
+    """
+
+    def __init__(self, seed=None, buffer=1024):
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.buffer = buffer
+        self._streams = {}
+
+    def stream(self, name):
+        """The stream of a subsystem (created on first use)"""
+        if name not in self._streams:
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode()),))
+            self._streams[name] = RandomStream(sequence, self.buffer)
+        return self._streams[name]
+
+    def state(self):
+        """States of every stream created so far, by name"""
+        return {name: stream.state for name, stream in self._streams.items()}
+
+    def set_state(self, state):
+        """Return the named streams to a state()"""
+        for name, stream_state in state.items():
+            self.stream(name).state = stream_state
@@ -0,0 +1,76 @@
+"""ANSI frame composition"""
+import os
+import re
+from src.rendering.ansi import AnsiScreen
+
+TOKEN = re.compile(r"\x1b\[([0-9;]*)([A-Za-z])|(.)", re.S)
+
+def replay(data, screen):
+    """Draw composed output onto a blank grid the way a terminal would"""
+    grid = [[" "] * screen.w for _ in range(screen.h)]
+    y = x = 0
+    for params, final, ch in TOKEN.findall(data.decode("utf-8")):
+        if final == "H":
+            row, col = params.split(";")
+            y, x = int(row) - 1, int(col) - 1
+        elif ch:
+            if x < screen.w:
+                grid[y][x] = ch
+            x += 2 if screen._is_wide(ord(ch)) else 1
+    return ["".join(row) for row in grid]
+
+def expected(screen):
+    return ["".join(map(chr, row)) for row in screen.chars.tolist()]
+
+def make_screen():
+    # Not a terminal, so the size falls back to 24x80
+    return AnsiScreen(fd_out=-1, fd_in=-1)
+
+def test_first_frame_repaints_everything():
+    screen = make_screen()
+    screen.addstr(3, 10, "hello")
+    data = screen.compose()
+    assert data.startswith(b"\x1b[0m\x1b[2J")
+    assert replay(data, screen) == expected(screen)
+
+def test_wide_glyph_is_followed_by_a_cursor_move():
+    screen = make_screen()
+    screen.addstr(0, 0, "世")
+    screen.addstr(0, 2, "A")
+    screen.addstr(0, 79, "Z")
+    data = screen.compose()
+    row = replay(data, screen)[0]
+    assert row[0] == "世" and row[2] == "A" and row[79] == "Z"
+    assert row.count("Z") == 1
+
+def test_short_gaps_are_filled_instead_of_jumped():
+    screen = make_screen()
+    screen._presented = screen.copy()
+    screen.addstr(5, 10, "a")
+    screen.addstr(5, 13, "b")
+    data = screen.compose()
+    assert data.count(b"H") == 1
+    assert replay(data, screen)[5] == expected(screen)[5]
+
+def test_unchanged_frame_composes_nothing():
+    screen = make_screen()
+    screen.addstr(2, 2, "x")
+    screen._presented = screen.copy()
+    assert screen.compose() == b""
+
+def test_refresh_counts_bytes_and_presents():
+    read_fd, write_fd = os.pipe()
+    try:
+        screen = AnsiScreen(fd_out=write_fd, fd_in=read_fd)
+        screen.addstr(1, 1, "ok")
+        screen.refresh()
+        first = screen.bytes_last_frame
+        assert replay(os.read(read_fd, first), screen) == expected(screen)
+        screen.addstr(1, 1, "no")
+        screen.refresh()
+        assert screen.frames == 2
+        assert screen.bytes_total == first + screen.bytes_last_frame
+        assert screen.bytes_last_frame < first
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
@@ -0,0 +1,30 @@
+"""BehaviorTracker trajectory simplification"""
+import numpy as np
+from src.ai.behavior_tracker import simplify_trajectory
+
+def path(xs, dt=0.1):
+    return [{"t": i * dt, "x": x, "y": 35} for i, x in enumerate(xs)]
+
+def interpolated_error(points, kept):
+    t = [p["t"] for p in kept]
+    x = np.interp([p["t"] for p in points], t, [p["x"] for p in kept])
+    return np.abs(x - [p["x"] for p in points]).max()
+
+def test_straight_runs_keep_their_endpoints():
+    points = path(list(range(10, 40)) + list(range(40, 20, -1)))
+    kept = simplify_trajectory(points, tolerance=0.5)
+    assert [p["x"] for p in kept] == [10, 40, 21]
+    assert kept[0] is points[0] and kept[-1] is points[-1]
+
+def test_random_walk_stays_within_tolerance():
+    steps = np.random.default_rng(3).choice([-1, 0, 0, 1], size=500)
+    points = path((40 + np.cumsum(steps)).tolist())
+    for tolerance in (0.5, 1.0, 3.0):
+        kept = simplify_trajectory(points, tolerance)
+        assert len(kept) < len(points)
+        assert interpolated_error(points, kept) <= tolerance
+
+def test_short_paths_are_unchanged():
+    assert simplify_trajectory([], 1.0) == []
+    points = path([5, 9])
+    assert simplify_trajectory(points, 1.0) == points
@@ -0,0 +1,43 @@
+"""Checkpoint writes and crash recovery"""
+import pytest
+from src.ai.behavior_tracker import BehaviorTracker
+from src.ai.checkpoint import Checkpointer
+from src.ai.session_store import SessionStore
+
+def tracked_session(tmp_path, store):
+    tracker = BehaviorTracker(tmp_path / "sessions", store=store)
+    tracker.track_action("move_left", {"x": 10})
+    return tracker
+
+def test_keep_must_retain_a_checkpoint(tmp_path):
+    with pytest.raises(ValueError):
+        Checkpointer(tmp_path, keep=0)
+
+def test_old_checkpoints_are_pruned(tmp_path):
+    checkpointer = Checkpointer(tmp_path, keep=2)
+    for _ in range(4):
+        checkpointer.write(checkpointer.capture())
+    assert [path.name for path in checkpointer.checkpoints()] == [
+        "checkpoint_000003.json", "checkpoint_000004.json"]
+
+def test_unsaved_session_is_recovered_once(tmp_path):
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    checkpointer = Checkpointer(tmp_path / "checkpoints")
+    checkpointer.write(checkpointer.capture(tracker=tracked_session(tmp_path, store)))
+
+    assert checkpointer.recover(store) is not None
+    assert checkpointer.recover(store) is None
+    assert store.count() == 1
+    store.close()
+
+def test_session_saved_before_the_crash_is_not_stored_again(tmp_path):
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    checkpointer = Checkpointer(tmp_path / "checkpoints")
+    tracker = tracked_session(tmp_path, store)
+    checkpointer.write(checkpointer.capture(tracker=tracker))
+    tracker.save_session()
+
+    assert checkpointer.recover(store) is None
+    assert store.count() == 1
+    assert checkpointer.latest()[1]["complete"]
+    store.close()
@@ -0,0 +1,109 @@
+"""Columnar shard export and shard profiles"""
+import random
+import pytest
+from src.ai.session_store import SessionStore
+from src.ai.columnar import ShardWriter, ShardReader
+from src.ai.pattern_analyzer import PatternAnalyzer, PROFILE_ACTION_TYPES
+from src.ai.retention import SessionCompactor
+
+def random_session(rng, session_id, start):
+    actions, t = [], 0.0
+    for _ in range(rng.randint(5, 60)):
+        actions.append({"timestamp": t, "type": rng.choice(PROFILE_ACTION_TYPES), "data": {}})
+        t += rng.choice([0.0, 0.05, 0.3, 1.7])
+    positions = [{"t": 0.5 * i, "x": rng.randint(1, 78), "y": 35} for i in range(rng.randint(1, 20))]
+    return {
+        "session_id": session_id,
+        "start_time": start,
+        "duration": t,
+        "actions": actions,
+        "stats": {"total_shots": 0, "position_history": positions}
+    }
+
+def test_late_saved_session_is_exported_before_compaction(tmp_path):
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    rng = random.Random(1)
+    store.save_session(random_session(rng, "a", 1000.0))
+    store.save_session(random_session(rng, "b", 3000.0))
+    writer = ShardWriter(tmp_path / "shards")
+    assert writer.export_from_store(store) == 2
+
+    # A long game that started before the last export is saved afterwards
+    store.save_session(random_session(rng, "c", 2000.0))
+    assert writer.export_from_store(store) == 1
+    assert writer.export_from_store(store) == 0
+    store.close()
+
+    report = SessionCompactor(tmp_path / "db", retention_days=0, shard_dir=tmp_path / "shards").run(now=5000.0)
+    assert report["sessions"] == 3
+    assert sum(entry["sessions"] for entry in ShardReader(tmp_path / "shards").shards()) == 3
+
+def test_compaction_fetches_one_batch_at_a_time(tmp_path, monkeypatch):
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    rng = random.Random(3)
+    for i in range(7):
+        store.save_session(random_session(rng, f"s{i}", 1000.0 + i))
+    store.save_session(random_session(rng, "recent", 6000.0))
+    store.close()
+
+    fetched = []
+    sessions = SessionStore.sessions
+    def recording(self, *args, **kwargs):
+        rows = sessions(self, *args, **kwargs)
+        fetched.append(len(rows))
+        return rows
+    monkeypatch.setattr(SessionStore, "sessions", recording)
+
+    compactor = SessionCompactor(tmp_path / "db", retention_days=0, batch_size=3,
+                                 shard_dir=tmp_path / "shards")
+    report = compactor.run(now=5000.0)
+    monkeypatch.undo()
+
+    assert report["sessions"] == 7 and report["archived"] == 8
+    assert fetched[-4:] == [3, 3, 1, 0]
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    assert [meta["session_id"] for meta in store.sessions()] == ["recent"]
+    store.close()
+
+def test_version_1_manifest_keeps_exporting_newer_sessions(tmp_path):
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    rng = random.Random(2)
+    store.save_session(random_session(rng, "a", 1000.0))
+    writer = ShardWriter(tmp_path / "shards")
+    writer.write_shard(store.load_sessions())
+    writer.manifest.pop("exported_rowid")
+    writer.manifest["exported_until"] = 1000.0
+
+    # Saved after the version 1 export: "c" is older than its watermark
+    # (lost under version 1), "b" newer but with a lower row id than "c"
+    store.save_session(random_session(rng, "b", 3000.0))
+    store.save_session(random_session(rng, "c", 500.0))
+    store.save_session(random_session(rng, "d", 4000.0))
+
+    assert writer.export_from_store(store) == 2
+    assert writer.manifest["exported_rowid"] == 4
+    assert sum(entry["sessions"] for entry in writer.manifest["shards"]) == 3
+    store.close()
+
+@pytest.mark.parametrize("start, end", [(None, None), (1500.0, 6500.0), (4000.0, None), (None, 2200.0)])
+def test_shard_summary_matches_session_summary(tmp_path, start, end):
+    store = SessionStore(tmp_path / "db", auto_import=False)
+    rng = random.Random(3)
+    for i in range(25):
+        store.save_session(random_session(rng, f"s{i}", 1000.0 + 300.0 * i))
+    ShardWriter(tmp_path / "shards").export_from_store(store, sessions_per_shard=7)
+
+    analyzer = PatternAnalyzer(tmp_path / "db", store=store)
+    rows = analyzer.summarize_sessions(store.load_sessions(start=start, end=end, types=PROFILE_ACTION_TYPES))
+    shards = analyzer.summarize_shards(tmp_path / "shards", start, end)
+
+    assert shards["sessions"] == rows["sessions"]
+    for key in ("move_left", "move_right", "shots", "hits"):
+        assert shards[key] == rows[key]
+    for key in ("duration", "move_intervals", "shot_intervals", "positions"):
+        assert shards[key] == pytest.approx(rows[key])
+    shard_profile = analyzer.profile_from_summary(shards)
+    row_profile = analyzer.profile_from_summary(rows)
+    for section in ("shooting", "positioning"):
+        assert shard_profile[section] == pytest.approx(row_profile[section])
+    store.close()
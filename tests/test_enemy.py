@@ -0,0 +1,79 @@
+"""EnemyFleet movement, shooting and collisions"""
+import numpy as np
+from src.game.enemy import EnemyFleet, SHOOT_CHANCE, SPEED, WIDTH, ENEMY_TYPES
+from src.utils.rng import RandomStream
+
+def test_moving_enemies_bounce_between_column_2_and_the_screen_edge():
+    fleet = EnemyFleet(RandomStream(1))
+    for enemy_type in ["fighter", "bomber", "interceptor"]:
+        fleet.spawn(60, 5, enemy_type)
+    fleet.direction[:] = 1
+    speed, width = SPEED[fleet.types], WIDTH[fleet.types]
+
+    seen_left = np.zeros(len(fleet), dtype=bool)
+    for _ in range(2000):
+        fleet.step(70)
+        assert np.all(fleet.x < 70 - width + speed)
+        assert np.all(fleet.x > 2 - speed)
+        seen_left |= fleet.direction < 0
+    assert seen_left.all()
+
+def test_turrets_never_move():
+    fleet = EnemyFleet(RandomStream(2))
+    fleet.spawn(10, 30, "ground_turret")
+    for _ in range(50):
+        fleet.step(80)
+    assert fleet.x.tolist() == [10.0] and fleet.direction.tolist() == [0.0]
+
+def test_shots_are_one_seeded_draw_per_frame():
+    fleet = EnemyFleet(RandomStream(7))
+    replica = RandomStream(7)
+    for i, enemy_type in enumerate(ENEMY_TYPES * 3):
+        fleet.spawn(5 + 6 * i, 4, enemy_type)
+        if enemy_type != "ground_turret":
+            replica.random()
+
+    shots = 0
+    for _ in range(300):
+        shooters = fleet.step(200)
+        expected = np.flatnonzero(replica.random(len(fleet)) < SHOOT_CHANCE[fleet.types])
+        assert shooters.tolist() == expected.tolist()
+        shots += len(shooters)
+    assert shots > 0
+
+def test_same_seed_same_fleet():
+    def run(seed):
+        fleet = EnemyFleet(RandomStream(seed))
+        for i in range(20):
+            fleet.spawn(4 * i, 3, "fighter")
+        return [fleet.step(80).tolist() for _ in range(100)], fleet.rows()
+    (shots_a, rows_a), (shots_b, rows_b) = run(3), run(3)
+    assert shots_a == shots_b and np.array_equal(rows_a, rows_b)
+    assert run(4)[0] != shots_a
+
+def test_remove_keeps_order_and_rows_round_trip():
+    fleet = EnemyFleet(RandomStream(5))
+    for i in range(20):
+        fleet.spawn(i, i, ENEMY_TYPES[i % len(ENEMY_TYPES)])
+    fleet.remove([0, 5, 19])
+    assert len(fleet) == 17
+    assert fleet.x.tolist() == [float(i) for i in range(20) if i not in (0, 5, 19)]
+
+    copy = EnemyFleet.from_rows(fleet.rows(), fleet.types)
+    assert copy.type_names() == fleet.type_names()
+    copy.x[:] = 0
+    assert fleet.x[0] == 1.0
+
+def test_bullet_hits_and_damage():
+    fleet = EnemyFleet(RandomStream(6))
+    fleet.spawn(10, 5, "fighter")       # 3x3
+    fleet.spawn(20, 5, "interceptor")   # 1x3
+    hits = fleet.bullet_hits(np.array([12, 13, 20, 21]), np.array([7, 7, 5, 5]))
+    assert hits.tolist() == [[True, False], [False, False], [False, True], [False, False]]
+
+    assert not fleet.damage(1)
+    assert fleet.sprite_variants().tolist() == ["normal", "damaged"]
+    assert fleet.damage(1)
+    fleet.step(80)
+    assert not fleet.damaged.any()
+    assert fleet.health.tolist() == [3.0, 0.0]
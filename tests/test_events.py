@@ -0,0 +1,68 @@
+"""Frame event batches and their subscribers"""
+import pytest
+from src.ai.rl_agent import REWARDS
+from src.game.boss import Boss
+from src.game.events import EventBuffer, EventCounter, EVENT_NAMES
+
+def frame_events():
+    events = EventBuffer(capacity=2)
+    events.emit("shoot", 40, 30)
+    events.emit("hit", "boss")
+    events.emit("hit", "bomber")
+    events.emit("hit", "boss")
+    events.emit("missed", 0.25)
+    events.emit("missed", 0.5)
+    events.emit("death", "bullet")
+    return events
+
+def test_totals_and_labels():
+    events = frame_events()
+    assert len(events) == 7
+    assert "hit" in events and "victory" not in events
+    assert events.total("hit") == 3
+    assert events.total("hit", target="boss") == 2
+    assert events.total("missed") == 0.75
+    assert dict(zip(EVENT_NAMES, events.totals().tolist()))["hit"] == 3
+
+def test_records_decode_labels_and_numbers():
+    events = frame_events()
+    assert events.records(["shoot", "hit"])[:2] == [("shoot", {"x": 40, "y": 30}),
+                                                  ("hit", {"target": "boss"})]
+    assert events.records(["missed"])[0] == ("missed", {"weight": 0.25})
+
+def test_unknown_event_is_rejected():
+    with pytest.raises(KeyError):
+        EventBuffer().emit("teleport")
+
+def test_flush_dispatches_once_per_frame():
+    events = EventBuffer()
+    counter = EventCounter()
+    batches = []
+    events.subscribe(counter)
+    events.subscribe(lambda batch: batches.append(len(batch)))
+
+    events.flush()
+    for _ in range(2):
+        events.emit("move_left", 3)
+        events.emit("shoot", 3, 30)
+        events.flush()
+        events.clear()
+    assert batches == [2, 2]
+    assert counter["shoot"] == 2 and counter["victory"] == 0
+
+def test_boss_reward_sums_the_frame(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    boss = Boss(40, 2)
+    updates = []
+    boss.rl_agent.update = lambda reward, state: updates.append(reward)
+
+    boss.on_events(frame_events())
+    expected = (2 * REWARDS["got_hit"] + REWARDS["hit_player"] + 0.75 * REWARDS["missed"])
+    assert updates == [pytest.approx(expected)]
+    assert boss._pending_reward == pytest.approx(expected)
+
+    quiet = EventBuffer()
+    quiet.emit("move_right", 5)
+    quiet.emit("hit", "fighter")
+    boss.on_events(quiet)
+    assert len(updates) == 1
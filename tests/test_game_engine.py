@@ -0,0 +1,52 @@
+"""GameEngine runs without a terminal"""
+import pytest
+from src.ai.checkpoint import Checkpointer
+from src.game.game_engine import GameEngine
+from src.game.simulation import GameSimulation
+from src.utils.config import load_config
+
+def seeded_run(spare, planner=False, frames=150):
+    config = load_config()
+    config["game"]["seed"] = 42
+    config["player"]["bot"] = "dodger"
+    config["ai"]["planner"] = planner
+    config["ai"]["auto_save"] = False
+    engine = GameEngine(mode="boss", config=config)
+    engine.sim = GameSimulation(40, 100, mode="boss", use_ai=True, planner=engine.planner,
+                                replay=engine.replay, rngs=engine.rngs)
+
+    trace = []
+    for _ in range(frames):
+        engine.sim.step(engine.input_commands([]))
+        # Idle time differs from run to run; a seeded game must not notice
+        engine.replay_idle(spare)
+        boss = engine.sim.boss
+        trace.append((engine.sim.player.x, engine.sim.lives, boss.x, boss.health, len(engine.sim.enemy_bullets)))
+    return trace
+
+def test_seeded_runs_ignore_idle_time(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert seeded_run(0.001) == seeded_run(0.03)
+
+def test_seeded_planner_runs_repeat(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert seeded_run(0.0, planner=True, frames=60) == seeded_run(0.0, planner=True, frames=60)
+
+def test_crash_after_the_session_save_recovers_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = load_config()
+    config["player"]["bot"] = "dodger"
+    engine = GameEngine(mode="boss", config=config)
+    engine.sim = GameSimulation(40, 100, mode="boss", use_ai=True, replay=engine.replay, rngs=engine.rngs)
+    for _ in range(30):
+        engine.sim.step(engine.input_commands([]))
+    engine.checkpoint(force=True)
+
+    def crash(batches):
+        raise RuntimeError("crashed while replaying")
+    monkeypatch.setattr(engine.sim.boss, "replay_batches", crash)
+    with pytest.raises(RuntimeError):
+        engine.save_results()
+
+    assert Checkpointer(config["ai"]["checkpoint_dir"]).recover(engine.session_store) is None
+    assert engine.session_store.count() == 1
@@ -0,0 +1,121 @@
+"""GameServer sessions and saves"""
+import socket
+import pytest
+from src.ai.player_store import PlayerStore
+from src.ai.rl_agent import BossRLAgent
+from src.ai.session_store import SessionStore
+from src.net.game_server import Connection, GameServer, run_bench
+from src.net.protocol import HELLO, LENGTH, MAX_CLIENT_MESSAGE, MAX_SCREEN, frame_message, hello_message, input_message
+
+def make_server(tmp_path, monkeypatch):
+    # Shared-boss models go to models/saved_models under the working directory
+    monkeypatch.chdir(tmp_path)
+    store = SessionStore(tmp_path / "sessions", auto_import=False)
+    return GameServer(address=None, store=store, players=PlayerStore(tmp_path / "players")).start()
+
+def test_shared_boss_games_merge_their_learning(tmp_path, monkeypatch):
+    server = make_server(tmp_path, monkeypatch)
+    first = server.add_session(40, 100, boss=True, frames=False)
+    second = server.add_session(40, 100, boss=True, frames=False)
+    state = str(("left", "close", "balanced"))
+    first.sim.boss.rl_agent.q_table[eval(state)] = {"shoot": 1.0}
+    second.sim.boss.rl_agent.q_table[eval(state)] = {"shoot": 2.0, "move_left": 0.5}
+
+    server._finish(first)
+    server._finish(second)
+    server.stop()
+
+    saved = BossRLAgent(model_dir=tmp_path / "models" / "saved_models")
+    assert saved.load_model()
+    assert saved.model_data()["q_table"][state] == {"shoot": 3.0, "move_left": 0.5}
+    assert server.store.count() == 2
+
+def test_sessions_share_the_analyzer_and_loaded_model(tmp_path, monkeypatch):
+    server = make_server(tmp_path, monkeypatch)
+    first = server.add_session(40, 100, boss=True, frames=False)
+    state = ("left", "close", "balanced")
+    first.sim.boss.rl_agent.q_table[state] = {"shoot": 1.0}
+    server._finish(first)
+    server.writer.close()
+
+    # No model file read and no database opened per session
+    def no_disk(*args, **kwargs):
+        raise AssertionError("loaded from disk")
+    with monkeypatch.context() as patch:
+        patch.setattr(BossRLAgent, "load_model", no_disk)
+        patch.setattr(SessionStore, "__init__", no_disk)
+        second = server.add_session(40, 100, boss=True, frames=False)
+        third = server.add_session(40, 100, boss=True, frames=False)
+    assert second.sim.boss.pattern_analyzer is server.analyzer
+    assert second.sim.boss.rl_agent.q_table[state] == {"shoot": 1.0}
+
+    # Each boss learns on its own copy
+    second.sim.boss.rl_agent.q_table[state]["shoot"] = 5.0
+    assert third.sim.boss.rl_agent.q_table[state] == {"shoot": 1.0}
+    server.stop()
+
+def test_player_profile_stays_pinned_until_saved(tmp_path, monkeypatch):
+    server = make_server(tmp_path, monkeypatch)
+    session = server.add_session(40, 100, frames=False, player="ada")
+    server._finish(session)
+    server.writer.close()
+    assert session.profile.pins == 1
+
+    server._release_saved()
+    assert session.profile.pins == 0
+    assert session.profile.store.count() == 1
+    server.stop()
+
+def test_hello_screen_size_is_clamped(tmp_path, monkeypatch):
+    server = make_server(tmp_path, monkeypatch)
+    ours, theirs = socket.socketpair()
+    ours.setblocking(False)
+    theirs.sendall(hello_message(60000, 60000, frames=True))
+
+    conn = Connection(ours)
+    server._read(conn)
+    assert (conn.session.sim.H, conn.session.sim.W) == MAX_SCREEN
+    assert conn.session.frame.h == MAX_SCREEN[0]
+    server.stop()
+    theirs.close()
+
+def test_profile_bench_without_sessions_fails_cleanly(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError, match="No recorded sessions"):
+        run_bench(1, seconds=0.1, bot="profile")
+
+def connect_client(server, data):
+    ours, theirs = socket.socketpair()
+    ours.setblocking(False)
+    theirs.sendall(data)
+    conn = Connection(ours)
+    server._read(conn)
+    return conn, theirs
+
+def test_empty_messages_are_skipped(tmp_path, monkeypatch):
+    server = make_server(tmp_path, monkeypatch)
+    conn, peer = connect_client(server, hello_message(40, 100, frames=False) + frame_message(b"") +
+                                input_message(["left"]))
+    assert conn.session.pending == ["left"]
+    server.stop()
+    peer.close()
+
+@pytest.mark.parametrize("data", [
+    frame_message(bytes([HELLO, 1])),                                               # short HELLO
+    hello_message(40, 100, frames=False) + LENGTH.pack(MAX_CLIENT_MESSAGE + 1) + b"x" * 100  # oversized
+])
+def test_malformed_client_is_dropped_alone(tmp_path, monkeypatch, data):
+    server = make_server(tmp_path, monkeypatch)
+    good, good_peer = connect_client(server, hello_message(40, 100, frames=False))
+    bad, bad_peer = connect_client(server, data)
+
+    assert bad.sock.fileno() == -1
+    assert bad.session is None and len(bad.inbox) <= MAX_CLIENT_MESSAGE
+    assert server.sessions == [good.session]
+
+    good_peer.sendall(input_message(["left"]))
+    server._read(good)
+    assert good.session.pending == ["left"]
+    server.stop()
+    good_peer.close()
+    bad_peer.close()
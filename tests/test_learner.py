@@ -0,0 +1,60 @@
+"""Shared-memory policy seqlock"""
+import threading
+import numpy as np
+from src.ai.learner import SharedPolicy
+
+def test_published_policy_reads_back():
+    writer = SharedPolicy((3, 4))
+    reader = SharedPolicy((3, 4), name=writer.name)
+    assert reader.read()[0] == 0
+
+    params = np.arange(12.0).reshape(3, 4)
+    writer.publish(params)
+    writer.publish(params * 2)
+    version, read = reader.read()
+    assert version == 2 and reader.version == 2
+    assert np.array_equal(read, params * 2)
+    reader.close()
+    writer.close()
+
+def test_read_during_a_write_is_rejected():
+    policy = SharedPolicy((4,))
+    policy.publish(np.ones(4))
+    # Writer stopped halfway: the counter is odd
+    policy.sequence[0] += 1
+    policy.params[:2] = 5.0
+    assert policy.read() is None
+
+    policy.sequence[0] += 1
+    assert policy.read()[0] == 2
+    policy.close()
+
+def test_concurrent_reads_never_see_a_torn_policy():
+    writer = SharedPolicy((20000,))
+    reader = SharedPolicy((20000,), name=writer.name)
+    stop = threading.Event()
+
+    def publish():
+        value = 0.0
+        while not stop.is_set():
+            value += 1.0
+            writer.publish(np.full(20000, value))
+            stop.wait(0.0001)
+    thread = threading.Thread(target=publish)
+    thread.start()
+
+    reads = 0
+    try:
+        for _ in range(2000):
+            result = reader.read()
+            if result is not None:
+                version, params = result
+                # Every parameter comes from the same publish
+                assert params.min() == params.max()
+                reads += 1
+    finally:
+        stop.set()
+        thread.join()
+    assert reads
+    reader.close()
+    writer.close()
@@ -0,0 +1,32 @@
+"""Level-of-detail control"""
+from src.rendering.lod import LOD_LEVELS, LODController
+
+def test_sustained_overload_degrades_one_level():
+    lod = LODController(target_fps=50, degrade_after=3, smoothing=1.0)
+    slow = lod.budget
+    assert not lod.record(slow) and not lod.record(slow)
+    assert lod.record(slow)
+    assert lod.level == 1 and lod.settings is LOD_LEVELS[1]
+
+def test_brief_spike_does_not_degrade():
+    lod = LODController(degrade_after=3, smoothing=1.0)
+    for frame_time in [lod.budget, lod.budget, 0.0, lod.budget, lod.budget]:
+        lod.record(frame_time)
+    assert lod.level == 0 and lod.level_changes == 0
+
+def test_recovers_after_idle_frames_and_stays_in_bounds():
+    lod = LODController(degrade_after=1, recover_after=4, smoothing=1.0)
+    for _ in range(len(LOD_LEVELS) + 3):
+        lod.record(lod.budget)
+    assert lod.level == len(LOD_LEVELS) - 1
+
+    changed = [lod.record(0.0) for _ in range(4 * len(LOD_LEVELS) + 4)]
+    assert lod.level == 0
+    assert sum(changed) == len(LOD_LEVELS) - 1
+
+def test_cadence_follows_the_level():
+    lod = LODController()
+    assert all(lod.update_effects(f) and lod.refresh_hud(f) for f in range(10))
+    lod.level = len(LOD_LEVELS) - 1
+    every = LOD_LEVELS[-1]["hud_every"]
+    assert [f for f in range(2 * every) if lod.refresh_hud(f)] == [0, every]
@@ -0,0 +1,35 @@
+"""PatternAnalyzer profiles"""
+import numpy as np
+import pytest
+from src.ai.behavior_tracker import BehaviorTracker
+from src.ai.pattern_analyzer import PatternAnalyzer
+
+FPS = 30
+
+def camp_then_sweep():
+    """A minute camping at x=40, then one sweep to the left wall and back"""
+    return [40] * (60 * FPS) + list(range(40, 0, -1)) + list(range(1, 41)) + [40] * FPS
+
+def recorded_session(tmp_path, xs, tolerance):
+    tracker = BehaviorTracker(tmp_path, store=object(), simplify_tolerance=tolerance)
+    for frame, x in enumerate(xs):
+        tracker.sample_position(x, 35, frame / FPS)
+    tracker.finalize_positions()
+    return {"actions": [], "stats": {"position_history": tracker.session_data["stats"]["position_history"]}}
+
+@pytest.mark.parametrize("tolerance", [None, 1.0])
+def test_positioning_weights_samples_by_duration(tmp_path, tolerance):
+    xs = camp_then_sweep()
+    session = recorded_session(tmp_path, xs, tolerance)
+    assert len(session["stats"]["position_history"]) < len(xs) / 10
+
+    analyzer = PatternAnalyzer(tmp_path, store=object())
+    positioning = analyzer.analyze_positioning([session])
+
+    # Same stats as sampling every frame
+    assert positioning["avg_position"] == pytest.approx(np.mean(xs), abs=0.05)
+    assert positioning["mobility"] == pytest.approx(np.std(xs), abs=0.1)
+    assert positioning["preferred_x_range"] == (40, 40)
+
+    summary = analyzer.summarize_sessions([session])
+    assert analyzer.profile_from_summary(summary)["positioning"] == pytest.approx(positioning)
@@ -0,0 +1,42 @@
+"""Boss lookahead planner"""
+from src.ai.planner import LookaheadPlanner
+from src.ai.rl_agent import ACTIONS
+from src.game.simulation import GameSimulation
+from src.game.snapshot import SimSnapshot
+from src.utils.config import load_config
+
+def configured_planner(seed=1):
+    ai = load_config()["ai"]
+    return LookaheadPlanner(budget_ms=ai["planner_budget_ms"], horizon=ai["planner_horizon"],
+                            rollouts=ai["planner_rollouts"], seed=seed)
+
+def test_decisions_roll_out_the_full_horizon():
+    planner = configured_planner()
+    sim = GameSimulation(40, 100, mode="boss", use_ai=False, seed=1)
+    snapshot = SimSnapshot.capture(sim, rng=False)
+
+    frames, action = 0, None
+    while action is None:
+        action = planner.plan(snapshot)
+        frames += 1
+        assert frames <= planner.horizon
+
+    assert action in ACTIONS
+    stats = planner.stats()
+    assert stats["decisions"] == 1
+    assert stats["steps_per_decision"] == planner.horizon
+    assert stats["frames_per_decision"] == frames
+
+def test_boss_acts_every_frame_while_planning():
+    planner = configured_planner()
+    sim = GameSimulation(40, 100, mode="boss", use_ai=False, planner=planner, seed=1)
+    xs = []
+    for _ in range(90):
+        sim.step([])
+        xs.append(sim.boss.x)
+
+    stats = planner.stats()
+    assert stats["decisions"] >= 1
+    assert stats["steps_per_decision"] == planner.horizon
+    assert planner.frames == 90
+    assert len(set(xs)) > 1
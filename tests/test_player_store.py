@@ -0,0 +1,21 @@
+"""PlayerStore profiles"""
+import pytest
+from src.ai.player_store import PlayerStore
+
+def test_player_plays_one_game_at_a_time(tmp_path):
+    players = PlayerStore(tmp_path)
+    profile = players.acquire("Ada")
+    with pytest.raises(ValueError):
+        players.acquire("ada")
+
+    players.release(profile)
+    assert players.acquire("ada") is profile
+    players.close()
+
+def test_acquired_profiles_are_not_evicted(tmp_path):
+    players = PlayerStore(tmp_path, capacity=1)
+    ada = players.acquire("ada")
+    players.get("bob")
+    players.get("cy")
+    assert players.get("ada") is ada
+    players.close()
@@ -0,0 +1,54 @@
+"""Spectator frame encoding"""
+import numpy as np
+from src.net.protocol import FrameDecoder, encode_frame, encode_palette
+from src.rendering.framebuffer import FrameBuffer
+
+def random_frame(rng, h=20, w=50):
+    frame = FrameBuffer(h, w)
+    for _ in range(30):
+        y, x = rng.integers(0, h), rng.integers(-5, w)
+        frame.addstr(y, x, "".join(rng.choice(list("ab █▲◆"), size=rng.integers(1, 12))),
+                     int(rng.integers(0, 4)) << 8)
+    return frame
+
+def test_deltas_rebuild_every_frame():
+    rng = np.random.default_rng(4)
+    decoder = FrameDecoder()
+    previous = None
+    for _ in range(20):
+        frame = random_frame(rng)
+        assert decoder.apply(encode_frame(frame, previous))
+        assert np.array_equal(decoder.frame.chars, frame.chars)
+        assert np.array_equal(decoder.frame.attrs, frame.attrs)
+        previous = frame
+    assert decoder.keyframes == 1
+
+def test_unchanged_frame_is_an_empty_delta():
+    frame = random_frame(np.random.default_rng(5))
+    same = FrameBuffer(frame.h, frame.w)
+    same.chars[...] = frame.chars
+    same.attrs[...] = frame.attrs
+    assert len(encode_frame(same, frame)) < len(encode_frame(frame))
+
+    decoder = FrameDecoder()
+    decoder.apply(encode_frame(frame))
+    assert decoder.apply(encode_frame(same, frame))
+    assert np.array_equal(decoder.frame.chars, frame.chars)
+
+def test_resize_needs_a_keyframe():
+    rng = np.random.default_rng(6)
+    decoder = FrameDecoder()
+    small = random_frame(rng)
+    large = random_frame(rng, 25, 60)
+    assert not decoder.apply(encode_frame(small, small))
+
+    decoder.apply(encode_frame(small))
+    # A size change is always sent as a keyframe
+    assert decoder.apply(encode_frame(large, small))
+    assert decoder.keyframes == 2
+    assert np.array_equal(decoder.frame.chars, large.chars)
+
+def test_palette_round_trip():
+    decoder = FrameDecoder()
+    assert not decoder.apply(encode_palette({1: (7, 0), 3: (2, -1)}))
+    assert decoder.palette == {1: (7, 0), 3: (2, -1)}
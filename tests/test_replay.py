@@ -0,0 +1,37 @@
+"""SumTree and prioritized replay"""
+import numpy as np
+import pytest
+from src.ai.replay import SumTree
+
+def test_find_maps_cumulative_priority_to_leaves():
+    tree = SumTree(5)
+    tree.update([0, 1, 2, 3, 4], [1.0, 0.0, 2.0, 0.5, 0.5])
+    assert tree.total == pytest.approx(4.0)
+    # Ranges: 0 -> [0, 1), 2 -> [1, 3), 3 -> [3, 3.5), 4 -> [3.5, 4)
+    assert tree.find([0.0, 0.99, 1.0, 2.99, 3.0, 3.75]).tolist() == [0, 0, 2, 2, 3, 4]
+
+def test_batched_updates_keep_every_sum():
+    rng = np.random.default_rng(1)
+    tree = SumTree(100)
+    priorities = np.zeros(100)
+    for _ in range(20):
+        # Repeated indices within a batch: the last write wins
+        indices = rng.integers(0, 100, size=16)
+        values = rng.random(16)
+        tree.update(indices, values)
+        priorities[indices] = values
+        assert tree.total == pytest.approx(priorities.sum())
+    assert tree.priorities(np.arange(100)) == pytest.approx(priorities)
+    for node in range(1, tree.size):
+        assert tree.tree[node] == pytest.approx(tree.tree[2 * node] + tree.tree[2 * node + 1])
+
+def test_sampling_is_proportional_to_priority():
+    tree = SumTree(4)
+    tree.update([0, 1, 2, 3], [1.0, 2.0, 3.0, 4.0])
+    values = np.random.default_rng(2).random(40000) * tree.total
+    counts = np.bincount(tree.find(values), minlength=4)
+    assert counts / counts.sum() == pytest.approx([0.1, 0.2, 0.3, 0.4], abs=0.01)
+
+    # A leaf set to zero is never sampled again
+    tree.update([1], [0.0])
+    assert 1 not in tree.find(values * tree.total / 10.0)
@@ -0,0 +1,41 @@
+"""SessionStore queries"""
+from src.ai.session_store import SessionStore
+
+def make_session(session_id, start, shots=1):
+    return {
+        "session_id": session_id,
+        "start_time": start,
+        "actions": [{"timestamp": 0.1 * i, "type": "shoot", "data": {"x": i, "y": 30}}
+                    for i in range(shots)],
+        "stats": {"total_shots": shots, "position_history": [{"t": 0.0, "x": 40, "y": 35}]}
+    }
+
+def test_load_sessions_roundtrip(tmp_path):
+    store = SessionStore(tmp_path, auto_import=False)
+    store.save_session(make_session("a", 100.0, shots=2))
+    store.save_session(make_session("b", 200.0, shots=3))
+
+    sessions = store.load_sessions()
+    assert [s["session_id"] for s in sessions] == ["a", "b"]
+    assert len(sessions[1]["actions"]) == 3
+    assert sessions[1]["actions"][2]["data"] == {"x": 2, "y": 30}
+    assert sessions[0]["stats"]["position_history"] == [{"t": 0.0, "x": 40, "y": 35}]
+    store.close()
+
+def test_load_sessions_ignores_session_saved_meanwhile(tmp_path):
+    store = SessionStore(tmp_path, auto_import=False)
+    store.save_session(make_session("a", 100.0))
+    store.save_session(make_session("b", 200.0))
+
+    # Another game saves right after the session rows were read
+    sessions = store.sessions
+    def sessions_then_save(*args):
+        rows = sessions(*args)
+        store.save_session(make_session("c", 300.0, shots=4))
+        return rows
+    store.sessions = sessions_then_save
+
+    loaded = store.load_sessions(limit=2)
+    assert [s["session_id"] for s in loaded] == ["a", "b"]
+    assert all(len(s["actions"]) == 1 for s in loaded)
+    store.close()
@@ -0,0 +1,34 @@
+"""GameSimulation rules"""
+import pytest
+from src.game.simulation import GameSimulation, INVULNERABLE_FRAMES
+
+def volley_at_player(sim, pattern):
+    player = sim.player
+    origin = (player.x + player.width // 2, player.y - 25)
+    sim.enemy_bullets.spawn(*sim.emitter.emit(pattern, origin, player.get_center(), sim.W, sim.frame))
+
+@pytest.mark.parametrize("pattern", ["aimed", "wall"])
+def test_one_volley_costs_one_life(pattern):
+    sim = GameSimulation(40, 100, use_ai=False, max_enemies=0, seed=1)
+    if pattern == "wall":
+        # Stand where the wall has no gap
+        sim.emitter.patterns["wall"]["gap"] = 0
+    volley_at_player(sim, pattern)
+
+    deaths = 0
+    for _ in range(80):
+        deaths += "death" in sim.step()
+    assert deaths == 1
+    assert sim.lives == 4
+
+def test_ship_can_be_hit_again_after_recovering():
+    sim = GameSimulation(40, 100, use_ai=False, max_enemies=0, seed=1)
+    volley_at_player(sim, "aimed")
+    for _ in range(80):
+        sim.step()
+    assert sim.invulnerable == 0
+
+    volley_at_player(sim, "aimed")
+    for _ in range(INVULNERABLE_FRAMES + 60):
+        sim.step()
+    assert sim.lives == 3
@@ -0,0 +1,38 @@
+"""Spectator fan-out and statistics"""
+import selectors
+import socket
+from src.net import spectator
+from src.net.spectator import SpectatorClient, SpectatorServer
+from src.rendering.framebuffer import FrameBuffer
+
+def attach_client(server):
+    ours, theirs = socket.socketpair()
+    ours.setblocking(False)
+    client = SpectatorClient(ours, "test")
+    server._selector.register(ours, selectors.EVENT_READ, client)
+    server.clients.append(client)
+    return client, theirs
+
+def test_fanout_time_counts_inline_sends_once(monkeypatch):
+    server = SpectatorServer()
+    server._selector = selectors.DefaultSelector()
+    client, theirs = attach_client(server)
+
+    # encode 0 -> 1, fan-out 1 -> 11 of which the send is 1 -> 11
+    ticks = iter([0.0, 1.0, 1.0, 11.0, 11.0])
+    monkeypatch.setattr(spectator.time, "perf_counter", lambda: next(ticks))
+    frame = FrameBuffer(4, 8)
+    frame.addstr(1, 1, "hi")
+    server._fan_out(frame)
+    monkeypatch.undo()
+
+    stats = server.stats()
+    assert stats["encode_ms"] == 1000
+    assert stats["fanout_us_per_client"] == 10e6
+    assert stats["clients"][0]["send_ms"] == 10000
+    assert client.keyframes == 1 and client.frames_sent == 1
+    assert theirs.recv(65536)
+
+    server._selector.close()
+    client.sock.close()
+    theirs.close()
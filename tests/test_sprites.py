@@ -0,0 +1,57 @@
+"""Sprite atlas rasterization and blitting"""
+import curses
+import numpy as np
+from src.rendering.framebuffer import FrameBuffer
+from src.rendering.sprites import Sprite, SpriteAtlas
+
+class Window:
+    """Curses-like window that records addstr calls and errors off-screen"""
+
+    def __init__(self, h, w):
+        self.h, self.w = h, w
+        self.calls = []
+
+    def addstr(self, y, x, text, attr=0):
+        if not 0 <= y < self.h or not 0 <= x < self.w:
+            raise curses.error
+        self.calls.append((y, x, text, attr))
+
+def text(frame, y):
+    return "".join(map(chr, frame.chars[y].tolist()))
+
+def test_ragged_rows_are_padded():
+    sprite = Sprite(["/^\\", "|"], 7)
+    assert (sprite.h, sprite.w) == (2, 3)
+    assert "".join(map(chr, sprite.chars[1].tolist())) == "|  "
+
+def test_blit_is_clipped_to_the_frame():
+    atlas = SpriteAtlas()
+    atlas.add("ship", "normal", ["<=>", "/ \\"], curses.A_BOLD)
+    frame = FrameBuffer(4, 6)
+    atlas.blit(frame, "ship", "normal", 3, 4)
+    atlas.blit(frame, "ship", "normal", -1, -1)
+    assert text(frame, 3) == "    <="
+    assert text(frame, 0) == " \\    "
+    assert frame.attrs[3, 5] == curses.A_BOLD
+    assert frame.attrs[3, 3] == 0
+
+def test_blit_falls_back_to_addstr_on_curses_windows():
+    atlas = SpriteAtlas()
+    atlas.add("ship", "hit", ["ab", "cd"], 3)
+    window = Window(5, 5)
+    atlas.blit(window, "ship", "hit", 4, 1)
+    assert window.calls == [(4, 1, "ab", 3)]
+
+def test_blit_many_scatters_one_cell_sprites():
+    atlas = SpriteAtlas()
+    atlas.add("bullet", "normal", ["*"], 2)
+    frame = FrameBuffer(3, 3)
+    atlas.blit_many(frame, "bullet", "normal", [0, 2, 5, -1], [1, 2, 0, 0])
+    assert np.argwhere(frame.chars == ord("*")).tolist() == [[0, 1], [2, 2]]
+
+def test_blit_many_draws_larger_sprites_one_by_one():
+    atlas = SpriteAtlas()
+    atlas.add("boss", "normal", ["##"], 0)
+    frame = FrameBuffer(2, 5)
+    atlas.blit_many(frame, "boss", "normal", np.array([0, 1]), np.array([0, 3]))
+    assert [text(frame, 0), text(frame, 1)] == ["##   ", "   ##"]
@@ -0,0 +1,81 @@
+"""VecBossEnv mirrors of the boss-fight rules"""
+import numpy as np
+import pytest
+from src.ai.rl_agent import ACTIONS
+from src.ai.vec_env import VecBossEnv
+from src.game.boss import Boss
+from src.game.simulation import GameSimulation, INVULNERABLE_FRAMES
+
+NOOP = ACTIONS.index("shoot")
+BURST = ACTIONS.index("shoot_burst")
+
+def quiet_env(n):
+    """Fights where only the boss's actions put bullets on the screen"""
+    env = VecBossEnv(n, seed=1)
+    env.reset()
+    env.cooldown[:] = 10 ** 6
+    env._player_policy = lambda: (np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool))
+    return env
+
+def test_shoot_burst_fires_the_mode_volley():
+    env = quiet_env(3)
+    env.mode[:] = [Boss.MODES.index(mode) for mode in ("balanced", "defensive", "aggressive")]
+    env.step(np.full(3, BURST))
+
+    # spread and aimed fans, and a wall with its gap somewhere
+    sizes = env.eb_alive.sum(axis=1)
+    assert sizes[[0, 2]].tolist() == [7, 5]
+    assert 40 <= sizes[1] <= 45
+    # Each volley weighs one shot
+    assert (env.eb_weight * env.eb_alive).sum(axis=1) == pytest.approx([1.0, 1.0, 1.0])
+
+    # Nothing more until the burst cooldown is over
+    for _ in range(Boss.BURST_COOLDOWN - 1):
+        env.step(np.full(3, BURST))
+        assert (env.eb_alive.sum(axis=1) <= sizes).all()
+
+def test_volley_costs_one_life():
+    env = quiet_env(2)
+    # A column of bullets falling onto the ship's nose, one per row
+    nose = env.player_x + env.player_w // 2
+    owner = np.repeat([0, 1], 6)
+    env._spawn_enemy_bullets(np.arange(2), owner, nose[owner].astype(np.float64),
+                             env.player_y - 1.0 - np.tile(np.arange(6), 2), np.zeros(12), np.ones(12),
+                             np.full(12, 1 / 6))
+
+    damage = 0
+    for _ in range(12):
+        _, rewards, _, _ = env.step(np.full(2, NOOP))
+        damage += rewards > 0
+    assert damage.tolist() == [1, 1]
+    assert env.lives.tolist() == [env.player_lives - 1] * 2
+    assert not env.eb_alive.any()
+    assert (env.invulnerable == INVULNERABLE_FRAMES - 12 + 1).all()
+
+def test_snapshot_volley_moves_as_in_the_game():
+    sim = GameSimulation(40, 100, mode="boss", use_ai=False, max_enemies=0, seed=2)
+    sim.step()
+    sim.boss._volley = "spread"
+    sim.step()
+    count = len(sim.enemy_bullets)
+    assert count >= 7
+
+    env = VecBossEnv.from_snapshot(sim.snapshot(rng=False), 1, seed=3, horizon=5)
+    for _ in range(5):
+        sim.step()
+        env.step([NOOP])
+        live = sim.enemy_bullets.rows()[:count]
+        assert env.eb_x[0, :count] == pytest.approx(live[:, 0])
+        assert env.eb_y[0, :count] == pytest.approx(live[:, 1])
+
+def test_emit_many_matches_single_volleys():
+    env = quiet_env(1)
+    origins = np.array([[20.0, 9.0], [70.0, 9.0]])
+    targets = np.array([[40.0, 35.0], [10.0, 35.0]])
+    for name in ("spread", "aimed", "spiral"):
+        owner, x, y, vx, vy, weight = env.emitter.emit_many(name, origins, targets, 100, np.array([3, 4]))
+        for row in range(2):
+            single = env.emitter.emit(name, origins[row], targets[row], 100, row + 3)
+            mine = owner == row
+            for batched, alone in zip((x, y, vx, vy, weight), single):
+                assert batched[mine] == pytest.approx(alone)